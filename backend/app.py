@@ -1,13 +1,41 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, abort, g, request, jsonify, make_response, stream_with_context
 from flask_cors import CORS
 from ds_modules.hash_map import HashMap
-from ds_modules.trie import Trie
-from ds_modules.linked_list import DoublyLinkedList
-from ds_modules.heap import MaxHeap
-from ds_modules.graph import Graph
+from ds_modules.radix_trie import RadixTrie
+from ds_modules.linked_list import TimeIndexedList
+from ds_modules.heap import IndexedMaxHeap
+from ds_modules.graph import Graph, CoOccurrenceGraph
 from ds_modules.stack import Stack
+from ds_modules.link_resolver import ExerciseLinkResolver
+from ds_modules.aho_corasick import AhoCorasick
+from ds_modules.storage import DurableStore
+from ds_modules.sqlite_store import SqliteStore
+from ds_modules.aggregates import DashboardSummary, parse_minutes, parse_number
+from ds_modules.rollups import Rollups
+from ds_modules.timer_wheel import Scheduler
+from ds_modules.event_bus import EventBus
+from ds_modules.response_cache import StoreVersions, LRUCache
+from ds_modules.partitions import Partitions
+from ds_modules.ingest import MalformedBody, iter_records
+from ds_modules.food_catalogue import FoodCatalogue
+from ds_modules.lazy import Lazy, LazyTrie
+import atexit
+import collections
+import csv
 import datetime
-import requests
+import functools
+import hashlib
+import hmac
+import io
+import json
+import math
+import os
+import random
+import re
+import secrets
+import threading
+import time
+import zlib
 
 # Additional Resources (HashMap for Links)
 exercise_video_map = {
@@ -126,14 +154,14 @@ exercise_video_map = {
     "Neck Exercise": "https://www.youtube.com/watch?v=EqH6K-R_O-8"
 }
 
-# In-Memory Persistence
-nutrition_log = [
+# Seed meals for the default user
+demo_nutrition_log = [
     { "name": 'Oats with Milk', "cals": 350, "p": 12, "c": 45, "f": 8 },
     { "name": 'Grilled Chicken', "cals": 280, "p": 40, "c": 0, "f": 5 }
 ]
 
-# User Profile Storage (Default for demonstration)
-current_user_profile = {
+# Profile every user starts from
+default_profile = {
     "name": "",
     "height": 170, # cm
     "weight": 70,  # kg
@@ -148,12 +176,9 @@ CORS(app)
 
 # --- 1. Data Structure Initialization (In-Memory Database) ---
 users_db = HashMap(capacity=100)       # Auth
-exercise_trie = Trie()                 # Search
-food_trie = Trie()                     # Search
-workout_history = DoublyLinkedList()   # History
-reminder_heap = MaxHeap()              # Priority Reminders
-recommendation_graph = Graph()         # AI Coach
-action_stack = Stack()                 # Undo
+exercise_graph = CoOccurrenceGraph()   # Learned from every user's history
+# Search tries and the AI Coach graph are built from the seed data: see Seed Indexes
+# History, reminders, undo stack, totals and trends are per user: see UserState
 
 # --- Seed Data for Trie (Extremely Expanded) ---
 exercises = [
@@ -300,40 +325,453 @@ food_database = {
     "Mushroom": { "cals": 22, "p": 3.1, "c": 3.3, "f": 0.3, "benefits": "Selenium and Vitamin D", "control": "Immunity" }
 }
 
-for ex in exercises:
-    exercise_trie.insert(ex)
-# Insert Keys from the new database
-for fd in food_database.keys():
-    food_trie.insert(fd)
-# Also insert generic items if needed, or rely on database availability
-
 # --- Seed Data for Graph (Recommendations) ---
 # Connecting Exercises to Muscle Groups/Goals
-recommendation_graph.add_edge("Strength", "Bench Press")
-recommendation_graph.add_edge("Strength", "Deadlift")
-recommendation_graph.add_edge("Strength", "Pushups")
-recommendation_graph.add_edge("Strength", "Pullups")
-recommendation_graph.add_edge("Strength", "Squats")
-recommendation_graph.add_edge("Strength", "Lunges")
-recommendation_graph.add_edge("Strength", "Shoulder Press")
-recommendation_graph.add_edge("Strength", "Bicep Curls")
-recommendation_graph.add_edge("Strength", "Tricep Dips")
-recommendation_graph.add_edge("Strength", "Leg Press")
-recommendation_graph.add_edge("Strength", "Lat Pulldown")
-recommendation_graph.add_edge("Cardio", "Running")
-recommendation_graph.add_edge("Cardio", "Cycling")
-recommendation_graph.add_edge("Cardio", "Burpees")
-recommendation_graph.add_edge("Cardio", "Swimming")
-recommendation_graph.add_edge("Cardio", "Mountain Climbers")
-recommendation_graph.add_edge("Cardio", "Jumping Jacks")
-recommendation_graph.add_edge("Cardio", "Hiking")
-recommendation_graph.add_edge("Flexibility", "Yoga")
-recommendation_graph.add_edge("Flexibility", "Pilates")
-recommendation_graph.add_edge("Flexibility", "Plank")
-recommendation_graph.add_edge("Flexibility", "Tai Chi")
+exercise_categories = {
+    "Strength": ["Bench Press", "Deadlift", "Pushups", "Pullups", "Squats", "Lunges", "Shoulder Press",
+                 "Bicep Curls", "Tricep Dips", "Leg Press", "Lat Pulldown"],
+    "Cardio": ["Running", "Cycling", "Burpees", "Swimming", "Mountain Climbers", "Jumping Jacks", "Hiking"],
+    "Flexibility": ["Yoga", "Pilates", "Plank", "Tai Chi"],
+}
+
+# --- Seed Indexes (Built on First Use) ---
+# Everything derived from the seed data - search tries, food catalogue, link
+# resolver, category graph and (further down) the chat engine - is a Lazy:
+# built by the first request that needs it, not at import, so a worker boots
+# in the same time however large the catalogues get. Popularity replayed from
+# the log before a trie exists is held and becomes its initial scores.
+# CULTFIT_EAGER_INDEXES=1 builds them all at import instead, e.g. for a server
+# that preloads the app and then forks workers.
+#
+# Food search serves a FoodCatalogue (macros in typed arrays, text interned or
+# left on disk): the built-in items above, or a large catalogue file named by
+# CULTFIT_FOOD_CATALOGUE (written with FoodCatalogue.save). food_trie holds the
+# same names, so a search hit is one id lookup away from its row.
+FOOD_CATALOGUE = os.environ.get("CULTFIT_FOOD_CATALOGUE")
+
+def load_food_catalogue():
+    if FOOD_CATALOGUE:
+        return FoodCatalogue.load(FOOD_CATALOGUE)
+    return FoodCatalogue.from_dict(food_database)
+
+def build_recommendation_graph():
+    graph = Graph()
+    for category, names in exercise_categories.items():
+        for name in names:
+            graph.add_edge(category, name)
+    return graph
+
+food_catalogue = Lazy(load_food_catalogue)
+exercise_trie = LazyTrie(RadixTrie, lambda: exercises)
+food_trie = LazyTrie(RadixTrie, lambda: food_catalogue.names)
+# Title -> tutorial link indexes
+link_resolver = Lazy(lambda: ExerciseLinkResolver(exercise_video_map, exercise_trie.value()))
+recommendation_graph = Lazy(build_recommendation_graph)
+# --- Per-User State (Partitions + Lock Striping) ---
+# Everything a user owns lives in their UserState. A request proves its user
+# with the session token login/register return, sent as `Authorization:
+# Bearer <token>` (or ?token= where headers can't be set, e.g. EventSource).
+# Requests without one may read DEFAULT_USER, the single demo profile the
+# app always had, but not change it. Each op is logged with its user as the storage
+# partition, and storage guards partitions with striped locks, so requests
+# for different users never wait on each other. The shared search tries and
+# exercise graph have locks of their own.
+DEFAULT_USER = "default"
+
+class UserState:
+    def __init__(self, user):
+        self.user = user
+        self.profile = dict(default_profile)
+        self.nutrition_log = []
+        self.history = TimeIndexedList()      # History
+        self.reminders = IndexedMaxHeap()     # Priority Reminders
+        self.reminder_schedule = {}           # reminder id -> {"due": iso, "repeat": rule}
+        self.actions = Stack()                # Undo
+        self.summary = DashboardSummary()     # Running totals
+        self.trends = Rollups()               # Daily buckets for trends
+        if user == DEFAULT_USER:
+            for item in demo_nutrition_log:
+                meal = dict(item)
+                self.nutrition_log.append(meal)
+                index_meal(self, meal, 1)
+
+user_states = Partitions(UserState)
+
+def current_user():
+    # Checked once per request
+    if 'user' not in g:
+        auth = request.headers.get('Authorization', '')
+        token = auth[len('Bearer '):] if auth.startswith('Bearer ') else request.args.get('token')
+        if token:
+            name = session_user(token)
+            if name is None:
+                abort(make_response(jsonify({"error": "Invalid session"}), 401))
+        elif request.headers.get('X-User') or request.args.get('user'):
+            # A bare name proves nothing
+            abort(make_response(jsonify({"error": "Sign in to get a session token"}), 401))
+        elif request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            # The default profile is public to read, not to write
+            abort(make_response(jsonify({"error": "Sign in to make changes"}), 401))
+        g.user = name if token else DEFAULT_USER
+    return g.user
+
+# Session tokens are "<user>.<HMAC-SHA256 of user>", so any worker can check
+# one without shared session state. The key is CULTFIT_SECRET, or a random
+# one created once in DATA_DIR so sessions survive restarts.
+def load_session_key():
+    secret = os.environ.get("CULTFIT_SECRET")
+    if secret:
+        return secret.encode()
+    path = os.path.join(DATA_DIR, "secret.key")
+    if not os.path.exists(path):
+        # Written aside and linked into place: concurrent workers agree on one key
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(secrets.token_bytes(32))
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+    with open(path, "rb") as f:
+        return f.read()
+
+session_key = functools.lru_cache(maxsize=None)(load_session_key)  # Read on first use
+
+def session_signature(user):
+    return hmac.new(session_key(), user.encode(), hashlib.sha256).hexdigest()
+
+def issue_session(user):
+    return f"{user}.{session_signature(user)}"
+
+def session_user(token):
+    user, _, signature = token.rpartition(".")
+    if user and hmac.compare_digest(signature, session_signature(user)):
+        return user
+    return None
+
+def user_state():
+    return user_states.get(current_user())
+
+# --- Durable Storage (Write-Ahead Log + Snapshots) ---
+# Every mutation goes through storage.execute(op, payload, partition=user) so
+# it is logged before the response is sent. Startup loads the latest snapshot
+# and replays only the log written after it.
+DATA_DIR = os.environ.get("CULTFIT_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+popularity_lock = threading.Lock()
+
+def track_popularity(trie, entry, field, delta):
+    # Search ranks by how often an item is logged, across all users
+    name = entry.get(field) if isinstance(entry, dict) else None
+    if isinstance(name, str):
+        with popularity_lock:
+            trie.bump(name, delta)
+
+def track_popularity_batch(trie, entries, field, delta):
+    # One lock and one bump per distinct name
+    counts = collections.Counter(e.get(field) for e in entries if isinstance(e.get(field), str))
+    with popularity_lock:
+        for name, count in counts.items():
+            trie.bump(name, delta * count)
+
+# Derived state (search popularity, dashboard totals) follows every add/remove
+def index_meal(state, item, sign):
+    track_popularity(food_trie, item, "name", sign)
+    state.summary.add_meal(item, sign)
+    state.trends.add_meal(item, sign)
+
+def index_meals(state, items, sign):
+    track_popularity_batch(food_trie, items, "name", sign)
+    state.summary.add_meals(items, sign)
+    state.trends.add_meals(items, sign)
+
+def index_workout(state, entry, sign):
+    track_popularity(exercise_trie, entry, "title", sign)
+    state.summary.add_workout(entry, sign)
+    state.trends.add_workout(entry, sign)
+    title = entry.get("title")
+    if isinstance(title, str) and title.strip():
+        # Exercises one user logged on the same day co-occur
+        exercise_graph.record((state.user, str(entry.get("timestamp", ""))[:10]), title.strip(), sign)
+
+def index_workouts(state, entries, sign):
+    track_popularity_batch(exercise_trie, entries, "title", sign)
+    state.summary.add_workouts(entries, sign)
+    state.trends.add_workouts(entries, sign)
+    sessions = collections.defaultdict(list)
+    for entry in entries:
+        title = entry.get("title")
+        if isinstance(title, str) and title.strip():
+            sessions[(state.user, str(entry.get("timestamp", ""))[:10])].append(title.strip())
+    for session, titles in sessions.items():
+        if sign > 0:
+            exercise_graph.record_many(session, titles)
+        else:
+            for title in titles:
+                exercise_graph.record(session, title, sign)
+
+# --- Change Feed (Pub/Sub -> Server-Sent Events) ---
+# Handlers publish a delta from storage.execute's on_applied hook, i.e. once
+# the change is durable and under the partition's lock, so no client hears of
+# a write a crash could lose and a user's event ids are ordered exactly like their
+# mutations and a snapshot taken with storage.read() pairs with the last event
+# id it covers. /api/events streams a user's events (and user-less ones like
+# resync) to each of their clients through its own bounded queue. Replayed WAL
+# ops are not published - only live changes are news.
+event_bus = EventBus()
+
+def publish(event_type, user, **data):
+    event_bus.publish(event_type, data, partition=user)
+
+# --- Reminder Scheduler (Timer Wheel + Push Delivery) ---
+# Reminders with a `due` time are armed on a hierarchical timer wheel that a
+# background thread advances once a second; when one fires it is published
+# as a `reminder_due` event. `repeat` re-arms it. Timers are keyed by
+# (user, reminder id).
+REPEAT_SECONDS = {"hourly": 3600, "daily": 86400, "weekly": 7 * 86400}
+
+def parse_due(value):
+    # ISO datetime (naive = server local time) -> epoch seconds
+    return datetime.datetime.fromisoformat(str(value)).timestamp()
+
+def parse_repeat(rule):
+    # "hourly" / "daily" / "weekly" or a number of seconds (minimum 60)
+    if rule in (None, "", "none"):
+        return None
+    if rule in REPEAT_SECONDS:
+        return REPEAT_SECONDS[rule]
+    seconds = int(rule)
+    if seconds < 60:
+        raise ValueError("repeat must be at least 60 seconds")
+    return seconds
+
+def schedule_reminder(state, item_id, due, repeat=None):
+    if not due:
+        return
+    state.reminder_schedule[item_id] = {"due": due, "repeat": repeat}
+    when, every = parse_due(due), parse_repeat(repeat)
+    # A one-off reminder that came due while the server was down is not replayed
+    if every or when > time.time():
+        reminder_scheduler.schedule((state.user, item_id), when, every=every)
+
+def unschedule_reminder(state, item_id):
+    if state.reminder_schedule.pop(item_id, None) is not None:
+        reminder_scheduler.cancel((state.user, item_id))
+
+def fire_reminder(timer_id, when, payload):
+    user, item_id = timer_id
+    state = user_states.get(user)
+
+    def fire():
+        item = state.reminders.get(item_id)
+        if item is not None:
+            publish("reminder_due", user, reminder=reminder_view(state, item),
+                    due=datetime.datetime.fromtimestamp(when).isoformat(timespec="seconds"))
+
+    storage.read(fire, partition=user)
+
+reminder_scheduler = Scheduler(fire_reminder)
+
+# --- Read Cache (Store Versions + ETags) ---
+# Each op bumps the versions of the stores it touches once it has been applied.
+# A cached GET is keyed by (path, query, user, versions of the stores it
+# reads): a matching If-None-Match gets a 304, otherwise the serialized body is
+# served from an LRU until one of those stores changes. Stores are versioned
+# per user except the shared ones.
+OP_STORES = {
+    "user_put": ("users",),
+    "profile_update": ("profile",),
+    "nutrition_add": ("nutrition", "food_search"),
+    "nutrition_delete": ("nutrition", "food_search"),
+    "nutrition_add_batch": ("nutrition", "food_search"),
+    "history_add": ("history", "exercise_search"),
+    "history_delete": ("history", "exercise_search"),
+    "history_add_batch": ("history", "exercise_search"),
+    "reminder_push": ("reminders",),
+    "reminder_pop": ("reminders",),
+    "reminder_update": ("reminders",),
+    "reminder_remove": ("reminders",),
+    "undo_push": ("actions",),
+    "undo_pop": ("actions",),
+}
+ALL_STORES = sorted({store for stores in OP_STORES.values() for store in stores})
+SHARED_STORES = {"users", "food_search", "exercise_search"}
+store_versions = StoreVersions()
+response_cache = LRUCache(capacity=int(os.environ.get("CULTFIT_CACHE_ENTRIES", 1024)))
+
+def store_keys(user, stores):
+    return [store if store in SHARED_STORES else (user, store) for store in stores]
+
+def versions_etag(user, keys):
+    # Two users can be at the same versions; the user tag keeps a 304 from crossing accounts
+    return f"{store_versions.etag(keys)}.{zlib.crc32(user.encode()):08x}"
+
+def cached(*stores):
+    # GET only; other methods and non-200 responses pass straight through
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            user = current_user()
+            keys = store_keys(user, stores)
+            version = store_versions.get(*keys)
+            etag = versions_etag(user, keys)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+            key = (request.path, request.query_string, user, version)
+            body = response_cache.get(key)
+            if body is None:
+                # Built with the user's writers held off
+                response = app.make_response(storage.read(lambda: view(*args, **kwargs), partition=user))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                response_cache.put(key, body, len(body))
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'  # Always revalidate
+            return response
+        return wrapper
+    return decorator
+
+def apply_op(op, payload, partition):
+    # Ops logged before there were partitions belong to the default user
+    user = partition or DEFAULT_USER
+    try:
+        return apply_change(user_states.get(user), op, payload)
+    finally:
+        store_versions.bump(*store_keys(user, OP_STORES.get(op, ())))
+
+def apply_change(state, op, payload):
+    if op == "user_put":
+        users_db.put(payload["username"], payload["data"])
+    elif op == "profile_update":
+        state.profile.update(payload)
+    elif op == "nutrition_add":
+        state.nutrition_log.append(payload)
+        index_meal(state, payload, 1)
+    elif op == "nutrition_delete":
+        # Existence is checked here, under the partition lock; a miss is a no-op
+        if not 0 <= payload["index"] < len(state.nutrition_log):
+            return None
+        item = state.nutrition_log.pop(payload["index"])
+        index_meal(state, item, -1)
+        return item
+    elif op == "nutrition_add_batch":
+        state.nutrition_log.extend(payload["items"])
+        index_meals(state, payload["items"], 1)
+    elif op == "history_add":
+        state.history.append(payload)
+        index_workout(state, payload, 1)
+    elif op == "history_add_batch":
+        state.history.extend(payload["entries"])
+        index_workouts(state, payload["entries"], 1)
+    elif op == "history_delete":
+        entry = state.history.remove(payload["id"])
+        if entry is not None:
+            index_workout(state, entry, -1)
+        return entry
+    elif op == "reminder_push":
+        # parse_number: ops logged before priorities were validated may hold strings
+        payload["id"] = state.reminders.push(parse_number(payload["priority"]), payload["message"], payload.get("id"))
+        schedule_reminder(state, payload["id"], payload.get("due"), payload.get("repeat"))
+    elif op == "reminder_pop":
+        item = state.reminders.pop()
+        if item:
+            unschedule_reminder(state, item[0])
+        return item
+    elif op == "reminder_update":
+        return state.reminders.update_priority(payload["id"], parse_number(payload["priority"]))
+    elif op == "reminder_remove":
+        unschedule_reminder(state, payload["id"])
+        return state.reminders.remove(payload["id"])
+    elif op == "undo_push":
+        state.actions.push(payload)
+    elif op == "undo_pop":
+        return state.actions.pop()
+
+def dump_state():
+    return {
+        "users": [[k, v] for k, v in users_db.items()],
+        "partitions": {user: dump_user(state) for user, state in user_states.items()},
+    }
+
+def dump_user(state):
+    return {
+        "profile": dict(state.profile),
+        "nutrition_log": list(state.nutrition_log),
+        "history": state.history.get_history(),
+        "reminders": [[priority, message, item_id, state.reminder_schedule.get(item_id)]
+                      for item_id, priority, message in state.reminders.items()],
+        "actions": list(state.actions.items),
+        # Ids of deleted newest entries must stay retired after a restart
+        "next_ids": {"history": state.history.next_id, "reminders": state.reminders.next_id},
+    }
+
+def restore_state(state):
+    for username, data in state["users"]:
+        users_db.put(username, data)
+    # Snapshots from before partitions hold the default user's fields at the top level
+    partitions = state["partitions"] if "partitions" in state else {DEFAULT_USER: state}
+    for user, data in partitions.items():
+        restore_user(user_states.get(user), data)
+        store_versions.bump(*store_keys(user, ALL_STORES))
+
+def restore_user(state, data):
+    # Bulk loads: one sorted extend and one batched index pass per list
+    state.profile.clear()
+    state.profile.update(data["profile"])
+    index_meals(state, state.nutrition_log, -1)
+    state.nutrition_log[:] = data["nutrition_log"]
+    index_meals(state, state.nutrition_log, 1)
+    state.history.extend(data["history"])
+    index_workouts(state, data["history"], 1)
+    for priority, message, *rest in data["reminders"]:
+        item_id = state.reminders.push(parse_number(priority), message, rest[0] if rest else None)
+        schedule = rest[1] if len(rest) > 1 else None
+        if schedule:
+            schedule_reminder(state, item_id, schedule.get("due"), schedule.get("repeat"))
+    state.actions.items = list(data["actions"])
+    next_ids = data.get("next_ids", {})  # Absent in older snapshots
+    state.history.reserve_ids(next_ids.get("history", 1))
+    state.reminders.reserve_ids(next_ids.get("reminders", 1))
+
+# CULTFIT_STORAGE picks the backend:
+#   wal    - WAL + snapshot files, one process (default, `python app.py`)
+#   sqlite - op log shared through DATA_DIR/state.db, so several workers see
+#            the same state, e.g. gunicorn -k gthread --threads 8 -w 4 app:app
+#            (no --preload: each worker opens its own connections)
+# In sqlite mode changes made by other workers are applied before each
+# request; /api/events subscribers get a resync for them, since change events
+# are only published by the worker that made the change.
+# CULTFIT_LOCK_STRIPES sets how many locks the WAL backend spreads users over.
+STORAGE_BACKEND = os.environ.get("CULTFIT_STORAGE", "wal")
+SNAPSHOT_EVERY = int(os.environ.get("CULTFIT_SNAPSHOT_EVERY", 10000))
+if STORAGE_BACKEND == "sqlite":
+    storage = SqliteStore(DATA_DIR, apply_op, dump_state, restore_state, snapshot_every=SNAPSHOT_EVERY,
+                          on_remote=lambda count: publish("resync", None))
+elif STORAGE_BACKEND == "wal":
+    storage = DurableStore(DATA_DIR, apply_op, dump_state, restore_state, snapshot_every=SNAPSHOT_EVERY,
+                           stripes=int(os.environ.get("CULTFIT_LOCK_STRIPES", 64)))
+else:
+    raise ValueError(f"CULTFIT_STORAGE must be 'wal' or 'sqlite', not {STORAGE_BACKEND!r}")
+user_states.get(DEFAULT_USER)  # Seeds the demo meals before replay
+storage.recover()
+atexit.register(storage.close)
+reminder_scheduler.start()
+atexit.register(reminder_scheduler.stop)
 
 # --- Routes ---
 
+@app.before_request
+def catch_up():
+    # Other workers' writes (sqlite backend); a no-op for a single process
+    storage.sync()
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({"message": "CultFit Backend Running", "status": "Active"})
@@ -343,12 +781,14 @@ def home():
 def register():
     data = request.json
     username = data.get('username')
-    # Simple check if user exists
-    if users_db.get(username):
+    if not isinstance(username, str) or not username.strip() or not data.get('password'):
+        return jsonify({"error": "username and password are required"}), 400
+    # Simple check if user exists (the default user's name is reserved)
+    if users_db.get(username) or username == DEFAULT_USER:
         return jsonify({"error": "User already exists"}), 400
     
-    users_db.put(username, data)
-    return jsonify({"message": "User registered", "username": username})
+    storage.execute("user_put", {"username": username, "data": data})
+    return jsonify({"message": "User registered", "username": username, "token": issue_session(username)})
 
 @app.route('/api/auth/login', methods=['POST'])
 def login():
@@ -356,54 +796,94 @@ def login():
     username = data.get('username')
     user = users_db.get(username)
     if user and user.get('password') == data.get('password'):
-        return jsonify({"message": "Login successful", "user": user})
+        return jsonify({"message": "Login successful", "token": issue_session(username),
+                        "user": {k: v for k, v in user.items() if k != 'password'}})
     return jsonify({"error": "Invalid credentials"}), 401
 
 # 1.1 User Profile Persistence
 @app.route('/api/user/profile', methods=['GET', 'POST'])
+@cached("profile")
 def manage_profile():
-    global current_user_profile
+    user, state = current_user(), user_state()
     if request.method == 'POST':
         data = request.json
-        current_user_profile.update(data)
-        return jsonify({"message": "Profile updated", "profile": current_user_profile})
+        storage.execute("profile_update", data, lambda _: publish("profile", user, profile=state.profile),
+                        partition=user)
+        return jsonify({"message": "Profile updated", "profile": state.profile})
     
-    return jsonify(current_user_profile)
+    return jsonify(state.profile)
 
 # 2. Search (Trie)
+# Fuzzy search costs O(query length x nodes within the edit budget), and the
+# budget widens that set exponentially, so both are capped: these endpoints
+# run on every keystroke.
+MAX_QUERY_LENGTH = 64
+MAX_FUZZY_DISTANCE = 2
+MAX_SEARCH_LIMIT = 50
+
+def bad_request(message):
+    abort(make_response(jsonify({"error": message}), 400))
+
+def search_limit():
+    # ?limit=<1..MAX_SEARCH_LIMIT>; omitted means every prefix match (fuzzy
+    # searches stop at MAX_SEARCH_LIMIT, see search_trie)
+    limit = request.args.get('limit')
+    if limit is None:
+        return None
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_SEARCH_LIMIT:
+        bad_request(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+    return int(limit)
+
+def search_trie(trie, query, limit):
+    # ?fuzzy=true picks an edit budget from the query length, ?fuzzy=<n> sets it
+    if len(query) > MAX_QUERY_LENGTH:
+        bad_request(f"q must be at most {MAX_QUERY_LENGTH} characters")
+    fuzzy = request.args.get('fuzzy', '').lower()
+    if fuzzy in ('', '0', 'false', 'no'):
+        return trie.search_prefix(query, limit)
+    max_dist = int(fuzzy) if fuzzy.isdigit() else None
+    if max_dist is not None and max_dist > MAX_FUZZY_DISTANCE:
+        bad_request(f"fuzzy must be at most {MAX_FUZZY_DISTANCE}")
+    # A short query within the budget matches the whole catalogue: always rank only a page
+    return trie.search_fuzzy(query, max_dist, limit or MAX_SEARCH_LIMIT)
+
 @app.route('/api/search/exercise', methods=['GET'])
+@cached("exercise_search")
 def search_exercise():
     query = request.args.get('q', '')
-    results = exercise_trie.search_prefix(query)
+    limit = search_limit()
+    results = search_trie(exercise_trie, query, limit)
     return jsonify({"results": results})
 
 @app.route('/api/search/food', methods=['GET'])
+@cached("food_search")
 def search_food():
     query = request.args.get('q', '')
-    result_names = food_trie.search_prefix(query)
+    limit = search_limit()
+    result_names = search_trie(food_trie, query, limit)
     
-    # Enrich results with database details
+    # Enrich results with catalogue details, built only for the items returned
     rich_results = []
     for name in result_names:
-        if name in food_database:
-            item = food_database[name].copy()
-            item['name'] = name # Ensure name is included
-            rich_results.append(item)
-        else:
+        item = food_catalogue.get(name)
+        if item is None:
             # Fallback for old items not in DB (shouldn't happen if initialized correctly)
-            rich_results.append({"name": name, "cals": 0, "p": 0, "c": 0, "f": 0})
+            item = {"name": name, "cals": 0, "p": 0, "c": 0, "f": 0}
+        rich_results.append(item)
             
     return jsonify({"results": rich_results})
 
 # Unified Search
 @app.route('/api/search/all', methods=['GET'])
+@cached("exercise_search", "food_search")
 def search_all():
     query = request.args.get('q', '')
     if not query:
         return jsonify({"exercises": [], "food": []})
         
-    exercises = exercise_trie.search_prefix(query)
-    food = food_trie.search_prefix(query)
+    limit = search_limit()
+    exercises = search_trie(exercise_trie, query, limit)
+    food = search_trie(food_trie, query, limit)
     
     return jsonify({
         "exercises": exercises,
@@ -412,149 +892,540 @@ def search_all():
 
 # HashMap for Links
 @app.route('/api/exercise/link', methods=['GET'])
+@cached("exercise_search")  # Tier 2 reads trie popularity
 def get_exercise_link():
-    name = request.args.get('name', '').strip()
-    if not name: return jsonify({"link": ""})
-    
-    name_lower = name.lower()
-    
-    # 1. Exact or Case-Insensitive Match (Highest Priority)
-    link = exercise_video_map.get(name) or next((v for k, v in exercise_video_map.items() if k.lower() == name_lower), None)
-    if link:
-        return jsonify({"link": link})
-    
-    # 2. Trie-Based Prefix Matching (User Suggestion)
-    # Use the Trie search_prefix to find valid canonical names
-    potential_matches = exercise_trie.search_prefix(name)
-    if potential_matches:
-        # If there's a match, get the video for the first suggestion
-        best_match = potential_matches[0]
-        link = exercise_video_map.get(best_match)
-        if link:
-            return jsonify({"link": link, "matched_via": "Trie Prefix", "suggestion": best_match})
-
-    # 3. Keyword/Partial Match (Smart Logic)
-    # Check if any known exercise key is contained within the user's title
-    sorted_keys = sorted(exercise_video_map.keys(), key=len, reverse=True)
-    for key in sorted_keys:
-        if key.lower() in name_lower:
-            return jsonify({"link": exercise_video_map[key], "matched_keyword": key})
-    
-    # 4. In-reverse Keyword Match (Any word in title matches an exercise)
-    title_words = name_lower.split()
-    for word in title_words:
-        if len(word) < 3: continue # Skip short words
-        match = next((v for k, v in exercise_video_map.items() if word in k.lower()), None)
-        if match:
-            return jsonify({"link": match, "matched_via": "Word Match"})
-
-    # 5. Fallback to general YouTube search
-    search_link = f"https://www.youtube.com/results?search_query={name.replace(' ', '+')}+tutorial"
-    return jsonify({"link": search_link, "fallback": True})
+    return jsonify(link_resolver.resolve(request.args.get('name', '')))
+
+MAX_LINK_NAMES = 100
+
+@app.route('/api/exercise/links', methods=['POST'])
+def get_exercise_links():
+    # Batch variant: {"names": [...]} -> {"links": [...]} in the same order
+    body = request.get_json(silent=True)
+    names = body.get('names', []) if isinstance(body, dict) else None
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        bad_request("names must be a list of strings")
+    if len(names) > MAX_LINK_NAMES:
+        bad_request(f"at most {MAX_LINK_NAMES} names per request")
+    return jsonify({"links": link_resolver.resolve_many(names)})
 
 # Nutrition Log Persistence
 @app.route('/api/nutrition', methods=['GET', 'POST'])
+@cached("nutrition")
 def handle_nutrition():
+    user, state = current_user(), user_state()
     if request.method == 'POST':
         item = request.json
-        nutrition_log.append(item)
+        item.setdefault('timestamp', datetime.datetime.now().isoformat())
+        storage.execute("nutrition_add", item, lambda _: publish(
+            "nutrition_add", user, item=item, index=len(state.nutrition_log) - 1, summary=state.summary.to_dict()),
+            partition=user)
         return jsonify({"message": "Food added to log"})
     
-    return jsonify({"log": nutrition_log})
+    return jsonify({"log": state.nutrition_log})
 
 @app.route('/api/nutrition/<int:index>', methods=['DELETE'])
 def delete_nutrition(index):
-    if 0 <= index < len(nutrition_log):
-        nutrition_log.pop(index)
-        return jsonify({"message": "Item deleted"})
-    return jsonify({"error": "Invalid index"}), 400
+    user, state = current_user(), user_state()
+    item = storage.execute("nutrition_delete", {"index": index}, lambda item: item is not None and publish(
+        "nutrition_delete", user, item=item, index=index, summary=state.summary.to_dict()), partition=user)
+    if item is None:
+        return jsonify({"error": "Invalid index"}), 400
+    return jsonify({"message": "Item deleted"})
 
 # 3. History (Linked List)
 @app.route('/api/history', methods=['GET', 'POST'])
+@cached("history")
 def handle_history():
+    user, state = current_user(), user_state()
     if request.method == 'POST':
-        data = request.json
+        data = {k: v for k, v in request.json.items() if k != 'id'}  # Ids are assigned on insert
         data['timestamp'] = datetime.datetime.now().isoformat()
-        workout_history.append(data)
-        return jsonify({"message": "Workout logged"})
+        data['minutes'] = parse_minutes(data.get('duration'))  # Parsed once, here
+        storage.execute("history_add", data, lambda _: publish(
+            "history_add", user, entry=data, summary=state.summary.to_dict()), partition=user)
+        return jsonify({"message": "Workout logged", "id": data['id']})
     
-    return jsonify({"history": workout_history.get_history()})
+    args = request.args
+    if not any(p in args for p in ('after', 'limit', 'from', 'to')):
+        return jsonify({"history": state.history.get_history()})
+
+    # Paged: ?after=<cursor>&limit=&from=&to=&order=desc, cost depends on limit only
+    after = args.get('after')
+    if after is not None and not after.isdigit():
+        return jsonify({"error": "Invalid cursor"}), 400
+    try:
+        page, next_cursor = state.history.query(
+            start=args.get('from'),
+            end=args.get('to'),
+            after=None if after is None else int(after),
+            limit=min(args.get('limit', 50, type=int), 500),
+            reverse=args.get('order') == 'desc',
+        )
+    except KeyError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    return jsonify({"history": page, "next_cursor": next_cursor})
+
+@app.route('/api/history/<int:entry_id>', methods=['DELETE'])
+def delete_history(entry_id):
+    user, state = current_user(), user_state()
+    entry = storage.execute("history_delete", {"id": entry_id}, lambda entry: entry is not None and publish(
+        "history_delete", user, id=entry_id, summary=state.summary.to_dict()), partition=user)
+    if entry is None:
+        return jsonify({"error": "Invalid id"}), 404
+    return jsonify({"message": "Workout deleted"})
+
+# 3.1 Bulk ingest for wearable / import sync: POST a JSON array, or NDJSON
+# (Content-Type: application/x-ndjson) streamed line by line. Records are
+# checked one at a time and stored INGEST_CHUNK at a time - one lock
+# acquisition, log record, aggregate update and change event per chunk - so
+# memory stays flat however large the body is. Bad records are reported by
+# index and skipped; the rest still go in.
+INGEST_CHUNK = 1000
+MAX_REPORTED_ERRORS = 1000
+
+def number_field(record, field, required=False):
+    value = record.get(field)
+    if value is None:
+        if required:
+            raise ValueError(f"{field} is required")
+        return
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)) \
+            or isinstance(value, str) and not re.search(r"\d", value):
+        raise ValueError(f"{field} must be a number")
+    if parse_number(value) < 0:
+        raise ValueError(f"{field} must not be negative")
+
+def record_timestamp(record, now):
+    value = record.get("timestamp")
+    if value is None:
+        return now
+    try:
+        datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError("timestamp must be an ISO 8601 date/time")
+    return str(value)
+
+def validate_workout(record, now):
+    if not isinstance(record, dict):
+        raise ValueError("record must be an object")
+    title = record.get("title")
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError("title is required")
+    number_field(record, "calories")
+    entry = {k: v for k, v in record.items() if k != "id"}  # Ids are assigned on insert
+    entry["timestamp"] = record_timestamp(record, now)
+    entry["minutes"] = parse_minutes(record.get("duration"))
+    return entry
+
+def validate_meal(record, now):
+    if not isinstance(record, dict):
+        raise ValueError("record must be an object")
+    name = record.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("name is required")
+    number_field(record, "cals", required=True)
+    for field in ("p", "c", "f"):
+        number_field(record, field)
+    item = dict(record)
+    item["timestamp"] = record_timestamp(record, now)
+    return item
+
+def ingest(op, field, validate, event_type):
+    user, state = current_user(), user_state()
+    now = datetime.datetime.now().isoformat()  # One timestamp for the whole batch
+    accepted, rejected, errors, chunk = 0, 0, [], []
+
+    def store(records):
+        storage.execute(op, {field: records}, lambda _: publish(
+            event_type, user, added=len(records), summary=state.summary.to_dict()), partition=user)
+
+    malformed = None
+    try:
+        for index, record in iter_records(request.stream, request.mimetype):
+            try:
+                if isinstance(record, ValueError):
+                    raise record  # NDJSON line that isn't JSON
+                chunk.append(validate(record, now))
+            except ValueError as e:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"index": index, "error": str(e)})
+                continue
+            if len(chunk) == INGEST_CHUNK:
+                store(chunk)
+                accepted += len(chunk)
+                chunk = []
+    except MalformedBody as e:
+        malformed = str(e)
+    if chunk:
+        store(chunk)
+        accepted += len(chunk)
+
+    body = {"accepted": accepted, "rejected": rejected, "errors": errors}
+    if rejected > len(errors):
+        body["errors_truncated"] = True
+    if malformed:
+        # Records read before the syntax error are kept
+        body["error"] = f"Malformed body: {malformed}"
+        return jsonify(body), 400
+    return jsonify(body)
+
+@app.route('/api/history/batch', methods=['POST'])
+def history_batch():
+    return ingest("history_add_batch", "entries", validate_workout, "history_batch")
+
+@app.route('/api/nutrition/batch', methods=['POST'])
+def nutrition_batch():
+    return ingest("nutrition_add_batch", "items", validate_meal, "nutrition_batch")
+
+# 3.2 Export: /api/export?format=ndjson|csv&from=&to=&kind=history|nutrition
+# Streamed from a generator: history is walked a page of list nodes at a time
+# (each page read under the user's lock, which is released while it is sent).
+# The nutrition log has no stable key - meals are addressed by position - so
+# it is copied under the lock once (a list of references, not the meals) and
+# streamed from that copy; a concurrent delete cannot make it skip or repeat
+# a meal. Output is flushed every EXPORT_FLUSH bytes - gzip-compressed on the
+# fly when the client accepts it. from/to match timestamps
+# like /api/history: to=2024-05-01 covers that whole day.
+EXPORT_PAGE = 500
+EXPORT_FLUSH = 64 * 1024
+EXPORT_KINDS = ("history", "nutrition")
+EXPORT_COLUMNS = ("kind", "id", "timestamp", "title", "duration", "minutes", "calories",
+                  "name", "cals", "p", "c", "f")
+
+def export_history(user, state, start, end):
+    cursor, last_key, seen = None, None, set()
+    while True:
+        def page():
+            try:
+                return state.history.query(start=start, end=end, after=cursor, limit=EXPORT_PAGE)
+            except KeyError:
+                # The cursor entry was deleted meanwhile: resume from its timestamp
+                entries, more = state.history.query(start=last_key, end=end, limit=EXPORT_PAGE + len(seen))
+                entries = [e for e in entries if e.get("timestamp") != last_key or e["id"] not in seen]
+                return entries[:EXPORT_PAGE], more or len(entries) > EXPORT_PAGE
+        entries, more = storage.read(page, partition=user)
+        for entry in entries:
+            if entry.get("timestamp") != last_key:
+                last_key, seen = entry.get("timestamp"), set()
+            seen.add(entry["id"])
+            yield entry
+        if not more or not entries:
+            return
+        cursor = entries[-1]["id"]
+
+def export_nutrition(user, state, start, end):
+    end_key = None if end is None else end + "\uffff"
+    log = storage.read(lambda: list(state.nutrition_log), partition=user)
+    for item in log:
+        timestamp = str(item.get("timestamp", ""))
+        if (start is None or timestamp >= start) and (end_key is None or timestamp < end_key):
+            yield item
+
+def export_rows(user, state, kinds, start, end):
+    for kind in kinds:
+        source = export_history if kind == "history" else export_nutrition
+        for record in source(user, state, start, end):
+            yield kind, record
+
+def export_chunks(rows, fmt, compress):
+    # Encoded lines are gathered into EXPORT_FLUSH-sized chunks before each yield
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_COLUMNS, extrasaction="ignore") if fmt == "csv" else None
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits 31: gzip framing
+
+    def flush():
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return gzip.compress(data) if gzip else data
+
+    if writer:
+        writer.writeheader()
+    for kind, record in rows:
+        if writer:
+            writer.writerow(dict(record, kind=kind))
+        else:
+            buffer.write(json.dumps({"kind": kind, **record}))
+            buffer.write("\n")
+        if buffer.tell() >= EXPORT_FLUSH:
+            chunk = flush()
+            if chunk:
+                yield chunk
+    chunk = flush()
+    if gzip:
+        chunk += gzip.flush()
+    if chunk:
+        yield chunk
+
+@app.route('/api/export', methods=['GET'])
+def export():
+    user, state = current_user(), user_state()
+    args = request.args
+    fmt = args.get('format', 'ndjson')
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    kinds = args.get('kind').split(',') if args.get('kind') else EXPORT_KINDS
+    if any(kind not in EXPORT_KINDS for kind in kinds):
+        return jsonify({"error": f"kind must be one of {', '.join(EXPORT_KINDS)}"}), 400
+    compress = request.accept_encodings["gzip"] > 0
+    rows = export_rows(user, state, kinds, args.get('from'), args.get('to'))
+    response = Response(stream_with_context(export_chunks(rows, fmt, compress)),
+                        mimetype="text/csv" if fmt == "csv" else "application/x-ndjson")
+    response.headers['Content-Disposition'] = f'attachment; filename="cultfit-export.{fmt}"'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+# Change feed for the request's user: ?types=profile,nutrition_add,... filters;
+# Last-Event-ID resumes
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    types = request.args.get('types')
+    return event_stream(set(types.split(',')) if types else None)
+
+# Kept for clients that only want due reminders
+@app.route('/api/reminders/stream', methods=['GET'])
+def stream_reminders():
+    return event_stream({"reminder_due"})
+
+def event_stream(types):
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+    subscriber = event_bus.subscribe(types, int(last_id) if last_id and last_id.isdigit() else None,
+                                     partition=current_user())
+
+    def frames():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = subscriber.get(timeout=15)
+                yield event[2] if event else ": keep-alive\n\n"
+        finally:
+            event_bus.unsubscribe(subscriber)
+
+    return Response(stream_with_context(frames()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Bootstrap: a page's reads in one round trip, e.g.
+# /api/bootstrap?include=profile,summary,reminders
+# Each resource has the same body as its own endpoint. They are read under the
+# user's lock, so they form one consistent snapshot, and `event_id` is the last
+# change it reflects: open /api/events?last_id=<event_id> to get every later one.
+BOOTSTRAP_RESOURCES = {
+    "profile": (("profile",), lambda state: state.profile),
+    "summary": (("nutrition", "history"), lambda state: state.summary.to_dict()),
+    "nutrition": (("nutrition",), lambda state: {"log": state.nutrition_log}),
+    "history": (("history",), lambda state: {"history": state.history.get_history()}),
+    "reminders": (("reminders",), lambda state: reminders_body(state)),
+    "undo": (("actions",), lambda state: {"stack": state.actions.items[::-1]}),
+}
+
+@app.route('/api/bootstrap', methods=['GET'])
+def bootstrap():
+    include = request.args.get('include')
+    names = sorted(set(include.split(','))) if include else sorted(BOOTSTRAP_RESOURCES)
+    unknown = [name for name in names if name not in BOOTSTRAP_RESOURCES]
+    if unknown:
+        return jsonify({"error": f"Unknown resources: {', '.join(unknown)}",
+                        "available": sorted(BOOTSTRAP_RESOURCES)}), 400
+    stores = sorted({store for name in names for store in BOOTSTRAP_RESOURCES[name][0]})
+    user, state = current_user(), user_state()
+    keys = store_keys(user, stores)
+    etag = versions_etag(user, keys)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+
+    def snapshot():
+        # Serialized once per store versions; event_id is spliced in per call
+        key = ("bootstrap", user, tuple(names), store_versions.get(*keys))
+        body = response_cache.get(key)
+        if body is None:
+            body = app.json.dumps({name: BOOTSTRAP_RESOURCES[name][1](state) for name in names}).encode()
+            response_cache.put(key, body, len(body))
+        return event_bus.seq, body
+
+    event_id, body = storage.read(snapshot, partition=user)
+    response = Response(b'{"event_id": %d, ' % event_id + body[1:], mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Dashboard totals, maintained in O(1) by every history/nutrition mutation
+@app.route('/api/dashboard/summary', methods=['GET'])
+@cached("nutrition", "history")
+def dashboard_summary_view():
+    return jsonify(user_state().summary.to_dict())
+
+# Trends: /api/trends?metric=calories&granularity=week&from=2024-01-01&to=2024-12-31
+@app.route('/api/trends', methods=['GET'])
+@cached("nutrition", "history")
+def get_trends():
+    args = request.args
+    metric = args.get('metric', 'calories')
+    granularity = args.get('granularity', 'day')
+    try:
+        points = user_state().trends.series(metric, granularity, args.get('from'), args.get('to'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "metric": metric,
+        "granularity": granularity,
+        "points": [{"period": period, "value": value} for period, value in points]
+    })
 
 # 4. Reminders (Max Heap)
 @app.route('/api/reminders', methods=['GET', 'POST'])
+@cached("reminders")
 def handle_reminders():
+    user, state = current_user(), user_state()
     if request.method == 'POST':
         data = request.json
         priority = data.get('priority', 1)
+        if not is_priority(priority):
+            return jsonify({"error": "priority must be a number"}), 400
         message = data.get('message')
-        reminder_heap.push((priority, message))
-        return jsonify({"message": "Reminder added"})
+        payload = {"priority": priority, "message": message}
+        if data.get('due'):
+            try:
+                parse_due(data['due'])
+                parse_repeat(data.get('repeat'))
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": f"Invalid schedule: {e}"}), 400
+            payload["due"] = data['due']
+            payload["repeat"] = data.get('repeat')
+        storage.execute("reminder_push", payload,
+                        lambda _: publish_reminder(state, "reminder_add", state.reminders.get(payload["id"])),
+                        partition=user)
+        return jsonify({"message": "Reminder added", "id": payload["id"]})
     
-    # Peek at most urgent
-    next_urgent = reminder_heap.peek()
-    return jsonify({
-        "urgent": next_urgent,
-        "all_reminders": sorted(reminder_heap.heap, key=lambda x: x[0], reverse=False) # Ascending for Min Heap
-    })
+    return jsonify(reminders_body(state, request.args.get('limit', 50, type=int)))
+
+def is_priority(value):
+    # The heap negates priorities to rank them: numbers only, and no NaN/inf
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def reminders_body(state, limit=50):
+    # Top-k straight off the heap (O(k log k)), most urgent first
+    top = [reminder_view(state, item) for item in state.reminders.top_k(limit)]
+    return {
+        "urgent": top[0] if top else None,
+        "all_reminders": top
+    }
+
+def reminder_view(state, item):
+    # [priority, message, id, schedule]: same leading pair the frontend already reads
+    item_id, priority, message = item
+    return [priority, message, item_id, state.reminder_schedule.get(item_id)]
+
+def publish_reminder(state, event_type, item):
+    # Carry the new head too so clients can update the urgent badge in place
+    urgent = state.reminders.peek()
+    publish(event_type, state.user, reminder=reminder_view(state, item),
+            urgent=reminder_view(state, urgent) if urgent else None)
+
+@app.route('/api/reminders/<int:reminder_id>', methods=['PUT', 'DELETE'])
+def manage_reminder(reminder_id):
+    # The ops check the id under the user's lock and are no-ops when it is gone
+    user, state = current_user(), user_state()
+    if request.method == 'DELETE':
+        item = storage.execute("reminder_remove", {"id": reminder_id},
+                               lambda item: item and publish_reminder(state, "reminder_remove", item), partition=user)
+        if item is None:
+            return jsonify({"error": "Invalid id"}), 404
+        return jsonify({"message": "Reminder removed"})
+    priority = (request.json or {}).get('priority')
+    if priority is None:
+        return jsonify({"error": "priority is required"}), 400
+    if not is_priority(priority):
+        return jsonify({"error": "priority must be a number"}), 400
+    updated = storage.execute("reminder_update", {"id": reminder_id, "priority": priority},
+                              lambda updated: updated and publish_reminder(
+                                  state, "reminder_update", state.reminders.get(reminder_id)),
+                              partition=user)
+    if not updated:
+        return jsonify({"error": "Invalid id"}), 404
+    return jsonify({"message": "Reminder updated"})
 
 # Stack Visualizer Endpoint
 @app.route('/api/undo/all', methods=['GET'])
+@cached("actions")
 def get_stack():
     return jsonify({
-        "stack": action_stack.items[::-1] # Return reversed list (Top of stack first)
+        "stack": user_state().actions.items[::-1] # Return reversed list (Top of stack first)
     })
 
 @app.route('/api/reminders/pop', methods=['POST'])
 def pop_reminder():
-    reminder = reminder_heap.pop()
-    return jsonify({"completed": reminder})
+    user, state = current_user(), user_state()
+    reminder = storage.execute("reminder_pop", {},
+                               lambda item: item and publish_reminder(state, "reminder_remove", item), partition=user)
+    return jsonify({"completed": reminder_view(state, reminder) if reminder else None})
 
 # 5. Recommendations (Graph)
 @app.route('/api/exercise/bundle', methods=['GET'])
+@cached()
 def get_workout_bundle():
     name = request.args.get('name', '').strip()
     if not name: return jsonify({"bundle": []})
-    
-    # 1. Find the category for this exercise
-    category = None
-    for cat in ["Strength", "Cardio", "Flexibility"]:
-        if name.lower() in [ex.lower() for ex in recommendation_graph.adj_list.get(cat, [])]:
-            category = cat
-            break
-    
-    if not category:
-        # Fallback: check case-insensitive match for category itself
-        for cat in recommendation_graph.adj_list.keys():
-            if cat.lower() == name.lower():
-                category = cat
-                break
-                
-    if category:
-        # 2. Get 3 other exercises from the same category
-        bundle = [ex for ex in recommendation_graph.adj_list[category] if ex.lower() != name.lower()]
+
+    # Reverse index (exercise -> categories) kept by the graph as edges are added
+    categories, bundle = recommendation_graph.bundle(name, size=3)
+    if categories:
         return jsonify({
-            "category": category,
-            "bundle": bundle[:3] # Suggest top 3
+            "category": categories[0],
+            "categories": categories,
+            "bundle": bundle # Suggest top 3, shared picks first
         })
-    
+
     return jsonify({"bundle": []})
 
 @app.route('/api/recommendations/<category>', methods=['GET'])
+@cached("exercise_search")  # The graph learns from every user's history
 def get_recommendations(category):
-    # BFS to find related items
-    recs = recommendation_graph.bfs(category)
-    return jsonify({"recommendations": recs})
+    if category in recommendation_graph.adj_list or category not in exercise_graph.ids:
+        # BFS to find related items
+        recs = recommendation_graph.bfs(category)
+        return jsonify({"recommendations": recs})
+    # An exercise: what is usually done alongside it
+    k = min(request.args.get('k', 10, type=int), 100)
+    return jsonify({"recommendations": [name for name, _ in exercise_graph.recommend([category], k)]})
+
+# Personalized: PageRank seeded by the user's recent workouts (newer weigh more)
+# /api/recommendations?k=10 or ?exercise=Squat to seed a single exercise
+@app.route('/api/recommendations', methods=['GET'])
+@cached("history", "exercise_search")
+def get_personal_recommendations():
+    k = min(request.args.get('k', 10, type=int), 100)
+    exercise = request.args.get('exercise')
+    if exercise:
+        seeds = {exercise: 1.0}
+    else:
+        recent, _ = user_state().history.query(limit=20, reverse=True)
+        seeds = {}
+        for i, entry in enumerate(recent):
+            title = str(entry.get('title') or '').strip()
+            if title:
+                seeds[title] = seeds.get(title, 0) + 0.9 ** i
+    recs = exercise_graph.recommend(seeds, k)
+    return jsonify({
+        "recommendations": [{"exercise": name, "score": score} for name, score in recs],
+        "based_on": sorted(seeds, key=seeds.get, reverse=True)
+    })
 
 # 6. Undo (Stack)
 @app.route('/api/undo/push', methods=['POST'])
 def push_action():
     data = request.json
-    action_stack.push(data)
+    storage.execute("undo_push", data, partition=current_user())
     return jsonify({"message": "Action pushed"})
 
 @app.route('/api/undo/pop', methods=['POST'])
 def pop_action():
-    action = action_stack.pop()
+    action = storage.execute("undo_pop", {}, partition=current_user())
     if action:
         return jsonify({"undone": action})
     return jsonify({"message": "Nothing to undo"}), 400
@@ -585,68 +1456,111 @@ health_advice = {
 
 # --- Smart AI Brain Logic (Enhanced) ---
 class SmartBrain:
-    def __init__(self, food_db, exercise_graph, motivational_quotes, health_advice):
+    """
+    Built once at startup. Every phrase the brain reacts to - intents,
+    moods and food/exercise names - is compiled into one Aho-Corasick
+    automaton, so a query is read in a single O(query length) pass; the
+    food picks for protein / weight-loss answers are bucketed up front.
+    """
+
+    STOPWORDS = frozenset({"i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", "your", "yours", "yourself", "yourselves", "he", "him", "his", "himself", "she", "her", "hers", "herself", "it", "its", "itself", "they", "them", "their", "theirs", "themselves", "what", "which", "who", "whom", "this", "that", "these", "those", "am", "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "having", "do", "does", "did", "doing", "a", "an", "the", "and", "but", "if", "or", "because", "as", "until", "while", "of", "at", "by", "for", "with", "about", "against", "between", "into", "through", "during", "before", "after", "above", "below", "to", "from", "up", "down", "in", "out", "on", "off", "over", "under", "again", "further", "then", "once", "here", "there", "when", "where", "why", "how", "all", "any", "both", "each", "few", "more", "most", "other", "some", "such", "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very", "s", "t", "can", "will", "just", "don", "should", "now", "want", "wanna", "need", "help", "please", "tell", "show", "give", "get", "find"})
+
+    # Checked in this order; the first phrase found in the query wins
+    INTENTS = {
+        "motivation": "motivation", "quote": "motivation", "motivate": "motivation",
+        "protein": "protein", "protien": "protein",
+        "weight loss": "weight_loss", "fat loss": "weight_loss",
+        "exercise": "fitness", "workout": "fitness", "fitness": "fitness", "goal": "fitness",
+    }
+    MOODS = {
+        "sad": "Flexibility", "depressed": "Flexibility", "bored": "Cardio",
+        "not interested": "Cardio", "intrested": "Cardio", "lazy": "HIIT",
+        "stressed": "Flexibility", "anxious": "Flexibility", "angry": "Strength"
+    }
+    HIGH_PROTEIN = 15   # g protein
+    LOW_CALORIE = 100   # kcal
+
+    def __init__(self, food_db, exercise_graph, motivational_quotes, health_advice, exercise_names=()):
         self.food_db = food_db
         self.exercise_graph = exercise_graph
         self.motivational_quotes = motivational_quotes
         self.health_advice = health_advice
-        self.stopwords = {"i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", "your", "yours", "yourself", "yourselves", "he", "him", "his", "himself", "she", "her", "hers", "herself", "it", "its", "itself", "they", "them", "their", "theirs", "themselves", "what", "which", "who", "whom", "this", "that", "these", "those", "am", "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", "having", "do", "does", "did", "doing", "a", "an", "the", "and", "but", "if", "or", "because", "as", "until", "while", "of", "at", "by", "for", "with", "about", "against", "between", "into", "through", "during", "before", "after", "above", "below", "to", "from", "up", "down", "in", "out", "on", "off", "over", "under", "again", "further", "then", "once", "here", "there", "when", "where", "why", "how", "all", "any", "both", "each", "few", "more", "most", "other", "some", "such", "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very", "s", "t", "can", "will", "just", "don", "should", "now", "want", "wanna", "need", "help", "please", "tell", "show", "give", "get", "find"}
+        self.high_protein = [n for n, i in food_db.items() if i.get('p', 0) > self.HIGH_PROTEIN]
+        self.low_calorie = [n for n, i in food_db.items() if i.get('cals', 0) < self.LOW_CALORIE]
+
+        self.matcher = AhoCorasick()
+        for phrase, intent in self.INTENTS.items():
+            self.matcher.add(phrase, ("intent", intent))
+        for order, mood in enumerate(self.MOODS):
+            self.matcher.add(mood, ("mood", order))
+        for name in list(food_db) + list(exercise_names):
+            self.matcher.add(name.lower(), ("entity", name))
+        self.matcher.build()
+
+    def scan(self, q):
+        """O(len(q)) One pass: (intents found, first mood by priority, entities in query order)"""
+        # Entities must start a significant word, like the old per-token trie lookups
+        word_starts = set()
+        for word in re.finditer(r"\S+", q):
+            token = word.group().strip("?!.,")
+            if len(token) > 1 and token not in self.STOPWORDS:
+                word_starts.add(word.start() + word.group().index(token))
+        intents, mood, entities = set(), None, []
+        for start, end, (kind, value) in self.matcher.iter_matches(q):
+            if kind == "intent":
+                intents.add(value)
+            elif kind == "mood":
+                mood = value if mood is None else min(mood, value)
+            elif start in word_starts:
+                entities.append((start, start - end, value))
+        # Query order; a name inside a longer one ("bench press" in "decline bench press") is skipped
+        found, covered = [], 0
+        for start, neg_len, name in sorted(entities):
+            if start - neg_len <= covered or name in found:
+                continue
+            found.append(name)
+            covered = start - neg_len
+        mood = list(self.MOODS)[mood] if mood is not None else None
+        return intents, mood, found
 
     def process(self, query):
-        import random
         q = query.lower().strip()
-        tokens = [t.strip("?!.,") for t in q.split()]
-        sig_tokens = [t for t in tokens if t not in self.stopwords and len(t) > 1]
-        
-        response_parts = []
+        intents, mood, found = self.scan(q)
 
         # 1. High Priority: Motivation
-        if "motivation" in q or "quote" in q or "motivate" in q:
+        if "motivation" in intents:
             quote = random.choice(self.motivational_quotes)
             return f"### Motivation\n> \"{quote}\""
 
         # 2. Emotional / Mood (Shortened)
-        moods = {
-            "sad": "Flexibility", "depressed": "Flexibility", "bored": "Cardio",
-            "not interested": "Cardio", "intrested": "Cardio", "lazy": "HIIT",
-            "stressed": "Flexibility", "anxious": "Flexibility", "angry": "Strength"
-        }
-        for mood, cat in moods.items():
-            if mood in q:
-                recs = self.exercise_graph.adj_list.get(cat, exercises[:5])
-                suggested = random.sample(recs, min(2, len(recs)))
-                parts = [f"### Support\nFeeling {mood}? Let's shift that."]
-                parts.append(f"**Try {cat}**: {', '.join(suggested)}.")
-                parts.append(f"> \"{random.choice(self.motivational_quotes)}\"")
-                return "\n\n".join(parts)
+        if mood:
+            cat = self.MOODS[mood]
+            recs = self.exercise_graph.adj_list.get(cat, exercises[:5])
+            suggested = random.sample(recs, min(2, len(recs)))
+            parts = [f"### Support\nFeeling {mood}? Let's shift that."]
+            parts.append(f"**Try {cat}**: {', '.join(suggested)}.")
+            parts.append(f"> \"{random.choice(self.motivational_quotes)}\"")
+            return "\n\n".join(parts)
 
         # 3. Nutrition Goals (Concise)
-        if "protein" in q or "protien" in q:
-            p_foods = [n for n, i in self.food_db.items() if i.get('p', 0) > 15]
-            picks = random.sample(p_foods, min(3, len(p_foods)))
+        if "protein" in intents:
+            picks = random.sample(self.high_protein, min(3, len(self.high_protein)))
             res = ["### High Protein Picks"]
             for f in picks: res.append(f"• **{f}**: {self.food_db[f]['p']}g P")
             return "\n".join(res)
-        
-        if "weight loss" in q or "fat loss" in q:
-            lc_foods = [n for n, i in self.food_db.items() if i.get('cals', 0) < 100]
-            picks = random.sample(lc_foods, min(3, len(lc_foods)))
+
+        if "weight_loss" in intents:
+            picks = random.sample(self.low_calorie, min(3, len(self.low_calorie)))
             res = ["### Weight Loss Tips"]
             for f in picks: res.append(f"• **{f}**: {self.food_db[f]['cals']} kcal")
             return "\n".join(res)
 
         # 4. Fitness Goals / Exercises
-        if "exercise" in q or "workout" in q or "fitness" in q or "goal" in q:
+        if "fitness" in intents:
             recs = random.sample(["Pushups", "Running", "Plank", "Squats", "Yoga"], 3)
             return f"### Fitness Suggestion\nTo reach your goal, try: **{', '.join(recs)}**.\nConsistency is key!"
 
         # 5. Specific Lookup
-        found = []
-        for t in sig_tokens:
-            matches = food_trie.search_prefix(t) + exercise_trie.search_prefix(t)
-            for m in matches:
-                if m.lower() in q and m not in found: found.append(m)
-        
         if found:
             res = ["### Insights"]
             for e in found[:2]:
@@ -659,13 +1573,19 @@ class SmartBrain:
         # 6. Fallback (Menu)
         return "### I can help with:\n• **Nutrition**: Ask about calories/protein.\n• **Workouts**: Tell me your mood or goal.\n• **Motivation**: Just say 'motivate me'!"
 
+smart_brain = Lazy(lambda: SmartBrain(food_database, recommendation_graph.value(), motivational_quotes, health_advice,
+                                      exercises))
+
+if os.environ.get("CULTFIT_EAGER_INDEXES") == "1":
+    for index in (food_catalogue, exercise_trie, food_trie, link_resolver, recommendation_graph, smart_brain):
+        index.value()
+
 @app.route('/api/ai/chat', methods=['POST'])
 def ai_chat():
     data = request.json
     query = data.get('query', '')
     
-    brain = SmartBrain(food_database, recommendation_graph, motivational_quotes, health_advice)
-    response_text = brain.process(query)
+    response_text = smart_brain.process(query)
     
     return jsonify({
         "response": response_text
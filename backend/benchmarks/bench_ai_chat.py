@@ -0,0 +1,71 @@
+"""
+Throughput of /api/ai/chat over a mix of queries, and what the shared
+SmartBrain saves: answering with the startup instance versus building a
+fresh one per request (what ai_chat used to do).
+
+    cd backend && python -m benchmarks.bench_ai_chat --requests 5000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("CULTFIT_DATA_DIR", tempfile.mkdtemp(prefix="cultfit-bench-"))
+
+import app as server  # noqa: E402
+
+QUERIES = (
+    "I need some motivation today",
+    "give me a good quote",
+    "what are high protein foods?",
+    "best protien snacks please",
+    "tips for weight loss",
+    "I feel sad and lazy",
+    "not interested in training",
+    "tell me about egg whites and oats",
+    "how do I do a decline bench press",
+    "suggest a workout for my goal",
+    "paneer tikka or grilled chicken for dinner",
+    "hello there",
+)
+
+
+def per_query(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    queries = [rng.choice(QUERIES) for _ in range(args.requests)]
+    brain = server.smart_brain
+
+    def fresh(q):
+        return server.SmartBrain(server.food_database, server.recommendation_graph, server.motivational_quotes,
+                                 server.health_advice, server.exercises).process(q)
+
+    print(f"{'path':<34}{'us/query':>10}{'queries/s':>12}")
+    for label, fn, n in (("process (shared engine)", brain.process, len(queries)),
+                         ("process (engine per request)", fresh, max(1, len(queries) // 20))):
+        us = per_query(fn, queries[:n])
+        print(f"{label:<34}{us:>10.1f}{1e6 / us:>12.0f}")
+
+    client = server.app.test_client()
+    client.post("/api/ai/chat", json={"query": QUERIES[0]})  # Warm up
+    start = time.perf_counter()
+    for q in queries:
+        response = client.post("/api/ai/chat", json={"query": q})
+        assert response.status_code == 200
+    seconds = time.perf_counter() - start
+    print(f"{'POST /api/ai/chat':<34}{seconds / len(queries) * 1e6:>10.1f}{len(queries) / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Page-load latency over a real socket: the fan-out pattern (one GET per
+resource, fired in parallel like Promise.all) versus one /api/bootstrap
+call for the same resources.
+
+    cd backend && python -m benchmarks.bench_bootstrap --loads 200 --history 2000
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+os.environ.setdefault("CULTFIT_DATA_DIR", tempfile.mkdtemp(prefix="cultfit-bench-"))
+
+import app as server  # noqa: E402
+
+FAN_OUT = {
+    "profile": "/api/user/profile",
+    "summary": "/api/dashboard/summary",
+    "reminders": "/api/reminders",
+    "nutrition": "/api/nutrition",
+    "history": "/api/history",
+}
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loads", type=int, default=200, help="page loads per pattern")
+    parser.add_argument("--history", type=int, default=500, help="workouts and meals to seed")
+    parser.add_argument("--resources", default=",".join(FAN_OUT))
+    args = parser.parse_args()
+
+    for i in range(args.history):
+        server.storage.execute("history_add", {"title": "Squat", "duration": "20 min", "calories": 100,
+                                               "timestamp": f"2024-01-{i % 28 + 1:02d}T07:00:00"})
+        server.storage.execute("nutrition_add", {"name": "Oats", "cals": 300, "p": 10})
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_port}"
+    names = args.resources.split(",")
+    # Browsers keep about six connections per host
+    pool = ThreadPoolExecutor(max_workers=6)
+    sessions = threading.local()
+
+    def get(path):
+        if not hasattr(sessions, "s"):
+            sessions.s = requests.Session()
+        response = sessions.s.get(base + path)
+        response.raise_for_status()
+        return response.content
+
+    def fan_out():
+        return list(pool.map(get, [FAN_OUT[name] for name in names]))
+
+    def bootstrap():
+        return pool.submit(get, f"/api/bootstrap?include={','.join(names)}").result()
+
+    print(f"{'pattern':<12}{'requests':>10}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    for label, load, requests_per_load in (("fan-out", fan_out, len(names)), ("bootstrap", bootstrap, 1)):
+        load()  # Warm up connections
+        samples = []
+        for _ in range(args.loads):
+            start = time.perf_counter()
+            load()
+            samples.append((time.perf_counter() - start) * 1e3)
+        print(f"{label:<12}{requests_per_load:>10}{percentile(samples, 0.5):>10.2f}"
+              f"{percentile(samples, 0.95):>10.2f}{statistics.mean(samples):>10.2f}")
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
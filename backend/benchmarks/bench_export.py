@@ -0,0 +1,62 @@
+"""
+Peak memory of getting a user's whole history out: GET /api/history (one
+list, one jsonify) versus the streaming GET /api/export as NDJSON, CSV and
+gzip'd NDJSON. The body is consumed chunk by chunk like a client download
+would, so "peak MB" is what the server side holds at once. The export
+columns should stay flat as the history grows; /api/history grows with it.
+
+    cd backend && python -m benchmarks.bench_export --records 10000,50000,100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("CULTFIT_DATA_DIR", tempfile.mkdtemp(prefix="cultfit-bench-"))
+
+import app as server  # noqa: E402
+from benchmarks.bench_ingest import records  # noqa: E402
+
+MODES = (
+    ("/api/history", "/api/history", {}),
+    ("export ndjson", "/api/export?kind=history", {}),
+    ("export csv", "/api/export?kind=history&format=csv", {}),
+    ("export ndjson+gzip", "/api/export?kind=history", {"Accept-Encoding": "gzip"}),
+)
+
+
+def measure(client, url, headers):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    response = client.get(url, headers=headers, buffered=False)
+    size = 0
+    for chunk in response.iter_encoded():
+        size += len(chunk)
+    response.close()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (peak - before) / 1e6, size / 1e6, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", default="10000,50000", help="history sizes to compare")
+    args = parser.parse_args()
+
+    client = server.app.test_client()
+    print(f"{'records':>9}  {'mode':<20}{'peak MB':>9}{'body MB':>9}{'seconds':>9}")
+    for n in map(int, args.records.split(",")):
+        token = client.post("/api/auth/register", json={"username": f"export{n}", "password": "pw"}).get_json()["token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        response = client.post("/api/history/batch", json=list(records(n, n)), headers=headers)
+        assert response.get_json()["accepted"] == n
+        for label, url, extra in MODES:
+            peak, size, elapsed = measure(client, url, dict(headers, **extra))
+            print(f"{n:>9}  {label:<20}{peak:>9.1f}{size:>9.1f}{elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Memory and load time of a large food catalogue: the dict-of-dicts layout
+food_database uses versus FoodCatalogue built in memory (float32 columns,
+interned text) and loaded from its file (columns bulk-read, text left on
+disk). Also times indexing the names into a RadixTrie, in bulk and one
+insert() at a time, and fetching items.
+
+    cd backend && python -m benchmarks.bench_food_catalogue --items 300000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from ds_modules.food_catalogue import FoodCatalogue
+from ds_modules.radix_trie import RadixTrie
+
+WORDS = ("Chicken", "Paneer", "Rice", "Oats", "Lentil", "Spinach", "Almond", "Greek", "Grilled", "Baked",
+         "Masala", "Salad", "Soup", "Curry", "Wrap", "Bowl", "Smoothie", "Protein", "Brown", "Sweet")
+PHRASES = ("High lean protein", "Rich in fiber", "Good source of iron", "Low calorie", "Healthy fats",
+           "Vitamin C", "Complex carbohydrates", "Probiotics for gut health", "Omega-3 fatty acids")
+
+
+def catalogue_dict(n, seed=1):
+    rng = random.Random(seed)
+    items = {}
+    for i in range(n):
+        name = f"{' '.join(rng.sample(WORDS, 3))} {i}"
+        items[name] = {"cals": rng.randint(0, 900), "p": round(rng.uniform(0, 60), 1),
+                       "c": round(rng.uniform(0, 90), 1), "f": round(rng.uniform(0, 50), 1),
+                       "benefits": rng.choice(PHRASES), "control": rng.choice(PHRASES)}
+    return items
+
+
+def traced(fn):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    kept = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, kept, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300000)
+    args = parser.parse_args()
+    n = args.items
+
+    # Names are shared by every layout; measure them once and leave them out
+    source = catalogue_dict(n)
+    names = list(source)
+    rows = [(name, dict(item)) for name, item in source.items()]
+    del source
+
+    def build_dicts():
+        # Fresh copies of everything but the names, like a parsed JSON catalogue
+        return {name: {k: (v + "x")[:-1] if isinstance(v, str) else v for k, v in item.items()}
+                for name, item in rows}
+
+    dicts, dict_bytes, dict_seconds = traced(build_dicts)
+    memory, memory_bytes, memory_seconds = traced(lambda: FoodCatalogue.from_dict(dicts))
+    path = os.path.join(tempfile.mkdtemp(prefix="cultfit-catalogue-"), "foods.bin")
+    start = time.perf_counter()
+    memory.save(path)
+    save_seconds = time.perf_counter() - start
+    # Loading also builds the name list and id map, which the other rows were given for free
+    loaded, loaded_bytes, loaded_seconds = traced(lambda: FoodCatalogue.load(path))
+    name_bytes = sum(len(name) + 49 for name in names)  # str objects held by the names list
+    loaded_bytes -= name_bytes
+
+    print(f"{n} items, {os.path.getsize(path) / 1e6:.1f} MB file (saved in {save_seconds:.2f}s); names excluded")
+    print(f"{'layout':<28}{'MB':>8}{'bytes/item':>12}{'build s':>9}")
+    for label, size, seconds in (("dict of dicts", dict_bytes, dict_seconds),
+                                 ("FoodCatalogue (in memory)", memory_bytes, memory_seconds),
+                                 ("FoodCatalogue.load (file)", loaded_bytes, loaded_seconds)):
+        print(f"{label:<28}{size / 1e6:>8.1f}{size / n:>12.0f}{seconds:>9.2f}")
+
+    assert loaded.get(names[-1]) == dict(dicts[names[-1]], name=names[-1])
+    trie = RadixTrie()
+    start = time.perf_counter()
+    loaded.index(trie)
+    bulk = time.perf_counter() - start
+    trie = RadixTrie()
+    start = time.perf_counter()
+    for name in loaded.names:
+        trie.insert(name)
+    print(f"index into RadixTrie: {bulk:.2f}s bulk, {time.perf_counter() - start:.2f}s one insert() per name")
+    sample = random.Random(2).sample(names, 10000)
+    start = time.perf_counter()
+    for name in sample:
+        loaded.get(name)
+    print(f"get(): {(time.perf_counter() - start) / len(sample) * 1e6:.1f} us per item")
+    loaded.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Per-query latency of typo-tolerant search on a 300k-entry catalogue.
+
+    cd backend && python -m benchmarks.bench_fuzzy --items 300000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_trie import catalogue
+from ds_modules.radix_trie import RadixTrie
+
+
+def typo(word, rng):
+    i = rng.randrange(len(word))
+    kind = rng.choice(("swap", "drop", "double", "replace"))
+    if kind == "swap" and i + 1 < len(word):
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == "drop":
+        return word[:i] + word[i + 1:]
+    if kind == "double":
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + rng.choice("aeiourst") + word[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    trie = RadixTrie()
+    for name in catalogue(args.items):
+        trie.insert(name)
+
+    rng = random.Random(3)
+    words = sorted({w for w in " ".join(catalogue(2000)).lower().replace(",", "").split() if len(w) >= 4})
+    for length in (4, 6, 8, 12):
+        queries = [typo(rng.choice(words) + " " + rng.choice(words), rng)[:length] for _ in range(args.queries)]
+        start = time.perf_counter()
+        hits = 0
+        for q in queries:
+            hits += bool(trie.search_fuzzy(q, k=args.k))
+        elapsed = (time.perf_counter() - start) / len(queries) * 1e3
+        print(f"query length {length:>2}: {elapsed:6.2f} ms/query  ({hits}/{len(queries)} with results)")
+
+
+if __name__ == "__main__":
+    main()
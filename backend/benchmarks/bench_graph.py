@@ -0,0 +1,70 @@
+"""
+Recommendation latency of CoOccurrenceGraph on a synthetic CSR graph
+(default 100k exercises x 100 neighbours = 10M directed edges), plus the
+cost of incremental edge updates and cached repeats.
+
+    cd backend && python -m benchmarks.bench_graph --nodes 100000 --degree 100
+"""
+import argparse
+import random
+import statistics
+import time
+from array import array
+
+from ds_modules.graph import CoOccurrenceGraph
+
+
+def build(nodes, degree, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    names = [f"exercise {i}" for i in range(nodes)]
+    offsets = array("q", range(0, nodes * degree + 1, degree))
+    indices = array("i", rng.choices(range(nodes), k=nodes * degree))
+    weights = array("f", [1.0]) * (nodes * degree)
+    for i in range(0, len(weights), 7):
+        weights[i] = rng.randint(2, 20)  # A few heavier co-occurrences
+    graph = CoOccurrenceGraph.from_csr(names, offsets, indices, weights, compact_threshold=10 ** 9)
+    return graph, time.perf_counter() - start
+
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--degree", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--max-edges", type=int, default=10000, help="push budget per query")
+    args = parser.parse_args()
+
+    graph, seconds = build(args.nodes, args.degree, 7)
+    print(f"built {len(graph)} exercises / {graph.edge_count} edges in {seconds:.1f}s")
+    rng = random.Random(11)
+    names = graph.names
+
+    seeds = [({rng.choice(names): rng.randint(1, 5) for _ in range(rng.randint(1, 5))},) for _ in range(args.queries)]
+    recommend = lambda s: graph.recommend(s, k=10, max_edges=args.max_edges)  # noqa: E731
+    print(f"{'operation':<34}{'median ms':>10}{'max ms':>10}")
+    print(f"{'recommend (cold)':<34}" + "{:>10.2f}{:>10.2f}".format(*timed(recommend, seeds)))
+    print(f"{'recommend (cached)':<34}" + "{:>10.3f}{:>10.3f}".format(*timed(recommend, seeds)))
+    print(f"{'neighbors k=10':<34}" + "{:>10.3f}{:>10.3f}".format(
+        *timed(lambda n: graph.neighbors(n), [(rng.choice(names),) for _ in range(args.queries)])))
+
+    updates = [(rng.choice(names), rng.choice(names), 1) for _ in range(20000)]
+    start = time.perf_counter()
+    for a, b, w in updates:
+        graph.add_weight(a, b, w)
+    print(f"{'add_weight':<34}{(time.perf_counter() - start) / len(updates) * 1e3:>10.4f}")
+    touched = [({a: 1},) for a, _, _ in updates[:args.queries]]
+    print(f"{'recommend (with pending deltas)':<34}" + "{:>10.2f}{:>10.2f}".format(*timed(recommend, touched)))
+
+
+if __name__ == "__main__":
+    main()
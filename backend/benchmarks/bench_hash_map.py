@@ -0,0 +1,58 @@
+"""
+Lookup latency and memory of HashMap (chaining + incremental rehash) and
+OpenAddressingHashMap at growing key counts.
+
+    cd backend && python -m benchmarks.bench_hash_map --max 10000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from ds_modules.hash_map import HashMap, OpenAddressingHashMap
+
+
+def measure(cls, n, lookups, track_memory):
+    keys = [f"user{i}" for i in range(n)]
+    if track_memory:
+        tracemalloc.start()
+    m = cls()
+    start = time.perf_counter()
+    worst_put = 0.0
+    for k in keys:
+        t = time.perf_counter()
+        m.put(k, 1)
+        worst_put = max(worst_put, time.perf_counter() - t)
+    build = time.perf_counter() - start
+    mem = 0
+    if track_memory:
+        mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    probe = random.choices(keys, k=lookups)
+    get = m.get
+    start = time.perf_counter()
+    for k in probe:
+        get(k)
+    lookup_ns = (time.perf_counter() - start) / lookups * 1e9
+    return build, worst_put, lookup_ns, mem
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--memory", action="store_true", help="trace allocations (slower)")
+    args = parser.parse_args()
+
+    print(f"{'impl':<22}{'keys':>10}{'build s':>10}{'worst put ms':>14}{'get ns':>10}{'MB':>10}")
+    n = 1000
+    while n <= args.max:
+        for cls in (HashMap, OpenAddressingHashMap):
+            build, worst, lookup_ns, mem = measure(cls, n, args.lookups, args.memory)
+            print(f"{cls.__name__:<22}{n:>10}{build:>10.2f}{worst * 1e3:>14.2f}{lookup_ns:>10.0f}{mem / 1e6:>10.1f}")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Bulk ingest: N workouts sent one POST /api/history per record (timed on a
+sample and extrapolated) versus one /api/history/batch call, as a JSON
+array and as NDJSON, each streamed from a file. "transient MB" is the
+peak Python memory of the request above what the stored records keep,
+i.e. what parsing and buffering cost; it comes from a separate traced run
+(tracemalloc slows Python several times over) of --memory-records, which
+should stay the same whatever the record count.
+
+    cd backend && python -m benchmarks.bench_ingest --records 100000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("CULTFIT_DATA_DIR", tempfile.mkdtemp(prefix="cultfit-bench-"))
+
+import app as server  # noqa: E402
+
+TITLES = ("Squat", "Bench Press", "Running", "Yoga", "Plank", "Deadlift", "Cycling", "Pullups")
+
+
+def records(n, seed):
+    rng = random.Random(seed)
+    for i in range(n):
+        # Days of history from a wearable, oldest first but not strictly ordered
+        yield {"title": rng.choice(TITLES), "duration": f"{rng.randint(10, 90)} min",
+               "calories": rng.randint(50, 800),
+               "timestamp": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(5, 21):02d}:00:00"}
+
+
+def write_body(path, n, ndjson, seed):
+    with open(path, "w") as f:
+        if ndjson:
+            for record in records(n, seed):
+                f.write(json.dumps(record) + "\n")
+        else:
+            f.write("[")
+            for i, record in enumerate(records(n, seed)):
+                f.write(("," if i else "") + json.dumps(record))
+            f.write("]")
+
+
+def session(client, user):
+    token = client.post("/api/auth/register", json={"username": user, "password": "pw"}).get_json()["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def batch(client, user, path, mimetype):
+    headers = session(client, user)
+    start = time.perf_counter()
+    with open(path, "rb") as body:
+        response = client.post("/api/history/batch", input_stream=body, content_length=os.path.getsize(path),
+                               content_type=mimetype, headers=headers)
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.get_json()
+    return elapsed, response.get_json()["accepted"], headers
+
+
+def traced_batch(client, user, path, mimetype):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    batch(client, user, path, mimetype)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (peak - current) / 1e6, (current - before) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--sample", type=int, default=2000, help="single POSTs to time")
+    parser.add_argument("--memory-records", type=int, default=20000, help="records in the traced run")
+    args = parser.parse_args()
+
+    client = server.app.test_client()
+    single = session(client, "single")
+
+    start = time.perf_counter()
+    for record in records(args.sample, 1):
+        client.post("/api/history", json=record, headers=single)
+    per_record = (time.perf_counter() - start) / args.sample
+    print(f"{'mode':<22}{'records':>9}{'seconds':>9}{'records/s':>11}{'transient MB':>14}")
+    print(f"{'POST per record':<22}{args.records:>9}{per_record * args.records:>9.1f}{1 / per_record:>11.0f}"
+          f"{'-':>14}   (extrapolated from {args.sample})")
+
+    tmp = tempfile.mkdtemp(prefix="cultfit-ingest-")
+    for label, user, ndjson, mimetype in (("batch, JSON array", "array", False, "application/json"),
+                                          ("batch, NDJSON", "ndjson", True, "application/x-ndjson")):
+        path = os.path.join(tmp, user)
+        write_body(path, args.memory_records, ndjson, 3)
+        transient, _ = traced_batch(client, user + "-traced", path, mimetype)
+        write_body(path, args.records, ndjson, 2)
+        elapsed, accepted, headers = batch(client, user, path, mimetype)
+        assert accepted == args.records
+        print(f"{label:<22}{accepted:>9}{elapsed:>9.1f}{accepted / elapsed:>11.0f}{transient:>14.1f}")
+        summary = client.get("/api/dashboard/summary", headers=headers).get_json()
+        assert summary["workouts"] == args.records
+
+
+if __name__ == "__main__":
+    main()
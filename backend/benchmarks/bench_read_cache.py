@@ -0,0 +1,54 @@
+"""
+Latency of read endpoints when rebuilt on every call, served from the
+versioned response cache, and revalidated with If-None-Match (304).
+
+    cd backend && python -m benchmarks.bench_read_cache --history 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("CULTFIT_DATA_DIR", tempfile.mkdtemp(prefix="cultfit-bench-"))
+
+import app as server  # noqa: E402
+
+PATHS = ("/api/history", "/api/nutrition", "/api/user/profile", "/api/reminders",
+         "/api/dashboard/summary", "/api/search/all?q=p&limit=10")
+
+
+def timed(client, path, requests, headers=None):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--history", type=int, default=5000, help="workouts and meals to seed")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    for i in range(args.history):
+        server.storage.execute("history_add", {"title": "Squat", "duration": "20 min", "calories": 100,
+                                               "timestamp": f"2024-01-{i % 28 + 1:02d}T07:00:00"})
+        server.storage.execute("nutrition_add", {"name": "Oats", "cals": 300, "p": 10})
+    for i in range(50):
+        server.storage.execute("reminder_push", {"priority": i % 7, "message": f"reminder {i}"})
+
+    client = server.app.test_client()
+    capacity = server.response_cache.capacity
+    print(f"{'endpoint':<34}{'rebuild us':>12}{'cached us':>12}{'304 us':>10}")
+    for path in PATHS:
+        server.response_cache.capacity = 0  # Every put is evicted at once
+        rebuild = timed(client, path, args.requests)
+        server.response_cache.capacity = capacity
+        etag = client.get(path).headers["ETag"]
+        cached = timed(client, path, args.requests)
+        revalidate = timed(client, path, args.requests, {"If-None-Match": etag})
+        print(f"{path:<34}{rebuild:>12.0f}{cached:>12.0f}{revalidate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
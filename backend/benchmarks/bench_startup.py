@@ -0,0 +1,108 @@
+"""
+Cold start: how long `import app` takes (python -X importtime, with the
+slowest modules by self time) and time-to-first-response of a freshly
+spawned server - until GET / answers, then the first food search and chat
+request, which build their lazy indexes. Compared with
+CULTFIT_EAGER_INDEXES=1, which builds every index at import. --catalogue N
+serves a generated N-item food catalogue file, to show boot time staying
+flat as it grows while the first food search pays for it.
+
+    cd backend && python -m benchmarks.bench_startup --runs 3 --catalogue 300000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+FIRST_REQUESTS = (
+    ("GET /", "/", None),
+    ("first food search", "/api/search/food?q=chick", None),
+    ("first chat", "/api/ai/chat", {"query": "high protein food"}),
+)
+
+
+def serve():
+    # Child: import the app, then serve it; the parent times both
+    import logging
+    from werkzeug.serving import make_server
+    import app as server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+    print(httpd.server_port, flush=True)
+    httpd.serve_forever()
+
+
+def request(base, path, body):
+    data = None if body is None else json.dumps(body).encode()
+    req = urllib.request.Request(base + path, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as response:
+        response.read()
+
+
+def import_profile(env):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                         env=env, capture_output=True, text=True, check=True)
+    modules = []
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "self [us]" not in line:
+            own, total, name = line[len("import time:"):].split("|")
+            modules.append((int(own), int(total), name.strip()))
+    app_total = next(total for _, total, name in modules if name == "app")
+    return app_total / 1e6, sorted(modules, reverse=True)[:8]
+
+
+def first_responses(env):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_startup", "--serve"],
+                            env=env, stdout=subprocess.PIPE, text=True)
+    try:
+        base = f"http://127.0.0.1:{proc.stdout.readline().strip()}"
+        times = []
+        for _, path, body in FIRST_REQUESTS:
+            request(base, path, body)
+            times.append(time.perf_counter() - start)
+        return times
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3, help="spawns per mode (median reported)")
+    parser.add_argument("--catalogue", type=int, default=0, help="serve a generated catalogue of N foods")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        return serve()
+
+    env = dict(os.environ, CULTFIT_DATA_DIR=tempfile.mkdtemp(prefix="cultfit-startup-"))
+    if args.catalogue:
+        from benchmarks.bench_food_catalogue import catalogue_dict
+        from ds_modules.food_catalogue import FoodCatalogue
+
+        path = os.path.join(env["CULTFIT_DATA_DIR"], "foods.bin")
+        FoodCatalogue.from_dict(catalogue_dict(args.catalogue)).save(path)
+        env["CULTFIT_FOOD_CATALOGUE"] = path
+        print(f"catalogue: {args.catalogue} generated foods")
+
+    for label, extra in (("lazy (default)", {}), ("eager", {"CULTFIT_EAGER_INDEXES": "1"})):
+        mode_env = dict(env, **extra)
+        imports = [import_profile(mode_env) for _ in range(args.runs)]
+        runs = [first_responses(mode_env) for _ in range(args.runs)]
+        print(f"\n{label}: import app {statistics.median(t for t, _ in imports) * 1e3:.0f} ms")
+        for i, (name, _, _) in enumerate(FIRST_REQUESTS):
+            print(f"  {name:<20} answered {statistics.median(r[i] for r in runs) * 1e3:>7.0f} ms after spawn")
+        print("  slowest imports by self time:")
+        for own, total, name in imports[0][1]:
+            print(f"    {name:<32}{own / 1e3:>8.1f} ms self {total / 1e3:>8.1f} ms total")
+
+
+if __name__ == "__main__":
+    main()
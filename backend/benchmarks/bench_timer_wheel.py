@@ -0,0 +1,58 @@
+"""
+Insert, cancel and per-tick cost of the reminder TimerWheel with many
+pending timers spread over a day (or --horizon seconds).
+
+    cd backend && python -m benchmarks.bench_timer_wheel --max 1000000
+"""
+import argparse
+import random
+import time
+
+from ds_modules.timer_wheel import TimerWheel
+
+
+def measure(n, horizon):
+    wheel = TimerWheel(tick=1.0, start=0)
+    whens = [random.uniform(1, horizon) for _ in range(n)]
+    start = time.perf_counter()
+    for i, when in enumerate(whens):
+        wheel.schedule(i, when)
+    insert_us = (time.perf_counter() - start) / n * 1e6
+
+    victims = random.sample(range(n), n // 10)
+    start = time.perf_counter()
+    for i in victims:
+        wheel.cancel(i)
+    cancel_us = (time.perf_counter() - start) / len(victims) * 1e6
+
+    # Advance one tick at a time like the scheduler thread does
+    fired = 0
+    worst_tick = 0.0
+    start = time.perf_counter()
+    for now in range(1, int(horizon) + 2):
+        t = time.perf_counter()
+        fired += len(wheel.advance(now))
+        worst_tick = max(worst_tick, time.perf_counter() - t)
+    total = time.perf_counter() - start
+    return insert_us, cancel_us, total / fired * 1e6, worst_tick, fired
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max", type=int, default=300000)
+    parser.add_argument("--horizon", type=float, default=86400, help="seconds timers are spread over")
+    args = parser.parse_args()
+
+    print(f"{'timers':>10}{'insert us':>12}{'cancel us':>12}{'fire us':>10}{'worst tick ms':>15}{'fired':>10}")
+    n = 1000
+    while n <= args.max:
+        insert_us, cancel_us, fire_us, worst_tick, fired = measure(n, args.horizon)
+        print(f"{n:>10}{insert_us:>12.2f}{cancel_us:>12.2f}{fire_us:>10.2f}{worst_tick * 1e3:>15.2f}{fired:>10}")
+        n *= 10
+    if n // 10 != args.max:
+        insert_us, cancel_us, fire_us, worst_tick, fired = measure(args.max, args.horizon)
+        print(f"{args.max:>10}{insert_us:>12.2f}{cancel_us:>12.2f}{fire_us:>10.2f}{worst_tick * 1e3:>15.2f}{fired:>10}")
+
+
+if __name__ == "__main__":
+    main()
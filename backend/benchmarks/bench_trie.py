@@ -0,0 +1,70 @@
+"""
+Build time and memory of Trie vs RadixTrie on a USDA-sized synthetic food
+catalogue.
+
+    cd backend && python -m benchmarks.bench_trie --items 300000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from ds_modules.radix_trie import RadixTrie
+from ds_modules.trie import Trie
+
+WORDS = (
+    "chicken beef pork turkey salmon tuna cod rice brown white wheat oat "
+    "bread pasta milk yogurt cheese cheddar mozzarella apple banana orange "
+    "raw cooked boiled grilled fried roasted canned frozen dried fresh "
+    "skinless boneless whole low fat nonfat reduced sodium sweetened "
+    "unsweetened with without salt sauce soup juice cereal bar snack"
+).split()
+
+
+def catalogue(n, seed=7):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        names.add(", ".join(" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(rng.randint(2, 4))).title())
+    return sorted(names)
+
+
+def build(cls, names):
+    tracemalloc.start()
+    start = time.perf_counter()
+    trie = cls()
+    for name in names:
+        trie.insert(name)
+    elapsed = time.perf_counter() - start
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return trie, elapsed, mem
+
+
+def query_us(trie, prefixes, k):
+    start = time.perf_counter()
+    for p in prefixes:
+        trie.search_prefix(p, k)
+    return (time.perf_counter() - start) / len(prefixes) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=300000)
+    parser.add_argument("--trie-items", type=int, default=30000,
+                        help="the per-character Trie needs several GB at full size; measure it on a slice")
+    args = parser.parse_args()
+
+    names = catalogue(args.items)
+    rng = random.Random(1)
+    prefixes = [n[: rng.randint(1, 8)] for n in rng.sample(names, 2000)]
+
+    for cls, subset in ((Trie, names[:: max(1, len(names) // args.trie_items)]), (RadixTrie, names)):
+        trie, elapsed, mem = build(cls, subset)
+        print(f"{cls.__name__:<10} {len(subset):>7} items  build {elapsed:7.2f}s  memory {mem / 1e6:8.1f} MB"
+              f" ({mem / len(subset):6.0f} B/item)  top-10 query {query_us(trie, prefixes, 10):6.1f} us")
+        del trie
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Write throughput of the WAL: group commit vs one fsync per request.
+
+    cd backend && python -m benchmarks.bench_wal --threads 16 --records 4000
+"""
+import argparse
+import tempfile
+import threading
+import time
+
+from ds_modules.storage import WriteAheadLog
+
+
+def run(group_commit, threads, records):
+    with tempfile.TemporaryDirectory() as tmp:
+        wal = WriteAheadLog(tmp, group_commit=group_commit)
+        wal.open()
+        per_thread = records // threads
+        payload = {"title": "Bench Press", "duration": "30 min", "calories": "250"}
+
+        def worker():
+            for _ in range(per_thread):
+                wal.append({"op": "history_add", "payload": payload})
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        wal.close()
+        return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--records", type=int, default=4000)
+    args = parser.parse_args()
+
+    single = run(False, args.threads, args.records)
+    group = run(True, args.threads, args.records)
+    print(f"threads={args.threads} records={args.records}")
+    print(f"fsync-per-request: {single:10.0f} writes/s")
+    print(f"group commit:      {group:10.0f} writes/s  ({group / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
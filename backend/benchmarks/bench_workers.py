@@ -0,0 +1,137 @@
+"""
+Throughput with 1..N worker processes sharing state through the sqlite
+backend. Workers accept from one inherited listening socket, the same
+pre-fork model gunicorn uses, so the kernel spreads connections across
+them. Client processes replay a read-heavy mix for a fixed time; at the
+end every worker must report the same workout count, i.e. each one saw
+every other worker's writes.
+
+    cd backend && python -m benchmarks.bench_workers --workers 1,2,4 --seconds 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+READS = ("/api/dashboard/summary", "/api/history?limit=20&order=desc", "/api/search/all?q=squ&limit=5",
+         "/api/user/profile", "/api/nutrition")
+
+
+def serve(fd):
+    # Child: one worker on the shared socket
+    import logging
+    from werkzeug.serving import make_server
+    import app as server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    httpd = make_server("127.0.0.1", 0, server.app, threaded=True, fd=fd)
+    print("ready", flush=True)
+    httpd.serve_forever()
+
+
+def client(base, seconds, write_ratio, threads, seed, token):
+    # Client process: `threads` keep-alive sessions issuing the mix until time is up
+    from concurrent.futures import ThreadPoolExecutor
+
+    deadline = time.perf_counter() + seconds
+
+    def loop(i):
+        rng = random.Random(seed * 100 + i)
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer {token}"
+        done, errors, latencies = 0, 0, []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if rng.random() < write_ratio:
+                response = session.post(base + "/api/history",
+                                         json={"title": rng.choice(("Squat", "Plank", "Yoga")), "duration": "20 min",
+                                               "calories": 100})
+            else:
+                response = session.get(base + rng.choice(READS))
+            latencies.append(time.perf_counter() - start)
+            done += 1
+            errors += response.status_code >= 400
+        return done, errors, latencies
+
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(loop, range(threads)))
+    return (sum(r[0] for r in results), sum(r[1] for r in results),
+            [x for r in results for x in r[2]])
+
+
+def run(workers, args):
+    data_dir = tempfile.mkdtemp(prefix="cultfit-bench-")
+    env = dict(os.environ, CULTFIT_STORAGE="sqlite", CULTFIT_DATA_DIR=data_dir)
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1024)
+    base = f"http://127.0.0.1:{listener.getsockname()[1]}"
+    procs = []
+    try:
+        for _ in range(workers):
+            proc = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_workers", "--serve-fd", str(listener.fileno())],
+                                    env=env, pass_fds=(listener.fileno(),), stdout=subprocess.PIPE, text=True)
+            procs.append(proc)
+        for proc in procs:
+            assert proc.stdout.readline().strip() == "ready"
+
+        token = requests.post(base + "/api/auth/register", json={"username": "bench", "password": "pw"}).json()["token"]
+        with multiprocessing.Pool(args.clients) as pool:
+            start = time.perf_counter()
+            results = pool.starmap(client, [(base, args.seconds, args.writes, args.threads, i, token)
+                                            for i in range(args.clients)])
+            elapsed = time.perf_counter() - start
+        done = sum(r[0] for r in results)
+        errors = sum(r[1] for r in results)
+        latencies = sorted(x for r in results for x in r[2])
+
+        # Fresh connections land on different workers; all must agree
+        time.sleep(1)
+        counts = {requests.get(base + "/api/dashboard/summary", headers={"Authorization": f"Bearer {token}"}).json()["workouts"]
+                  for _ in range(workers * 8)}
+        return {"workers": workers, "requests": done, "errors": errors, "rps": done / elapsed,
+                "p50_ms": latencies[len(latencies) // 2] * 1e3,
+                "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3,
+                "consistent": len(counts) == 1}
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+        listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4", help="worker counts to compare")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--threads", type=int, default=8, help="connections per client process")
+    parser.add_argument("--writes", type=float, default=0.1, help="share of requests that log a workout")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--serve-fd", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve_fd is not None:
+        return serve(args.serve_fd)
+
+    print(f"{os.cpu_count()} CPUs; scaling stops at the core count")
+    rows = [run(int(n), args) for n in args.workers.split(",")]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'workers':>8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'consistent':>12}")
+    for row in rows:
+        print(f"{row['workers']:>8}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10.0f}"
+              f"{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}{str(row['consistent']):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+End-to-end load generator for the API. A pool of workers, each signed in
+as its own user, replays a weighted mix of user actions for a fixed time
+and every request's latency and outcome is recorded by endpoint. The
+report - p50/p95/p99/max latency, throughput and error rate per endpoint
+and overall - is printed and written as JSON, so two builds can be
+diffed (--compare old.json prints the changes).
+
+Actions (weights set with --mix, e.g. --mix search=50,dashboard=25,chat=10,log=15):
+  search     typing a word into the navbar: /api/search/all per keystroke
+  dashboard  a page load: bootstrap, recent history, trends, nutrition
+  chat       one /api/ai/chat question
+  log        logging a workout or a meal (POST), sometimes deleting one
+
+Transports:
+  (default)        in-process Flask test client, no sockets
+  --serve          in-process threaded HTTP server on a local port, real sockets
+  --url URL        an already running server, e.g. http://127.0.0.1:5000
+
+    cd backend && python -m benchmarks.load --workers 8 --duration 20 --serve --output load.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MIX = {"search": 50, "dashboard": 25, "chat": 10, "log": 15}
+SEARCH_WORDS = ("squat", "bench press", "chicken", "oats", "plank", "running", "paneer", "deadlift", "yoga", "rice")
+CHAT_QUESTIONS = ("high protein food", "I feel tired today", "how to lose weight", "calories in oats",
+                  "motivate me", "suggest a workout")
+EXERCISES = ("Squats", "Bench Press", "Running", "Plank", "Yoga", "Deadlift", "Cycling", "Pullups")
+FOODS = ("Oats", "Chicken Breast", "Paneer (Cottage Cheese)", "Banana", "Greek Yogurt", "Brown Rice")
+
+
+# --- Actions: each makes the requests one user step would, via request(method, path, endpoint, body) ---
+
+def search(request, rng, state):
+    word = rng.choice(SEARCH_WORDS)
+    for i in range(1, len(word) + 1):
+        request("GET", "/api/search/all?" + urllib.parse.urlencode({"q": word[:i], "limit": 3}), "GET /api/search/all")
+
+
+def dashboard(request, rng, state):
+    request("GET", "/api/bootstrap?include=profile,summary,reminders", "GET /api/bootstrap")
+    request("GET", "/api/history?limit=20&order=desc", "GET /api/history")
+    request("GET", "/api/trends?metric=calories&granularity=week", "GET /api/trends")
+    request("GET", "/api/nutrition", "GET /api/nutrition")
+
+
+def chat(request, rng, state):
+    request("POST", "/api/ai/chat", "POST /api/ai/chat", {"query": rng.choice(CHAT_QUESTIONS)})
+
+
+def log(request, rng, state):
+    roll = rng.random()
+    if roll < 0.1 and state["workouts"]:
+        entry_id = state["workouts"].pop(rng.randrange(len(state["workouts"])))
+        request("DELETE", f"/api/history/{entry_id}", "DELETE /api/history/<id>")
+    elif roll < 0.6:
+        body = request("POST", "/api/history", "POST /api/history",
+                       {"title": rng.choice(EXERCISES), "duration": f"{rng.randint(10, 60)} min",
+                        "calories": rng.randint(50, 600)})
+        if body and "id" in body:
+            state["workouts"].append(body["id"])
+    else:
+        request("POST", "/api/nutrition", "POST /api/nutrition",
+                {"name": rng.choice(FOODS), "cals": rng.randint(50, 500), "p": rng.randint(0, 40)})
+
+
+ACTIONS = {"search": search, "dashboard": dashboard, "chat": chat, "log": log}
+
+
+# --- Transports: client() -> call(method, path, body, headers) returning (status, parsed JSON or None) ---
+
+class TestClientTransport:
+    def __init__(self):
+        import app as server
+        self.app = server.app
+
+    def client(self):
+        client = self.app.test_client()
+
+        def call(method, path, body, headers):
+            response = client.open(path, method=method, json=body, headers=headers)
+            return response.status_code, response.get_json(silent=True)
+        return call
+
+
+class HttpTransport:
+    """One keep-alive connection per worker, reopened after a failure"""
+
+    def __init__(self, url):
+        parsed = urllib.parse.urlsplit(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+
+    def client(self):
+        holder = {}
+
+        def call(method, path, body, headers):
+            conn = holder.get("conn")
+            if conn is None:
+                conn = holder["conn"] = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            headers = dict(headers)
+            data = None
+            if body is not None:
+                data = json.dumps(body).encode()
+                headers["Content-Type"] = "application/json"
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                raw = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                holder.pop("conn", None)
+                raise
+            try:
+                return response.status, json.loads(raw) if raw else None
+            except ValueError:
+                return response.status, None
+        return call
+
+
+def serve_in_process():
+    """Threaded server for the app on a free local port; returns its URL"""
+    import logging
+    from werkzeug.serving import make_server
+    import app as server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{httpd.server_port}"
+
+
+# --- Load and report ---
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def run_worker(transport, index, args, mix, deadline, measure_from):
+    rng = random.Random(args.seed * 1000 + index)
+    user = f"load{index}"
+    call = transport.client()
+    status, body = call("POST", "/api/auth/register", {"username": user, "password": "pw"}, {})
+    if status >= 400:  # Already registered on a running server
+        status, body = call("POST", "/api/auth/login", {"username": user, "password": "pw"}, {})
+    if status >= 400:
+        raise RuntimeError(f"could not sign in as {user}: {body}")
+    headers = {"Authorization": f"Bearer {body['token']}"}
+    samples = defaultdict(list)  # endpoint -> [(latency, ok)]
+    state = {"workouts": []}
+
+    def request(method, path, endpoint, body=None):
+        start = time.perf_counter()
+        try:
+            status, parsed = call(method, path, body, headers)
+            ok = status < 400
+        except Exception:  # Connection errors count against the endpoint
+            status, parsed, ok = None, None, False
+        end = time.perf_counter()
+        if start >= measure_from:
+            samples[endpoint].append((end - start, ok))
+        return parsed
+
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        ACTIONS[rng.choices(names, weights)[0]](request, rng, state)
+        if args.think:
+            time.sleep(rng.expovariate(1 / args.think))
+    return samples
+
+
+def summarize(samples, seconds):
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    ms = lambda value: None if value is None else round(value * 1e3, 3)
+    return {"requests": len(samples), "errors": errors,
+            "error_rate": errors / len(samples) if samples else 0.0,
+            "throughput_rps": len(samples) / seconds,
+            "p50_ms": ms(percentile(latencies, 50)), "p95_ms": ms(percentile(latencies, 95)),
+            "p99_ms": ms(percentile(latencies, 99)), "max_ms": ms(latencies[-1] if latencies else None),
+            "mean_ms": ms(sum(latencies) / len(latencies) if latencies else None)}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ACTIONS:
+            raise SystemExit(f"unknown action {name!r}; choose from {', '.join(ACTIONS)}")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def print_report(report):
+    print(f"{'endpoint':<28}{'requests':>9}{'rps':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    rows = sorted(report["endpoints"].items()) + [("ALL", report["overall"])]
+    for name, row in rows:
+        cells = [row[key] if row[key] is not None else float("nan") for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")]
+        print(f"{name:<28}{row['requests']:>9}{row['throughput_rps']:>9.1f}{row['error_rate']:>8.1%}"
+              + "".join(f"{cell:>9.2f}" for cell in cells))
+
+
+def print_comparison(report, old):
+    print(f"\nvs {old['meta'].get('label') or 'previous run'}:")
+    print(f"{'endpoint':<28}{'rps':>16}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'errors':>16}")
+    rows = [(name, row, old["endpoints"].get(name)) for name, row in sorted(report["endpoints"].items())]
+    rows.append(("ALL", report["overall"], old["overall"]))
+    for name, row, before in rows:
+        if not before:
+            continue
+
+        def delta(key, fmt):
+            if row[key] is None or before[key] is None:
+                return f"{'-':>18}"
+            change = f"{(row[key] / before[key] - 1):+.0%}" if before[key] else ""
+            return f"{format(row[key], fmt):>10}{change:>8}"
+        print(f"{name:<28}{delta('throughput_rps', '.1f')[2:]}{delta('p50_ms', '.2f')}{delta('p95_ms', '.2f')}"
+              f"{delta('p99_ms', '.2f')}{delta('error_rate', '.1%')[2:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=8, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of load before measuring starts")
+    parser.add_argument("--mix", default=",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()))
+    parser.add_argument("--think", type=float, default=0, help="mean pause between actions, seconds")
+    parser.add_argument("--url", help="load an already running server")
+    parser.add_argument("--serve", action="store_true", help="serve the app in-process over a real socket")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", help="name for this build in the report, e.g. a git revision")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="a previous JSON report to diff against")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    if not args.url:
+        # The in-process app keeps its state in a throwaway directory unless told otherwise
+        os.environ.setdefault("CULTFIT_DATA_DIR", tempfile.mkdtemp(prefix="cultfit-load-"))
+    if args.url or args.serve:
+        url = args.url or serve_in_process()
+        transport, transport_name = HttpTransport(url), f"http {url}"
+    else:
+        transport, transport_name = TestClientTransport(), "flask test client"
+
+    start = time.perf_counter()
+    measure_from = start + args.warmup
+    deadline = measure_from + args.duration
+    with ThreadPoolExecutor(args.workers) as pool:
+        futures = [pool.submit(run_worker, transport, i, args, mix, deadline, measure_from)
+                   for i in range(args.workers)]
+        per_worker = [future.result() for future in futures]
+    seconds = time.perf_counter() - measure_from
+
+    by_endpoint = defaultdict(list)
+    for samples in per_worker:
+        for endpoint, rows in samples.items():
+            by_endpoint[endpoint].extend(rows)
+    report = {
+        "meta": {"label": args.label, "transport": transport_name, "workers": args.workers, "mix": mix,
+                 "duration_s": round(seconds, 3), "warmup_s": args.warmup, "think_s": args.think,
+                 "seed": args.seed, "cpus": os.cpu_count(), "python": sys.version.split()[0]},
+        "overall": summarize([row for rows in by_endpoint.values() for row in rows], seconds),
+        "endpoints": {endpoint: summarize(rows, seconds) for endpoint, rows in sorted(by_endpoint.items())},
+    }
+
+    print(f"{transport_name}, {args.workers} workers, {seconds:.1f}s measured, mix {mix}\n")
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print(f"\nreport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Request volume of a typical UI session with per-component polling (before
+/api/events) versus load-once + change feed (after). Both sessions are
+replayed against the real app through Flask's test client; the "after"
+session also checks that every mutation arrived on its SSE stream.
+
+    cd backend && python -m benchmarks.load_events --sessions 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault("CULTFIT_DATA_DIR", tempfile.mkdtemp(prefix="cultfit-bench-"))
+
+import app as server  # noqa: E402
+
+SEARCHES = ("squ", "chick", "yog")
+
+
+def polling_session(call):
+    # Mirrors what the components fetched on their own before the change feed
+    call("POST", "/api/auth/login", {"username": "bench", "password": "pw"})
+    call("GET", "/api/user/profile")                              # App: setup check
+    call("GET", "/api/user/profile")                              # Sidebar
+    for path in ("/api/user/profile", "/api/dashboard/summary", "/api/reminders"):
+        call("GET", path)                                         # Navbar mount
+    call("GET", "/api/dashboard/summary")                         # Dashboard
+    call("GET", "/api/user/profile")
+    for q in SEARCHES:                                            # Navbar re-polls per query
+        for path in ("/api/user/profile", "/api/dashboard/summary", "/api/reminders"):
+            call("GET", path)
+        call("GET", f"/api/search/all?q={q}&limit=3")
+    call("GET", "/api/nutrition")                                 # Nutrition page
+    call("GET", "/api/user/profile")
+    for name in ("Oats", "Paneer"):
+        call("POST", "/api/nutrition", {"name": name, "cals": 300, "p": 20})
+    call("GET", "/api/dashboard/summary")                         # Back to Dashboard
+    call("GET", "/api/user/profile")
+    mutations_tail(call)
+    call("GET", "/api/user/profile")                              # Settings
+    call("GET", "/api/dashboard/summary")                         # Dashboard again
+    call("GET", "/api/user/profile")
+
+
+def feed_session(call):
+    # LiveDataProvider loads one snapshot; everything else arrives as deltas
+    call("POST", "/api/auth/login", {"username": "bench", "password": "pw"})
+    call("GET", "/api/bootstrap?include=profile,summary,reminders")
+    for q in SEARCHES:
+        call("GET", f"/api/search/all?q={q}&limit=3")
+    call("GET", "/api/nutrition")
+    for name in ("Oats", "Paneer"):
+        call("POST", "/api/nutrition", {"name": name, "cals": 300, "p": 20})
+    mutations_tail(call)
+
+
+def mutations_tail(call):
+    # Workouts and Reminders pages are unchanged in both sessions
+    call("GET", "/api/history")
+    call("POST", "/api/history", {"title": "Squat", "duration": "20 min", "calories": 150})
+    call("POST", "/api/undo/push", {"action": "ADD_WORKOUT"})
+    call("GET", "/api/reminders")
+    call("GET", "/api/undo/all")
+    call("POST", "/api/reminders", {"message": "Stretch", "priority": 2})
+    call("POST", "/api/undo/push", {"action": "Added: Stretch"})
+
+
+EXPECTED_EVENTS = 4  # 2 meals, 1 workout, 1 reminder
+
+
+def run(session, sessions, stream, token):
+    client = server.app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    counts = Counter()
+    payload_bytes = 0
+    received = 0
+
+    def call(method, path, body=None):
+        nonlocal payload_bytes
+        response = client.open(path, method=method, json=body, headers=headers)
+        payload_bytes += len(response.data)
+        counts[path.split("?")[0]] += 1
+
+    start = time.perf_counter()
+    for _ in range(sessions):
+        feed = None
+        if stream:
+            feed = client.get(f"/api/events?token={token}", buffered=False)
+            frames = iter(feed.response)
+            next(frames)  # retry hint
+            counts["/api/events (stream)"] += 1
+        session(call)
+        if feed is not None:
+            pending = EXPECTED_EVENTS
+            while pending:
+                frame = next(frames)
+                if frame.startswith(b"id:"):
+                    pending -= 1
+                    received += 1
+                    payload_bytes += len(frame)
+            feed.close()
+    elapsed = time.perf_counter() - start
+    return counts, payload_bytes, received, elapsed
+
+
+MODES = {"polling": (polling_session, False), "feed": (feed_session, True)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Child: one pattern against a fresh data dir, results as JSON
+        token = server.app.test_client().post("/api/auth/register",
+                                              json={"username": "bench", "password": "pw"}).get_json()["token"]
+        session, stream = MODES[args.mode]
+        counts, payload, received, elapsed = run(session, args.sessions, stream, token)
+        print(json.dumps({"counts": counts, "bytes": payload, "events": received, "seconds": elapsed}))
+        return
+
+    results = {}
+    for mode in MODES:
+        with tempfile.TemporaryDirectory(prefix="cultfit-bench-") as data_dir:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.load_events", "--mode", mode, "--sessions", str(args.sessions)],
+                env={**os.environ, "CULTFIT_DATA_DIR": data_dir}, capture_output=True, text=True, check=True,
+            ).stdout
+        results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{'session':<10}{'requests':>10}{'per session':>13}{'KB':>10}{'events':>8}{'s':>8}")
+    for mode, r in results.items():
+        total = sum(r["counts"].values())
+        print(f"{mode:<10}{total:>10}{total / args.sessions:>13.1f}{r['bytes'] / 1024:>10.1f}{r['events']:>8}{r['seconds']:>8.2f}")
+
+    before, after = results["polling"]["counts"], results["feed"]["counts"]
+    print(f"\n{'endpoint':<28}{'polling':>9}{'feed':>7}")
+    for path in sorted(set(before) | set(after)):
+        print(f"{path:<28}{before.get(path, 0) // args.sessions:>9}{after.get(path, 0) // args.sessions:>7}")
+    assert results["feed"]["events"] == EXPECTED_EVENTS * args.sessions, "missed change events"
+
+
+if __name__ == "__main__":
+    main()
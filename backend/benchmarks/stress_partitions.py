@@ -0,0 +1,147 @@
+"""
+Concurrency stress test for per-user partitions. Threads hammer random
+users (so the same user is also hit concurrently) with workouts, meals,
+reminders, deletes and reads, keeping their own tally of what each user
+should have. Afterwards every user's history, totals and reminders must
+match the tallies, and a restart must recover exactly the same state.
+Throughput is reported per thread count, with one lock for everything
+versus the default lock striping.
+
+    cd backend && python -m benchmarks.stress_partitions --threads 1,2,4,8,16 --ops 400
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def run_child(args):
+    import app as server
+
+    users = [f"user{i}" for i in range(args.users)]
+    client = server.app.test_client()
+    sessions = {}
+    for user in users:
+        token = client.post("/api/auth/register", json={"username": user, "password": "pw"}).get_json()["token"]
+        sessions[user] = {"Authorization": f"Bearer {token}"}
+    tallies = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        c = server.app.test_client()
+        tally = {user: {"workouts": 0, "burned": 0, "meals": 0, "reminders": 0} for user in users}
+        mine = {user: [] for user in users}  # history ids this thread logged
+        for _ in range(args.ops):
+            user = rng.choice(users)
+            headers = sessions[user]
+            t = tally[user]
+            roll = rng.random()
+            if roll < 0.3:
+                calories = rng.randint(10, 500)
+                r = c.post("/api/history", json={"title": rng.choice(("Squat", "Plank", "Yoga")),
+                                                  "duration": "20 min", "calories": calories}, headers=headers)
+                mine[user].append((r.get_json()["id"], calories))
+                t["workouts"] += 1
+                t["burned"] += calories
+            elif roll < 0.4 and mine[user]:
+                entry_id, calories = mine[user].pop(rng.randrange(len(mine[user])))
+                assert c.delete(f"/api/history/{entry_id}", headers=headers).status_code == 200
+                t["workouts"] -= 1
+                t["burned"] -= calories
+            elif roll < 0.6:
+                c.post("/api/nutrition", json={"name": "Oats", "cals": 100, "p": 5}, headers=headers)
+                t["meals"] += 1
+            elif roll < 0.7:
+                c.post("/api/reminders", json={"priority": rng.randint(1, 9), "message": "stretch"}, headers=headers)
+                t["reminders"] += 1
+            else:
+                c.get(rng.choice(("/api/dashboard/summary", "/api/history?limit=10&order=desc",
+                                  "/api/reminders", "/api/bootstrap")), headers=headers)
+        tallies.append(tally)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    errors = 0
+    for user in users:
+        expected = {key: sum(t[user][key] for t in tallies) for key in ("workouts", "burned", "meals", "reminders")}
+        headers = sessions[user]
+        summary = client.get("/api/dashboard/summary", headers=headers).get_json()
+        history = client.get("/api/history", headers=headers).get_json()["history"]
+        reminders = client.get("/api/reminders?limit=100000", headers=headers).get_json()["all_reminders"]
+        got = {"workouts": summary["workouts"], "burned": summary["burned_calories"], "meals": summary["meals"],
+               "reminders": len(reminders)}
+        if got != expected or len(history) != expected["workouts"] \
+                or sum(e["calories"] for e in history) != expected["burned"]:
+            errors += 1
+            print(f"{user}: expected {expected}, got {got} with {len(history)} entries", file=sys.stderr)
+    print(json.dumps({"ops": args.threads * args.ops, "seconds": elapsed, "errors": errors,
+                      "state": state_digest(server)}))
+
+
+def state_digest(server):
+    state = server.dump_state()
+    state["users"].sort()  # HashMap order follows the per-process string hash seed
+    # Users who only ever read have an empty partition live, none after replay
+    pristine = server.dump_user(server.UserState(None))
+    state["partitions"] = {user: data for user, data in state["partitions"].items() if data != pristine}
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def recover_child():
+    import app as server
+    print(json.dumps({"state": state_digest(server)}))
+
+
+def spawn(data_dir, stripes, extra):
+    env = dict(os.environ, CULTFIT_DATA_DIR=data_dir, CULTFIT_LOCK_STRIPES=str(stripes))
+    out = subprocess.run([sys.executable, "-m", "benchmarks.stress_partitions", *extra],
+                         env=env, capture_output=True, text=True)
+    if out.returncode:
+        raise RuntimeError(out.stderr)
+    sys.stderr.write(out.stderr)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", default="1,2,4,8,16")
+    parser.add_argument("--ops", type=int, default=400, help="requests per thread")
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--stripes", default="1,64", help="lock stripe counts to compare")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--recover", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        args.threads = int(args.threads)
+        return run_child(args)
+    if args.recover:
+        return recover_child()
+
+    failed = False
+    print(f"{'stripes':>8}{'threads':>9}{'ops':>8}{'ops/s':>10}{'errors':>8}{'recovered':>11}")
+    for stripes in map(int, args.stripes.split(",")):
+        for threads in map(int, args.threads.split(",")):
+            data_dir = tempfile.mkdtemp(prefix="cultfit-stress-")
+            row = spawn(data_dir, stripes, ["--child", "--threads", str(threads), "--ops", str(args.ops),
+                                            "--users", str(args.users)])
+            recovered = spawn(data_dir, stripes, ["--recover"])["state"] == row["state"]
+            failed |= bool(row["errors"]) or not recovered
+            print(f"{stripes:>8}{threads:>9}{row['ops']:>8}{row['ops'] / row['seconds']:>10.0f}"
+                  f"{row['errors']:>8}{str(recovered):>11}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
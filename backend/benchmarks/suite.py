@@ -0,0 +1,402 @@
+"""
+Micro-benchmark suite for the ds_modules structures with regression gates.
+Every workload runs at each size N: ops/sec comes from the best of at
+least --repeat untraced runs (more for short workloads, until --min-time
+of timed work), peak memory from one more run under tracemalloc (which
+slows Python several times over, so it is never timed). Results are
+written as JSON together with a calibration score, the speed of a fixed
+pure-Python loop, and comparisons are scaled by it so a slower or
+throttled machine does not read as a regression. Given a baseline, any
+workload that got slower or bigger by more than --threshold fails the
+run (exit status 1); slower ones are re-measured up to --retries times
+first, so a momentary stall on a shared box does not fail it. With --check-scaling, the time per op must also
+grow no faster than the workload's documented bound between the
+smallest and largest N.
+
+Pure standard library and no network, so it runs on any Linux box:
+
+    cd backend && python -m benchmarks.suite --sizes 1000,10000,100000
+    cd backend && python -m benchmarks.suite --sizes 1000,100000 --baseline benchmarks/baseline.json
+    cd backend && python -m benchmarks.suite --sizes 1000,10000,100000 --save-baseline benchmarks/baseline.json
+    cd backend && python -m benchmarks.suite --only hash_map,heap --sizes 1000,...,10000000
+
+Baselines are only comparable on the machine (and Python) that wrote
+them: regenerate one wherever the gate runs.
+"""
+import argparse
+import datetime
+import fnmatch
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from ds_modules.graph import Graph
+from ds_modules.hash_map import HashMap, OpenAddressingHashMap
+from ds_modules.heap import IndexedMaxHeap, MaxHeap
+from ds_modules.linked_list import DoublyLinkedList, TimeIndexedList
+from ds_modules.radix_trie import RadixTrie
+from ds_modules.stack import Stack
+from ds_modules.trie import Trie
+
+QUERIES = 10000  # lookups per read workload, whatever N is
+MAX_RUNS = 50
+CALIBRATION_OPS = 200000
+MEMORY_FLOOR = 4096  # peak_bytes growth below this is noise, whatever the ratio
+
+
+def words(n, seed=0):
+    # Distinct, realistic-length keys sharing prefixes the way exercise / food names do
+    rng = random.Random(seed)
+    stems = ("squat", "press", "curl", "row", "lunge", "plank", "chicken", "paneer", "oats", "rice")
+    return [f"{rng.choice(stems)} {rng.choice(stems)} {i}" for i in range(n)]
+
+
+# Each workload: setup(n) -> state, run(state) -> ops done; only run() is timed.
+# "bound" is the documented cost per op, checked by --check-scaling.
+
+def calls(method, argument_lists):
+    for arguments in argument_lists:
+        method(*arguments)
+    return len(argument_lists)
+
+
+def hash_map_put(cls):
+    return {"bound": "1", "setup": lambda n: (cls(), [(k, 1) for k in words(n)]),
+            "run": lambda s: calls(s[0].put, s[1])}
+
+
+def hash_map_get(cls):
+    def setup(n):
+        m = cls()
+        keys = words(n)
+        for k in keys:
+            m.put(k, 1)
+        return m, [(k,) for k in random.Random(1).choices(keys, k=QUERIES)]
+    return {"bound": "1", "setup": setup, "run": lambda s: calls(s[0].get, s[1])}
+
+
+def trie_insert(cls):
+    return {"bound": "1", "setup": lambda n: (cls(), [(w,) for w in words(n)]),
+            "run": lambda s: calls(s[0].insert, s[1])}
+
+
+def trie_search(cls):
+    def setup(n):
+        trie = cls()
+        keys = words(n)
+        for w in keys:
+            trie.insert(w)
+        return trie, [(w[:4], 10) for w in random.Random(1).choices(keys, k=QUERIES)]
+    return {"bound": "1", "setup": setup, "run": lambda s: calls(s[0].search_prefix, s[1])}
+
+
+def list_append():
+    return {"bound": "1", "setup": lambda n: (DoublyLinkedList(), [({"id": i},) for i in range(n)]),
+            "run": lambda s: calls(s[0].append, s[1])}
+
+
+def list_traverse():
+    def setup(n):
+        history = DoublyLinkedList()
+        for i in range(n):
+            history.append({"id": i})
+        return history
+    return {"bound": "1", "setup": setup, "run": lambda history: len(history.get_history())}
+
+
+def timeline_append():
+    def setup(n):
+        # Mostly in order, like real logging, with 1% late (back-dated) entries
+        rng = random.Random(1)
+        entries = [({"timestamp": f"{max(0, i - rng.randint(1, 50)) if rng.random() < 0.01 else i:010d}"},)
+                   for i in range(n)]
+        return TimeIndexedList(), entries
+    return {"bound": "1", "setup": setup, "run": lambda s: calls(s[0].append, s[1])}
+
+
+def timeline_query():
+    def setup(n):
+        timeline = TimeIndexedList()
+        for i in range(n):
+            timeline.append({"timestamp": f"{i:010d}"})
+        rng = random.Random(1)
+        return timeline, [{"start": f"{rng.randrange(n):010d}", "limit": 20} for _ in range(QUERIES)]
+
+    def run(state):
+        timeline, queries = state
+        for query in queries:
+            timeline.query(**query)
+        return len(queries)
+    return {"bound": "log", "setup": setup, "run": run}
+
+
+def heap_push():
+    def setup(n):
+        rng = random.Random(1)
+        return MaxHeap(), [((rng.random(), i),) for i in range(n)]
+    return {"bound": "log", "setup": setup, "run": lambda s: calls(s[0].push, s[1])}
+
+
+def heap_pop():
+    def setup(n):
+        heap = MaxHeap()
+        rng = random.Random(1)
+        for i in range(n):
+            heap.push((rng.random(), i))
+        return heap, [()] * n
+    return {"bound": "log", "setup": setup, "run": lambda s: calls(s[0].pop, s[1])}
+
+
+def indexed_heap_update():
+    def setup(n):
+        heap = IndexedMaxHeap()
+        rng = random.Random(1)
+        for i in range(n):
+            heap.push(rng.randint(1, 100), "task", i)
+        return heap, [(rng.randrange(n), rng.randint(1, 100)) for _ in range(QUERIES)]
+    return {"bound": "log", "setup": setup, "run": lambda s: calls(s[0].update_priority, s[1])}
+
+
+def graph_add_edge():
+    def setup(n):
+        rng = random.Random(1)
+        return Graph(), [(f"v{i}", f"v{rng.randrange(n)}") for i in range(n) for _ in range(4)]
+    return {"bound": "1", "setup": setup, "run": lambda s: calls(s[0].add_edge, s[1])}
+
+
+def graph_bfs():
+    def setup(n):
+        graph = Graph()
+        rng = random.Random(1)
+        for i in range(n):
+            graph.add_edge(f"v{i}", f"v{(i + 1) % n}")  # A ring keeps everything reachable
+            for _ in range(3):
+                graph.add_edge(f"v{i}", f"v{rng.randrange(n)}")
+        return graph
+    # Ops are vertices visited, each O(1 + degree)
+    return {"bound": "1", "setup": setup, "run": lambda graph: len(graph.bfs("v0"))}
+
+
+def stack_push_pop():
+    def setup(n):
+        return Stack(), [(i,) for i in range(n)], [()] * n
+
+    def run(state):
+        stack, pushes, pops = state
+        return calls(stack.push, pushes) + calls(stack.pop, pops)
+    return {"bound": "1", "setup": setup, "run": run}
+
+
+WORKLOADS = {
+    "hash_map.put": hash_map_put(HashMap),
+    "hash_map.get": hash_map_get(HashMap),
+    "hash_map.open_addressing.put": hash_map_put(OpenAddressingHashMap),
+    "hash_map.open_addressing.get": hash_map_get(OpenAddressingHashMap),
+    "trie.insert": trie_insert(Trie),
+    "trie.search_prefix": trie_search(Trie),
+    "radix_trie.insert": trie_insert(RadixTrie),
+    "radix_trie.search_prefix": trie_search(RadixTrie),
+    "linked_list.append": list_append(),
+    "linked_list.traverse": list_traverse(),
+    "time_indexed_list.append": timeline_append(),
+    "time_indexed_list.query": timeline_query(),
+    "heap.push": heap_push(),
+    "heap.pop": heap_pop(),
+    "indexed_heap.update_priority": indexed_heap_update(),
+    "graph.add_edge": graph_add_edge(),
+    "graph.bfs": graph_bfs(),
+    "stack.push_pop": stack_push_pop(),
+}
+
+
+def run_once(workload, n, traced):
+    state = workload["setup"](n)
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    ops = workload["run"](state)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return ops, elapsed, peak
+
+
+def measure(workload, n, repeat, min_time, memory):
+    best, runs, total = None, 0, 0.0
+    while runs < repeat or (total < min_time and runs < MAX_RUNS):
+        ops, elapsed, _ = run_once(workload, n, False)
+        if best is None or elapsed < best[1]:
+            best = ops, elapsed
+        runs += 1
+        total += elapsed
+    ops, elapsed = best
+    result = {"ops": ops, "ops_per_sec": ops / elapsed if elapsed else float("inf")}
+    if memory:
+        # Setup runs untraced too, so this is what the timed phase itself allocated at peak
+        result["peak_bytes"] = run_once(workload, n, True)[2]
+    return result
+
+
+def calibrate(rounds=7):
+    """Best-of-rounds ops/sec of a fixed mix of dict, list, str and arithmetic work"""
+    best = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        table, items = {}, []
+        for i in range(CALIBRATION_OPS):
+            key = str(i % 997)
+            table[key] = table.get(key, 0) + i * 3 // 7
+            items.append(key)
+        items.sort()
+        best = max(best, CALIBRATION_OPS / (time.perf_counter() - start))
+    return best
+
+
+def scaling_failures(results, factor):
+    """Per-op time from smallest to largest N may grow by `factor` (times log N for 'log' bounds)"""
+    failures = []
+    for name, by_size in results.items():
+        sizes = sorted(by_size, key=int)
+        if len(sizes) < 2:
+            continue
+        small, large = int(sizes[0]), int(sizes[-1])
+        growth = by_size[sizes[0]]["ops_per_sec"] / by_size[sizes[-1]]["ops_per_sec"]
+        allowed = factor * (math.log2(large) / math.log2(small) if WORKLOADS[name]["bound"] == "log" else 1)
+        if growth > allowed:
+            failures.append(f"{name}: per-op time grew {growth:.1f}x from N={small} to N={large} "
+                            f"(O({WORKLOADS[name]['bound']}) allows {allowed:.1f}x)")
+    return failures
+
+
+def compare(results, baseline, threshold, speed=1.0, memory_floor=MEMORY_FLOOR):
+    """
+    Rows of (name, n, metric, baseline, now, change, regressed) and whether
+    any passed the threshold. ops/sec is divided by `speed`, this machine's
+    calibration relative to the baseline's, before comparing. A peak_bytes
+    growth under `memory_floor` bytes never counts: on a few hundred bytes
+    a stray allocation is already a large percentage.
+    """
+    rows, regressed = [], False
+    for name, by_size in results.items():
+        for n, now in by_size.items():
+            before = baseline.get(name, {}).get(n)
+            if not before:
+                continue
+            for metric, worse_if_higher in (("ops_per_sec", False), ("peak_bytes", True)):
+                if metric not in now or not before.get(metric):
+                    continue
+                value = now[metric] / speed if metric == "ops_per_sec" else now[metric]
+                change = value / before[metric] - 1
+                bad = change > threshold if worse_if_higher else change < -threshold
+                if metric == "peak_bytes" and value - before[metric] < memory_floor:
+                    bad = False
+                regressed |= bad
+                rows.append((name, n, metric, before[metric], now[metric], change, bad))
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated N, e.g. 1000,10000,100000,1000000,10000000")
+    parser.add_argument("--only", help="comma-separated workload names or globs, e.g. hash_map.*,heap.pop")
+    parser.add_argument("--repeat", type=int, default=3, help="minimum timed runs per workload and size (best kept)")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds of timed work per workload and size")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.35, help="allowed relative regression")
+    parser.add_argument("--memory-floor", type=int, default=MEMORY_FLOOR,
+                        help="ignore peak_bytes growth smaller than this many bytes")
+    parser.add_argument("--retries", type=int, default=3,
+                        help="re-measure workloads that look slower this many times before failing")
+    parser.add_argument("--save-baseline", help="also write the results here")
+    parser.add_argument("--check-scaling", action="store_true", help="fail on super-linear per-op growth")
+    parser.add_argument("--scaling-factor", type=float, default=4.0,
+                        help="per-op slowdown allowed across sizes for O(1) (cache effects)")
+    parser.add_argument("--list", action="store_true", help="list workloads and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, workload in WORKLOADS.items():
+            print(f"{name:<32}O({workload['bound']})")
+        return
+    names = list(WORKLOADS)
+    if args.only:
+        patterns = args.only.split(",")
+        names = [name for name in names if any(fnmatch.fnmatch(name, p) for p in patterns)]
+        if not names:
+            parser.error(f"no workload matches {args.only!r}")
+    sizes = [int(float(size)) for size in args.sizes.split(",")]
+
+    calibration = calibrate()
+    results = {}
+    print(f"{'workload':<32}{'N':>10}{'ops/s':>14}{'ns/op':>10}{'peak MB':>10}")
+    for name in names:
+        results[name] = {}
+        for n in sizes:
+            result = results[name][str(n)] = measure(WORKLOADS[name], n, args.repeat, args.min_time,
+                                                     not args.no_memory)
+            peak = f"{result['peak_bytes'] / 1e6:>10.2f}" if "peak_bytes" in result else f"{'-':>10}"
+            print(f"{name:<32}{n:>10}{result['ops_per_sec']:>14,.0f}{1e9 / result['ops_per_sec']:>10.0f}{peak}",
+                  flush=True)
+
+    report = {
+        "meta": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                 "machine": platform.machine(), "system": platform.system(), "cpus": os.cpu_count(),
+                 "date": datetime.datetime.now().isoformat(timespec="seconds"), "sizes": sizes,
+                 "repeat": args.repeat, "calibration_ops_per_sec": (calibration + calibrate()) / 2},
+        "results": results,
+    }
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("python") != report["meta"]["python"]:
+            print(f"note: baseline was recorded on Python {baseline['meta'].get('python')}")
+        speed = 1.0
+        if baseline["meta"].get("calibration_ops_per_sec"):
+            speed = report["meta"]["calibration_ops_per_sec"] / baseline["meta"]["calibration_ops_per_sec"]
+            print(f"machine speed vs baseline: {speed:.2f}x (ops/sec changes are scaled by it)")
+        rows, regressed = compare(results, baseline["results"], args.threshold, speed, args.memory_floor)
+        for _ in range(args.retries):
+            # A noisy neighbour can stall any single workload; only a slowdown that survives re-runs counts
+            slow = {(name, n) for name, n, metric, _, _, _, bad in rows if bad and metric == "ops_per_sec"}
+            if not slow:
+                break
+            print(f"re-measuring {len(slow)} slower workload(s)")
+            for name, n in sorted(slow):
+                again = measure(WORKLOADS[name], int(n), args.repeat, args.min_time, False)
+                results[name][n]["ops_per_sec"] = max(results[name][n]["ops_per_sec"], again["ops_per_sec"])
+            rows, regressed = compare(results, baseline["results"], args.threshold, speed, args.memory_floor)
+        print(f"\n{'workload':<32}{'N':>10}  {'metric':<12}{'baseline':>14}{'now':>14}{'change':>9}")
+        for name, n, metric, before, now, change, bad in rows:
+            print(f"{name:<32}{n:>10}  {metric:<12}{before:>14,.0f}{now:>14,.0f}{change:>+9.0%}"
+                  f"{'  REGRESSION' if bad else ''}")
+        if regressed:
+            print(f"\nFAIL: regression beyond {args.threshold:.0%} against {args.baseline}")
+        failed |= regressed
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    print(f"\nresults written to {args.output}")
+
+    if args.check_scaling:
+        failures = scaling_failures(results, args.scaling_factor)
+        for failure in failures:
+            print(f"SCALING: {failure}")
+        failed |= bool(failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
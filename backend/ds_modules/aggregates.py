@@ -0,0 +1,97 @@
+import re
+
+_HOURS = re.compile(r"(\d+(?:\.\d+)?)\s*h")
+_MINUTES = re.compile(r"(\d+(?:\.\d+)?)\s*m")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def parse_number(value):
+    """Leading number of a form field ("250", "250 kcal", 250.0); 0 if none"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    match = _NUMBER.search(str(value or ""))
+    if not match:
+        return 0
+    number = float(match.group())
+    return int(number) if number.is_integer() else number
+
+
+def parse_minutes(duration):
+    """Minutes in a duration string: "45 min", "1h 30m", "1.5 h", "20" """
+    text = str(duration or "").lower()
+    hours = _HOURS.search(text)
+    minutes = _MINUTES.search(text)
+    if hours or minutes:
+        total = float(hours.group(1)) * 60 if hours else 0
+        total += float(minutes.group(1)) if minutes else 0
+        return int(round(total))
+    return int(parse_number(text))
+
+
+class DashboardSummary:
+    """O(1) running totals over workout history and the nutrition log"""
+
+    def __init__(self):
+        self.workouts = 0
+        self.burned_calories = 0
+        self.minutes = 0
+        self.meals = 0
+        self.intake_calories = 0
+        self.protein = 0
+        self.carbs = 0
+        self.fat = 0
+
+    def add_workout(self, entry, sign=1):
+        """Entries carry `minutes`, parsed once when they are logged"""
+        minutes = entry.get("minutes")
+        if minutes is None:
+            minutes = parse_minutes(entry.get("duration"))
+        self.workouts += sign
+        self.burned_calories += sign * parse_number(entry.get("calories"))
+        self.minutes += sign * minutes
+
+    def add_workouts(self, entries, sign=1):
+        """O(B) A batch, folded into the totals with one update"""
+        count = calories = minutes = 0
+        for entry in entries:
+            m = entry.get("minutes")
+            count += 1
+            calories += parse_number(entry.get("calories"))
+            minutes += parse_minutes(entry.get("duration")) if m is None else m
+        self.workouts += sign * count
+        self.burned_calories += sign * calories
+        self.minutes += sign * minutes
+
+    def add_meal(self, item, sign=1):
+        self.meals += sign
+        self.intake_calories += sign * parse_number(item.get("cals"))
+        self.protein += sign * parse_number(item.get("p"))
+        self.carbs += sign * parse_number(item.get("c"))
+        self.fat += sign * parse_number(item.get("f"))
+
+    def add_meals(self, items, sign=1):
+        """O(B) A batch, folded into the totals with one update"""
+        count = cals = protein = carbs = fat = 0
+        for item in items:
+            count += 1
+            cals += parse_number(item.get("cals"))
+            protein += parse_number(item.get("p"))
+            carbs += parse_number(item.get("c"))
+            fat += parse_number(item.get("f"))
+        self.meals += sign * count
+        self.intake_calories += sign * cals
+        self.protein += sign * protein
+        self.carbs += sign * carbs
+        self.fat += sign * fat
+
+    def to_dict(self):
+        return {
+            "workouts": self.workouts,
+            "burned_calories": self.burned_calories,
+            "minutes": self.minutes,
+            "meals": self.meals,
+            "intake_calories": round(self.intake_calories, 1),
+            "protein": round(self.protein, 1),
+            "carbs": round(self.carbs, 1),
+            "fat": round(self.fat, 1),
+        }
@@ -0,0 +1,68 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: finds every occurrence of every pattern in one
+    left-to-right pass over the text, O(T + matches), independent of the
+    number of patterns.
+    """
+
+    def __init__(self, patterns=None):
+        self.goto = [{}]      # state -> {char: state}
+        self.fail = [0]       # state -> longest proper suffix state
+        self.out = [[]]       # state -> pattern ids ending exactly here
+        self.dict_link = [0]  # state -> nearest suffix state with output (0 = none)
+        self.patterns = []    # id -> (pattern, value)
+        self._built = False
+        for pattern in patterns or ():
+            self.add(pattern)
+
+    def add(self, pattern, value=None):
+        """O(P) Add a pattern; value defaults to the pattern itself"""
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.dict_link.append(0)
+                self.goto[state][char] = nxt
+            state = nxt
+        self.out[state].append(len(self.patterns))
+        self.patterns.append((pattern, pattern if value is None else value))
+        self._built = False
+
+    def build(self):
+        """O(total pattern length) Compute failure and output links (BFS)"""
+        queue = deque(self.goto[0].values())  # Depth-1 states fail to the root
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and char not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(char, 0)
+                link = self.fail[nxt]
+                self.dict_link[nxt] = link if self.out[link] else self.dict_link[link]
+                queue.append(nxt)
+        self._built = True
+
+    def iter_matches(self, text):
+        """O(T + matches) Yield (start, end, value) for every occurrence, end exclusive"""
+        if not self._built:
+            self.build()
+        goto, fail, out, dict_link, patterns = self.goto, self.fail, self.out, self.dict_link, self.patterns
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            s = state
+            while s:
+                for pid in out[s]:
+                    pattern, value = patterns[pid]
+                    yield i + 1 - len(pattern), i + 1, value
+                s = dict_link[s]
@@ -0,0 +1,105 @@
+import json
+import threading
+from collections import deque
+
+RESYNC = (0, "resync", "event: resync\ndata: {}\n\n", None)
+
+
+def sse_frame(seq, event_type, data):
+    """One Server-Sent Events message"""
+    return f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscription:
+    """
+    Bounded per-subscriber queue. Publishing never blocks: a subscriber
+    that falls `maxsize` events behind has its backlog dropped and gets a
+    single resync event telling it to reload instead.
+    """
+
+    def __init__(self, maxsize, types=None, partition=None):
+        self.maxsize = maxsize
+        self.types = types
+        self.partition = partition
+        self.events = deque()
+        self.dropped = 0
+        self._ready = threading.Condition()
+
+    def offer(self, event):
+        """O(1) Queue an event (seq, type, frame, partition) if this subscriber wants it; resync always gets through"""
+        if self.types is not None and event[1] not in self.types and event[1] != "resync":
+            return
+        with self._ready:
+            if len(self.events) >= self.maxsize:
+                self.dropped += len(self.events)
+                self.events.clear()
+                self.events.append(RESYNC)
+            elif not self.events or self.events[0] is not RESYNC:
+                self.events.append(event)
+            self._ready.notify()
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within `timeout` seconds"""
+        with self._ready:
+            if not self.events and not self._ready.wait_for(lambda: self.events, timeout):
+                return None
+            return self.events.popleft()
+
+
+class EventBus:
+    """
+    In-process pub/sub. Each event is serialized once, stamped with a
+    monotonically increasing id and fanned out to every subscriber's
+    bounded queue. The last `history` events are kept so a client that
+    reconnects with Last-Event-ID picks up where it left off.
+
+    An event published to a partition (e.g. a user) only reaches that
+    partition's subscribers; one published without a partition reaches
+    everyone. Ids are global, so they stay comparable across partitions.
+    """
+
+    def __init__(self, queue_size=256, history=1024):
+        self.queue_size = queue_size
+        self.seq = 0
+        self.history = deque(maxlen=history)
+        self._subscribers = {}  # partition -> set of subscriptions
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(group) for group in self._subscribers.values())
+
+    def publish(self, event_type, data, partition=None):
+        """O(S) Fan an event out to the S subscribers it is for; returns its id"""
+        with self._lock:
+            self.seq += 1
+            event = (self.seq, event_type, sse_frame(self.seq, event_type, data), partition)
+            self.history.append(event)
+            if partition is None:
+                targets = [s for group in self._subscribers.values() for s in group]
+            else:
+                targets = self._subscribers.get(partition, ())
+            for subscriber in targets:
+                subscriber.offer(event)
+            return self.seq
+
+    def subscribe(self, types=None, last_id=None, queue_size=None, partition=None):
+        """New subscription, replaying events after `last_id` when still in history"""
+        subscriber = Subscription(queue_size or self.queue_size, types, partition)
+        with self._lock:
+            if last_id is not None and last_id < self.seq:
+                if self.history and self.history[0][0] <= last_id + 1:
+                    for event in self.history:
+                        if event[0] > last_id and event[3] in (None, partition):
+                            subscriber.offer(event)
+                else:
+                    subscriber.offer(RESYNC)  # Missed events are gone
+            self._subscribers.setdefault(partition, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            group = self._subscribers.get(subscriber.partition)
+            if group is not None:
+                group.discard(subscriber)
+                if not group:
+                    del self._subscribers[subscriber.partition]
@@ -0,0 +1,166 @@
+import mmap
+import struct
+import sys
+from array import array
+
+MACROS = ("cals", "p", "c", "f")
+TEXT_FIELDS = ("benefits", "control")
+
+
+def _number(value):
+    # float32 -> the value as written: 16.9 not 16.899999618530273, 165 not 165.0
+    value = round(value, 3)
+    return int(value) if value.is_integer() else value
+
+
+class FoodCatalogue:
+    """
+    Food items stored by column: item id -> name in one list, each macro in
+    a float32 array (4 bytes per value), and the descriptive text either
+    interned in memory or left in the catalogue file and read on demand.
+    A row costs a few dozen bytes instead of a dict per item; a full dict
+    is only built for the items a request actually returns.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}        # name -> item id
+        self.macros = {m: array("f") for m in MACROS}
+        self._text = None    # field -> list of interned strings, for items added in memory
+        self._mapped = None  # (text offsets, text start, mmap) when text stays in the file
+        self._file = None
+
+    @classmethod
+    def from_dict(cls, items):
+        """O(N) Build from {name: {"cals", "p", "c", "f", "benefits", "control"}}"""
+        catalogue = cls()
+        for name, item in items.items():
+            catalogue.add(name, **item)
+        return catalogue
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def add(self, name, benefits="", control="", **macros):
+        """O(1) amortized Add an item (or replace the one with this name); returns its id"""
+        if self._mapped is not None:
+            raise TypeError("a catalogue loaded from file is read-only")
+        if self._text is None:
+            self._text = {field: [] for field in TEXT_FIELDS}
+        text = {"benefits": benefits, "control": control}
+        item_id = self.ids.get(name)
+        if item_id is None:
+            item_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            for m in MACROS:
+                self.macros[m].append(macros.get(m) or 0)
+            for field in TEXT_FIELDS:
+                self._text[field].append(sys.intern(text[field] or ""))
+        else:
+            for m in MACROS:
+                self.macros[m][item_id] = macros.get(m) or 0
+            for field in TEXT_FIELDS:
+                self._text[field][item_id] = sys.intern(text[field] or "")
+        return item_id
+
+    def macro(self, item_id, m):
+        """O(1) One macro of an item, e.g. macro(i, "p")"""
+        return _number(self.macros[m][item_id])
+
+    def text(self, item_id, field):
+        """O(1) Descriptive text, read from the file for a loaded catalogue"""
+        if self._mapped is None:
+            return self._text[field][item_id] if self._text else ""
+        offsets, start, mm = self._mapped
+        i = 2 * item_id + TEXT_FIELDS.index(field)
+        return mm[start + offsets[i]:start + offsets[i + 1]].decode()
+
+    def item(self, item_id):
+        """O(1) The item as a fresh dict (what the API returns)"""
+        item = {"name": self.names[item_id]}
+        for m in MACROS:
+            item[m] = _number(self.macros[m][item_id])
+        for field in TEXT_FIELDS:
+            item[field] = self.text(item_id, field)
+        return item
+
+    def get(self, name):
+        item_id = self.ids.get(name)
+        return None if item_id is None else self.item(item_id)
+
+    def index(self, trie):
+        """Insert every name into a search trie (in bulk where the trie supports it)"""
+        entries = ((name, name, 0) for name in self.names)
+        if hasattr(trie, "insert_many"):
+            trie.insert_many(entries)
+        else:
+            for name, data, score in entries:
+                trie.insert(name, data, score)
+
+    def save(self, path):
+        """Write the catalogue file read by load()"""
+        if any("\n" in name for name in self.names):
+            raise ValueError("food names cannot contain newlines")
+        texts = bytearray()
+        offsets = array("I", [0])
+        for item_id in range(len(self.names)):
+            for field in TEXT_FIELDS:
+                texts += self.text(item_id, field).encode()
+                offsets.append(len(texts))
+        names = "\n".join(self.names).encode()
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(self.names), len(names)))
+            for m in MACROS:
+                f.write(self.macros[m].tobytes())
+            f.write(offsets.tobytes())
+            f.write(names)
+            f.write(texts)
+
+    @classmethod
+    def load(cls, path):
+        """
+        O(N) bulk read: the macro columns and text offsets are read
+        straight into arrays, names with one decode and split; the text
+        itself is memory-mapped and only touched when an item is returned.
+        """
+        catalogue = cls()
+        f = open(path, "rb")
+        try:
+            magic, version, count, names_size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a food catalogue")
+            for m in MACROS:
+                catalogue.macros[m].fromfile(f, count)
+            offsets = array("I")
+            offsets.fromfile(f, 2 * count + 1)
+            names = f.read(names_size).decode()
+            catalogue.names = names.split("\n") if count else []
+            catalogue.ids = {name: i for i, name in enumerate(catalogue.names)}
+            text_start = f.tell()
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else b""
+        except Exception:
+            f.close()
+            raise
+        catalogue._file = f
+        catalogue._mapped = (offsets, text_start, mm)
+        return catalogue
+
+    def close(self):
+        if self._mapped is not None and isinstance(self._mapped[2], mmap.mmap):
+            self._mapped[2].close()
+        if self._file is not None:
+            self._file.close()
+
+
+# --- Catalogue file format ---
+# header:   magic(8) version(u32) count(u32) names_size(u32)
+# macros:   one column per MACROS entry, count x f32 each
+# text_off: (2 * count + 1) x u32 into the text blob, benefits then control per item
+# names:    UTF-8, newline-separated, in id order
+# text blob
+_MAGIC = b"FOODCAT\0"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIII")
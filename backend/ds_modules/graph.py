@@ -1,35 +1,78 @@
+import heapq
+import threading
+from array import array
+from collections import deque
+
+from .response_cache import LRUCache
+
+
 class Graph:
     def __init__(self):
         self.adj_list = {}
+        self.folded = {}   # casefolded vertex -> vertex
+        self.sources = {}  # casefolded vertex -> vertices with an edge to it, in edge order
 
     def add_vertex(self, vertex):
         """O(1) Add a new node"""
         if vertex not in self.adj_list:
             self.adj_list[vertex] = []
+            self.folded.setdefault(vertex.casefold() if isinstance(vertex, str) else vertex, vertex)
 
     def add_edge(self, v1, v2):
-        """O(1) Add connection between nodes"""
+        """O(1) Add connection between nodes (and index v2 -> v1)"""
         if v1 not in self.adj_list:
             self.add_vertex(v1)
         if v2 not in self.adj_list:
             self.add_vertex(v2)
-        
+
         self.adj_list[v1].append(v2)
         # self.adj_list[v2].append(v1) # Uncomment for undirected
+        sources = self.sources.setdefault(v2.casefold() if isinstance(v2, str) else v2, [])
+        if v1 not in sources:
+            sources.append(v1)
 
     def get_neighbors(self, vertex):
         """O(1) Get immediate connections"""
         return self.adj_list.get(vertex, [])
 
+    def bundle(self, name, size=3):
+        """
+        O(C * size) Suggestions to go with `name`, C being the number of its
+        categories. Each category contributes its first entries in order;
+        an entry scores 1/(rank+1) per category listing it, so items shared
+        by several of the exercise's categories come first. A category name
+        gets its own first entries. Returns (categories, bundle).
+        """
+        key = name.casefold()
+        categories = self.sources.get(key)
+        if not categories:
+            category = self.folded.get(key)
+            if not self.adj_list.get(category):
+                return [], []
+            categories = [category]
+        scores = {}
+        for category in categories:
+            rank = 0
+            for item in self.adj_list[category]:
+                if rank >= size:
+                    break
+                if item.casefold() == key:
+                    continue
+                scores[item] = scores.get(item, 0) + 1 / (rank + 1)
+                rank += 1
+        # Stable sort: equal scores keep first-category, first-position order
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return list(categories), ranked[:size]
+
     def bfs(self, start_vertex):
         """O(V + E) Breadth First Search for recommendations"""
         visited = set()
-        queue = [start_vertex]
+        queue = deque([start_vertex])
         visited.add(start_vertex)
         result = []
 
         while queue:
-            vertex = queue.pop(0)
+            vertex = queue.popleft()
             result.append(vertex)
 
             for neighbor in self.adj_list.get(vertex, []):
@@ -37,3 +80,253 @@ class Graph:
                     visited.add(neighbor)
                     queue.append(neighbor)
         return result
+
+
+class CoOccurrenceGraph:
+    """
+    Weighted, undirected exercise graph learned from workout history: two
+    exercises logged in the same session (a day) gain weight count_a *
+    count_b, so adding and removing entries is exact.
+
+    Edges live in CSR form - offsets / indices / weights typed arrays with
+    each row sorted heaviest first - plus a small per-vertex delta overlay
+    that takes incremental updates in O(1). Once the overlay holds
+    `compact_threshold` entries it is frozen and folded into fresh arrays
+    on a background thread, which swaps them in under the lock; writes go
+    to a new overlay meanwhile, so no request waits on the rebuild.
+    Recommendations are
+    personalized PageRank by local push, so a query touches at most
+    `max_edges` edges however large the graph is; results are cached per
+    graph version.
+    """
+
+    def __init__(self, compact_threshold=50000, cache_size=1024):
+        self.compact_threshold = compact_threshold
+        self.ids = {}                 # name -> vertex id
+        self.names = []               # vertex id -> name
+        self.offsets = array("q", [0])
+        self.indices = array("i")
+        self.weights = array("f")
+        self.strength = array("d")    # total edge weight per vertex, base + delta
+        self.delta = {}               # vertex id -> {neighbour id: weight change}
+        self.frozen = {}              # overlay being folded in by the compactor, same shape
+        self.pending = 0
+        self.sessions = {}            # session key -> {vertex id: entries logged}
+        self.version = 0
+        self.cache = LRUCache(cache_size)
+        self._lock = threading.RLock()
+        self._compactor = None
+
+    @classmethod
+    def from_csr(cls, names, offsets, indices, weights, **kwargs):
+        """Bulk-load prebuilt CSR arrays, rows heaviest first as compact() writes them"""
+        graph = cls(**kwargs)
+        graph.names = list(names)
+        graph.ids = {name: i for i, name in enumerate(graph.names)}
+        graph.offsets, graph.indices, graph.weights = offsets, indices, weights
+        graph.strength = array("d", (sum(weights[offsets[v]:offsets[v + 1]]) for v in range(len(graph.names))))
+        return graph
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.indices) + sum(len(row) for row in self.frozen.values()) + self.pending
+
+    def _vid(self, name):
+        vid = self.ids.get(name)
+        if vid is None:
+            vid = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.offsets.append(self.offsets[-1])  # Empty CSR row
+            self.strength.append(0.0)
+        return vid
+
+    def add_weight(self, a, b, weight):
+        """O(1) amortized Adjust the undirected edge a-b by `weight`"""
+        with self._lock:
+            u, v = self._vid(a), self._vid(b)
+            for x, y in ((u, v), (v, u)):
+                row = self.delta.setdefault(x, {})
+                if y not in row:
+                    self.pending += 1
+                row[y] = row.get(y, 0) + weight
+                self.strength[x] += weight
+            self.version += 1
+            if self.pending >= self.compact_threshold and self._compactor is None:
+                self._compactor = threading.Thread(target=self._compact_in_background, name="graph-compact", daemon=True)
+                self._compactor.start()
+
+    def record(self, session, name, sign=1):
+        """O(exercises in the session) Count (sign=1) or uncount (-1) one logged exercise"""
+        with self._lock:
+            v = self._vid(name)
+            counts = self.sessions.setdefault(session, {})
+            if sign < 0:
+                if not counts.get(v):
+                    return
+                counts[v] -= 1
+                if not counts[v]:
+                    del counts[v]
+            for u, count in list(counts.items()):
+                if u != v:
+                    self.add_weight(self.names[u], name, sign * count)
+            if sign > 0:
+                counts[v] = counts.get(v, 0) + 1
+            if not counts:
+                del self.sessions[session]
+
+    def record_many(self, session, names):
+        """
+        O(B + D^2) Count a batch of B logged exercises at once, D being the
+        distinct exercises in the session: each touched pair gets its
+        weight change new_a * new_b - old_a * old_b in one update.
+        """
+        with self._lock:
+            counts = self.sessions.setdefault(session, {})
+            added = {}
+            for name in names:
+                v = self._vid(name)
+                added[v] = added.get(v, 0) + 1
+            old = dict(counts)
+            for v, n in added.items():
+                counts[v] = counts.get(v, 0) + n
+            for v in added:
+                for u in counts:
+                    if u == v or u in added and u < v:
+                        continue  # Pairs of two added vertices once
+                    self.add_weight(self.names[u], self.names[v], counts[u] * counts[v] - old.get(u, 0) * old.get(v, 0))
+
+    def compact(self):
+        """O(V + E log D) Fold both overlays into fresh CSR arrays now, after any background rebuild"""
+        while True:
+            compactor = self._compactor
+            if compactor is not None:
+                compactor.join()
+            with self._lock:
+                if self._compactor is None:
+                    frozen = self._freeze()
+                    self._install(frozen[0], _build_csr(*frozen))
+                    return
+
+    def _compact_in_background(self):
+        """O(V + E log D) off the lock: only the freeze and the swap hold it"""
+        with self._lock:
+            frozen = self._freeze()
+        built = _build_csr(*frozen)
+        with self._lock:
+            self._install(frozen[0], built)
+            self._compactor = None
+
+    def _freeze(self):
+        """O(1) Caller holds the lock: hand the live overlay to the rebuild, start a new one"""
+        self.frozen, self.delta, self.pending = self.delta, {}, 0
+        return len(self.names), self.offsets, self.indices, self.weights, self.frozen
+
+    def _install(self, count, built):
+        """O(new vertices) Caller holds the lock: swap in rebuilt arrays covering the first `count` vertices"""
+        offsets, indices, weights = built
+        for _ in range(count, len(self.names)):
+            offsets.append(offsets[-1])  # Vertices added during the rebuild
+        self.offsets, self.indices, self.weights = offsets, indices, weights
+        self.frozen = {}
+
+    def _row(self, v):
+        """[(neighbour, weight)] of vertex v with the overlays applied"""
+        return _merged_row(self.offsets, self.indices, self.weights, v, self.frozen.get(v), self.delta.get(v))
+
+    def _overlaid(self, v):
+        return v in self.delta or v in self.frozen
+
+    def neighbors(self, name, k=10):
+        """O(k) from a compacted row, O(D) while it has pending updates: [(exercise, weight)] heaviest first"""
+        with self._lock:
+            v = self.ids.get(name)
+            if v is None:
+                return []
+            if not self._overlaid(v):
+                o = self.offsets[v]
+                end = min(self.offsets[v + 1], o + k)
+                return [(self.names[n], w) for n, w in zip(self.indices[o:end], self.weights[o:end])]
+            row = heapq.nlargest(k, self._row(v), key=lambda edge: edge[1])
+            return [(self.names[n], w) for n, w in row]
+
+    def recommend(self, seeds, k=10, alpha=0.15, eps=1e-4, max_edges=10000):
+        """
+        Personalized PageRank from `seeds` ({name: weight} or names) by
+        Andersen-Chung-Lang push: residual mass above `eps` is pushed to
+        neighbours in proportion to edge weight, stopping after `max_edges`
+        edge visits. Returns [(exercise, score)] best first, seeds excluded.
+        """
+        if not isinstance(seeds, dict):
+            seeds = {name: 1.0 for name in seeds}
+        with self._lock:
+            start = {self.ids[name]: w for name, w in seeds.items() if name in self.ids and w > 0}
+            if not start:
+                return []
+            key = (tuple(sorted(start.items())), k, alpha, eps, max_edges, self.version)
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+
+            total = sum(start.values())
+            residual = {v: w / total for v, w in start.items()}
+            rank = {}
+            queue = deque(residual)
+            queued = set(queue)
+            offsets, indices, weights, strength, overlaid = self.offsets, self.indices, self.weights, self.strength, self._overlaid
+            budget = max_edges
+            get = residual.get
+            while queue and budget > 0:
+                u = queue.popleft()
+                queued.discard(u)
+                r = residual.pop(u, 0.0)
+                rank[u] = rank.get(u, 0.0) + alpha * r
+                if strength[u] <= 0:
+                    rank[u] += (1 - alpha) * r  # Dangling: keep the mass
+                    continue
+                share = (1 - alpha) * r / strength[u]
+                if overlaid(u):
+                    row = self._row(u)
+                    budget -= len(row)
+                else:
+                    o, e = offsets[u], offsets[u + 1]
+                    row = zip(indices[o:e], weights[o:e])
+                    budget -= e - o
+                for n, w in row:
+                    value = get(n, 0.0) + share * w
+                    residual[n] = value
+                    if value >= eps and n not in queued:
+                        queued.add(n)
+                        queue.append(n)
+
+            best = heapq.nlargest(k, ((score, n) for n, score in rank.items() if n not in start))
+            result = [(self.names[n], round(score, 6)) for score, n in best]
+            self.cache.put(key, result, 1)
+            return result
+
+
+def _merged_row(offsets, indices, weights, v, *overlays):
+    """[(neighbour, weight)] of CSR row v with the given overlays (None for none) applied"""
+    o, e = offsets[v], offsets[v + 1]
+    if not any(overlays):
+        return list(zip(indices[o:e], weights[o:e]))
+    merged = dict(zip(indices[o:e], weights[o:e]))
+    for overlay in overlays:
+        for n, w in (overlay or {}).items():
+            merged[n] = merged.get(n, 0) + w
+    return [(n, w) for n, w in merged.items() if w > 1e-9]
+
+
+def _build_csr(count, offsets, indices, weights, overlay):
+    """O(V + E log D) Fresh CSR arrays for the first `count` rows, overlay folded in, rows heaviest first"""
+    new_offsets, new_indices, new_weights = array("q", [0]), array("i"), array("f")
+    for v in range(count):
+        row = _merged_row(offsets, indices, weights, v, overlay.get(v))
+        row.sort(key=lambda edge: -edge[1])
+        for n, w in row:
+            new_indices.append(n)
+            new_weights.append(w)
+        new_offsets.append(len(new_indices))
+    return new_offsets, new_indices, new_weights
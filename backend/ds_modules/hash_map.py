@@ -1,41 +1,266 @@
+import threading
+from array import array
+
+
 class HashMap:
-    def __init__(self, capacity=100):
+    """
+    Separate chaining with load-factor driven growth.
+
+    When size / capacity passes load_factor a table twice as large is
+    allocated and buckets are migrated a few at a time on each subsequent
+    write (incremental rehashing), so no single call pays for the whole
+    table. Buckets are created lazily so allocating the larger table is a
+    single flat list.
+
+    Writers serialize on a lock. get() takes none and never mutates: a
+    migrated entry is added to the new table before it leaves the old
+    one, and a miss that raced a table swap is retried under the lock, so
+    any number of readers can run beside a writer.
+    """
+
+    def __init__(self, capacity=100, load_factor=0.75, rehash_step=4):
         self.capacity = capacity
         self.size = 0
-        self.buckets = [[] for _ in range(capacity)]
+        self.load_factor = load_factor
+        self.rehash_step = rehash_step
+        self.buckets = [None] * capacity
+        self._old_buckets = None  # Table being drained while rehashing
+        self._rehash_index = 0
+        self._swaps = 0  # Bumped when a rehash starts or ends
+        self._lock = threading.Lock()
 
     def _hash(self, key):
         return hash(key) % self.capacity
 
+    def _old_bucket(self, key):
+        old = self._old_buckets
+        if old is None:
+            return None
+        index = hash(key) % len(old)
+        if index < self._rehash_index:
+            return None  # Already migrated
+        return old[index]
+
+    def _start_rehash(self):
+        new = [None] * (self.capacity * 2)
+        self._swaps += 1
+        self._old_buckets = self.buckets
+        self._rehash_index = 0
+        self.buckets = new
+        self.capacity = len(new)
+
+    def _rehash_some(self, steps):
+        """O(steps) Move up to `steps` old buckets into the new table"""
+        old = self._old_buckets
+        if old is None:
+            return
+        end = min(self._rehash_index + steps, len(old))
+        buckets = self.buckets
+        for i in range(self._rehash_index, end):
+            for k, v in old[i] or ():
+                index = hash(k) % self.capacity
+                if buckets[index] is None:
+                    buckets[index] = []
+                buckets[index].append((k, v))
+            old[i] = None
+        self._rehash_index = end
+        if end == len(old):
+            self._swaps += 1
+            self._old_buckets = None
+            self._rehash_index = 0
+
     def put(self, key, value):
         """O(1) Average case insert/update"""
+        with self._lock:
+            self._put(key, value)
+
+    def _put(self, key, value):
+        self._rehash_some(self.rehash_step)
+        old_bucket = self._old_bucket(key)
+        if old_bucket:
+            for i, (k, v) in enumerate(old_bucket):
+                if k == key:
+                    old_bucket[i] = (key, value)  # Update in place, migrates later
+                    return
+
         index = self._hash(key)
         bucket = self.buckets[index]
-        
+        if bucket is None:
+            bucket = self.buckets[index] = []
+
         for i, (k, v) in enumerate(bucket):
             if k == key:
                 bucket[i] = (key, value) # Update
                 return
-        
+
         bucket.append((key, value)) # Insert
         self.size += 1
 
+        if self.size > self.capacity * self.load_factor:
+            if self._old_buckets is not None:
+                self._rehash_some(len(self._old_buckets))
+            self._start_rehash()
+
     def get(self, key):
         """O(1) Average case retrieval"""
-        index = self._hash(key)
-        bucket = self.buckets[index]
-        for k, v in bucket:
+        swaps = self._swaps
+        found, value = self._find(key)
+        if not found and swaps != self._swaps:
+            with self._lock:
+                found, value = self._find(key)
+        return value
+
+    def _find(self, key):
+        old_bucket = self._old_bucket(key)
+        if old_bucket:
+            for k, v in old_bucket:
+                if k == key:
+                    return True, v
+        buckets = self.buckets  # One table for both the index and the lookup
+        for k, v in buckets[hash(key) % len(buckets)] or ():
             if k == key:
-                return v
-        return None
+                return True, v
+        return False, None
 
     def remove(self, key):
         """O(1) Average case removal"""
-        index = self._hash(key)
-        bucket = self.buckets[index]
-        for i, (k, v) in enumerate(bucket):
-            if k == key:
-                del bucket[i]
-                self.size -= 1
-                return True
+        with self._lock:
+            return self._remove(key)
+
+    def _remove(self, key):
+        self._rehash_some(self.rehash_step)
+        for bucket in (self._old_bucket(key), self.buckets[self._hash(key)]):
+            if not bucket:
+                continue
+            for i, (k, v) in enumerate(bucket):
+                if k == key:
+                    del bucket[i]
+                    self.size -= 1
+                    return True
         return False
+
+    def items(self):
+        """O(N) Iterate over all (key, value) pairs"""
+        if self._old_buckets is not None:
+            for bucket in self._old_buckets[self._rehash_index:]:
+                for k, v in bucket or ():
+                    yield k, v
+        for bucket in self.buckets:
+            for k, v in bucket or ():
+                yield k, v
+
+    def __len__(self):
+        return self.size
+
+
+_EMPTY = object()   # Not None: None is a valid key
+_DELETED = object()
+
+
+class OpenAddressingHashMap:
+    """
+    Linear probing over parallel arrays: cached hashes in a packed int64
+    array, keys and values in two flat lists. No per-entry tuple or bucket
+    list is allocated, and probes compare the cached hash before the key.
+    Capacity is always a power of two; the table doubles in one pass when
+    more than two thirds of the slots are used (live + tombstones).
+    """
+
+    def __init__(self, capacity=8):
+        cap = 8
+        while cap < capacity:
+            cap *= 2
+        self.size = 0
+        self._used = 0  # live entries + tombstones
+        self._alloc(cap)
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._hashes = array("q", bytes(8 * capacity))
+        self._keys = [_EMPTY] * capacity
+        self._values = [None] * capacity
+
+    def _slot(self, key, h):
+        """Index of the slot holding key, or -1"""
+        mask = self._mask
+        hashes = self._hashes
+        keys = self._keys
+        i = h & mask
+        while True:
+            k = keys[i]
+            if k is _EMPTY:
+                return -1
+            if k is not _DELETED and hashes[i] == h and (k is key or k == key):
+                return i
+            i = (i + 1) & mask
+
+    def _resize(self, capacity):
+        old = zip(self._hashes, self._keys, self._values)
+        self._alloc(capacity)
+        mask = self._mask
+        for h, k, v in old:
+            if k is _EMPTY or k is _DELETED:
+                continue
+            i = h & mask
+            while self._keys[i] is not _EMPTY:
+                i = (i + 1) & mask
+            self._hashes[i] = h
+            self._keys[i] = k
+            self._values[i] = v
+        self._used = self.size
+
+    def put(self, key, value):
+        """O(1) Average case insert/update"""
+        h = hash(key)
+        mask = self._mask
+        keys = self._keys
+        i = h & mask
+        tombstone = -1
+        while True:
+            k = keys[i]
+            if k is _EMPTY:
+                break
+            if k is _DELETED:
+                if tombstone < 0:
+                    tombstone = i
+            elif self._hashes[i] == h and (k is key or k == key):
+                self._values[i] = value
+                return
+            i = (i + 1) & mask
+
+        if tombstone >= 0:
+            i = tombstone
+        else:
+            self._used += 1
+        self._hashes[i] = h
+        keys[i] = key
+        self._values[i] = value
+        self.size += 1
+
+        if self._used * 3 > self.capacity * 2:
+            self._resize(self.capacity * 2 if self.size * 3 > self.capacity else self.capacity)
+
+    def get(self, key):
+        """O(1) Average case retrieval"""
+        i = self._slot(key, hash(key))
+        return self._values[i] if i >= 0 else None
+
+    def remove(self, key):
+        """O(1) Average case removal (leaves a tombstone)"""
+        i = self._slot(key, hash(key))
+        if i < 0:
+            return False
+        self._keys[i] = _DELETED
+        self._values[i] = None
+        self.size -= 1
+        return True
+
+    def items(self):
+        """O(capacity) Iterate over all (key, value) pairs"""
+        for k, v in zip(self._keys, self._values):
+            if k is not _EMPTY and k is not _DELETED:
+                yield k, v
+
+    def __len__(self):
+        return self.size
@@ -1,3 +1,6 @@
+import heapq
+
+
 class MaxHeap:
     def __init__(self):
         self.heap = []
@@ -24,23 +27,183 @@ class MaxHeap:
         return self.heap[0] if self.heap else None
 
     def _sift_up(self, idx):
-        parent = (idx - 1) // 2
-        # Max Heap: Swap if child is GREATER than parent
-        if parent >= 0 and self.heap[idx][0] > self.heap[parent][0]:
-            self.heap[idx], self.heap[parent] = self.heap[parent], self.heap[idx]
-            self._sift_up(parent)
+        heap = self.heap
+        item = heap[idx]
+        # Max Heap: move parents down while the child is GREATER
+        while idx > 0:
+            parent = (idx - 1) // 2
+            if item[0] <= heap[parent][0]:
+                break
+            heap[idx] = heap[parent]
+            idx = parent
+        heap[idx] = item
+
+    def _sift_down(self, idx):
+        heap = self.heap
+        n = len(heap)
+        while True:
+            largest = idx
+            left = 2 * idx + 1
+            right = left + 1
+
+            # Max Heap: Find the largest among parent and children
+            if left < n and heap[left][0] > heap[largest][0]:
+                largest = left
+            if right < n and heap[right][0] > heap[largest][0]:
+                largest = right
+
+            if largest == idx:
+                return
+            heap[idx], heap[largest] = heap[largest], heap[idx]
+            idx = largest
+
+
+class IndexedMaxHeap:
+    """
+    Max heap of (priority, data) items addressed by stable ids, so any
+    item can be reprioritized or removed in O(log N). Equal priorities
+    come out in insertion order. Sifts are iterative.
+    """
+
+    def __init__(self):
+        self.heap = []      # ids in heap order
+        self._pos = {}      # id -> index in self.heap
+        self._key = {}      # id -> (priority, -insertion seq), compared as max
+        self._data = {}     # id -> data
+        self._next_id = 1
+        self._seq = 0
+
+    @property
+    def next_id(self):
+        """Id the next item without one gets; snapshots save it so deleted ids are never reused"""
+        return self._next_id
+
+    def reserve_ids(self, next_id):
+        """O(1) Never hand out an id below next_id"""
+        self._next_id = max(self._next_id, next_id)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item_id):
+        return item_id in self._pos
+
+    def push(self, priority, data, item_id=None):
+        """O(log N) Insert and return the item's id"""
+        if item_id is None:
+            item_id = self._next_id
+        elif item_id in self._pos:
+            raise KeyError(f"duplicate id {item_id}")
+        self._next_id = max(self._next_id, item_id + 1)
+        self._seq += 1
+        self._key[item_id] = (priority, -self._seq)
+        self._data[item_id] = data
+        self.heap.append(item_id)
+        self._pos[item_id] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+        return item_id
+
+    def get(self, item_id):
+        """O(1) (id, priority, data) or None"""
+        if item_id not in self._pos:
+            return None
+        return item_id, self._key[item_id][0], self._data[item_id]
+
+    def peek(self):
+        """O(1) View highest priority item as (id, priority, data)"""
+        return self.get(self.heap[0]) if self.heap else None
+
+    def pop(self):
+        """O(log N) Remove and return highest priority item"""
+        return self.remove(self.heap[0]) if self.heap else None
+
+    def remove(self, item_id):
+        """O(log N) Remove any item by id"""
+        idx = self._pos.get(item_id)
+        if idx is None:
+            return None
+        item = self.get(item_id)
+        last = self.heap.pop()
+        del self._pos[item_id]
+        if last != item_id:
+            self.heap[idx] = last
+            self._pos[last] = idx
+            self._sift_up(idx)
+            self._sift_down(self._pos[last])
+        del self._key[item_id]
+        del self._data[item_id]
+        return item
+
+    def update_priority(self, item_id, priority):
+        """O(log N) Change an item's priority in place"""
+        idx = self._pos.get(item_id)
+        if idx is None:
+            return False
+        old = self._key[item_id]
+        self._key[item_id] = (priority, old[1])
+        if self._key[item_id] > old:
+            self._sift_up(idx)
+        else:
+            self._sift_down(idx)
+        return True
+
+    def top_k(self, k):
+        """
+        O(k log k) The k highest items, best first, without touching the
+        heap: a small frontier heap expands only the children of items
+        already taken.
+        """
+        result = []
+        if not self.heap or k <= 0:
+            return result
+        key, heap = self._key, self.heap
+        frontier = [(_neg(key[heap[0]]), 0)]
+        while frontier and len(result) < k:
+            _, idx = heapq.heappop(frontier)
+            result.append(self.get(heap[idx]))
+            for child in (2 * idx + 1, 2 * idx + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (_neg(key[heap[child]]), child))
+        return result
+
+    def items(self):
+        """O(N log N) Every item, best first"""
+        return self.top_k(len(self.heap))
+
+    def _sift_up(self, idx):
+        heap, pos, key = self.heap, self._pos, self._key
+        item = heap[idx]
+        item_key = key[item]
+        while idx > 0:
+            parent = (idx - 1) // 2
+            if item_key <= key[heap[parent]]:
+                break
+            heap[idx] = heap[parent]
+            pos[heap[idx]] = idx
+            idx = parent
+        heap[idx] = item
+        pos[item] = idx
 
     def _sift_down(self, idx):
-        largest = idx
-        left = 2 * idx + 1
-        right = 2 * idx + 2
-
-        # Max Heap: Find the largest among parent and children
-        if left < len(self.heap) and self.heap[left][0] > self.heap[largest][0]:
-            largest = left
-        if right < len(self.heap) and self.heap[right][0] > self.heap[largest][0]:
-            largest = right
-
-        if largest != idx:
-            self.heap[idx], self.heap[largest] = self.heap[largest], self.heap[idx]
-            self._sift_down(largest)
+        heap, pos, key = self.heap, self._pos, self._key
+        n = len(heap)
+        item = heap[idx]
+        item_key = key[item]
+        while True:
+            child = 2 * idx + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and key[heap[right]] > key[heap[child]]:
+                child = right
+            if key[heap[child]] <= item_key:
+                break
+            heap[idx] = heap[child]
+            pos[heap[idx]] = idx
+            idx = child
+        heap[idx] = item
+        pos[item] = idx
+
+
+def _neg(key):
+    return (-key[0], -key[1])
@@ -0,0 +1,136 @@
+import codecs
+import json
+
+_NUMBER_CHARS = "0123456789+-.eE"
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+MAX_ELEMENT = 16 * 65536  # Longest single record, in characters: 16 default read chunks
+
+
+class MalformedBody(ValueError):
+    """The body itself cannot be parsed any further (records before it were read)"""
+
+
+def iter_lines(stream, chunk_size=65536, max_line=MAX_ELEMENT):
+    """
+    Lines of a binary stream, read in chunks (line-by-line reads of a WSGI
+    input are slow). Raises MalformedBody once a line outgrows max_line
+    bytes.
+    """
+    tail = b""
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        lines = (tail + data).split(b"\n")
+        tail = lines.pop()
+        if len(tail) > max_line:
+            raise MalformedBody(f"a line is longer than {max_line} bytes")
+        yield from lines
+    if tail:
+        yield tail
+
+
+def iter_ndjson(stream, chunk_size=65536, max_line=MAX_ELEMENT):
+    """
+    O(1) memory per record: yield (index, record) for each non-blank line
+    of a binary stream. A line that is not valid JSON yields (index, error)
+    instead, so one bad record does not sink the rest.
+    """
+    index = 0
+    for line in iter_lines(stream, chunk_size, max_line):
+        if not line.strip():
+            continue
+        try:
+            yield index, json.loads(line)
+        except ValueError as e:
+            yield index, ValueError(f"invalid JSON: {e}")
+        index += 1
+
+
+def iter_json_array(stream, chunk_size=65536, max_element=MAX_ELEMENT):
+    """
+    Yield (index, record) from a binary stream holding one JSON array,
+    decoding it incrementally so only the current element and one read
+    chunk are in memory. Raises MalformedBody on a syntax error or once an
+    element outgrows max_element characters.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, eof, fresh = "", 0, False, ""
+
+    def fill():
+        # Drop consumed text and read the next chunk; False once nothing is left to read
+        nonlocal buf, pos, eof, fresh
+        if eof:
+            return False
+        data = stream.read(chunk_size)
+        eof = not data
+        fresh = text = utf8.decode(data, final=eof)
+        if not text:
+            return not eof  # Leaves buf and pos alone, so positions into it stay valid
+        buf = buf[pos:] + text
+        pos = 0
+        return True
+
+    def fill_to_closer(index):
+        # An unfinished element cannot end before a '}' or ']' arrives (a bare
+        # scalar ends by the array's ']' at the latest), so only then is it
+        # worth decoding again - each attempt rescans the whole element
+        while fill():
+            if len(buf) - pos > max_element:
+                raise MalformedBody(f"element {index} is longer than {max_element} characters")
+            if "}" in fresh or "]" in fresh:
+                return True
+        return False
+
+    def next_char():
+        # First non-whitespace character at or after pos, reading as needed
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return None
+
+    if next_char() != "[":
+        raise MalformedBody("expected a JSON array")
+    pos += 1
+    if next_char() == "]":
+        return
+    index = 0
+    while True:
+        if next_char() is None:
+            raise MalformedBody(f"unexpected end of body in element {index}")
+        while True:
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except ValueError as e:
+                if fill_to_closer(index):
+                    continue  # Element spans the chunk boundary
+                raise MalformedBody(f"element {index}: {getattr(e, 'msg', e)}")
+            if not eof:
+                # Need the delimiter in view: "12" or "1.5e" may go on in the next chunk
+                j = end
+                while j < len(buf) and buf[j] in " \t\r\n":
+                    j += 1
+                if (j == len(buf) or buf[j] in _NUMBER_CHARS and not buf[j:].strip(_NUMBER_CHARS)) and fill():
+                    continue
+            break
+        pos = end
+        yield index, record
+        index += 1
+        delimiter = next_char()
+        pos += 1
+        if delimiter == "]":
+            return
+        if delimiter != ",":
+            raise MalformedBody(f"expected ',' or ']' after element {index - 1}")
+
+
+def iter_records(stream, mimetype):
+    """NDJSON for the NDJSON content types, otherwise a JSON array"""
+    if mimetype in NDJSON_TYPES:
+        return iter_ndjson(stream)
+    return iter_json_array(stream)
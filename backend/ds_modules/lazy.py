@@ -0,0 +1,69 @@
+import collections
+import threading
+
+
+class Lazy:
+    """
+    A value built by factory() on first use, exactly once even when several
+    threads ask at the same time. Attribute access is forwarded to the
+    value, so a Lazy can stand in for the object it builds.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    @property
+    def built(self):
+        return self._built
+
+    def value(self):
+        """O(1) after the first call"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._value = self._build()
+                    self._built = True
+        return self._value
+
+    def _build(self):
+        return self._factory()
+
+    def __getattr__(self, name):
+        return getattr(self.value(), name)
+
+    def __contains__(self, item):
+        return item in self.value()
+
+    def __len__(self):
+        return len(self.value())
+
+
+class LazyTrie(Lazy):
+    """
+    A search trie over words() built on first search. Popularity bumps that
+    arrive before then (e.g. replaying the log at startup) are summed per
+    word and become the initial scores, so they don't force the build.
+    """
+
+    def __init__(self, factory, words):
+        super().__init__(factory)
+        self._words = words
+        self._pending = collections.Counter()
+
+    def bump(self, word, delta=1):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._pending[word.lower()] += delta
+                    return True
+        return self._value.bump(word, delta)
+
+    def _build(self):
+        trie = self._factory()
+        pending = self._pending
+        trie.insert_many((word, word, pending.get(word.lower(), 0)) for word in self._words())
+        self._pending = None
+        return trie
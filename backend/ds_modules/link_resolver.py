@@ -0,0 +1,70 @@
+from .aho_corasick import AhoCorasick
+
+
+class ExerciseLinkResolver:
+    """
+    Maps a free-form workout title to a tutorial link. All indexes are
+    built once from the video map; resolving a title never scans the keys.
+
+    Match tiers, highest first:
+      1. exact or case-insensitive key
+      2. trie prefix suggestion
+      3. longest known exercise contained in the title (Aho-Corasick)
+      4. a title word (3+ chars) that appears inside some key
+      5. YouTube search fallback
+    """
+
+    def __init__(self, video_map, trie=None, min_word=3):
+        self.video_map = video_map
+        self.trie = trie
+        self.min_word = min_word
+        self.by_lower = {}
+        self.contained = AhoCorasick()
+        self.fragments = {}
+        for order, (key, link) in enumerate(video_map.items()):
+            lower = key.lower()
+            self.by_lower.setdefault(lower, link)
+            # Longest wins, then the earliest key in the map
+            self.contained.add(lower, (len(key), -order, key))
+            # Every substring long enough to be a title word -> first key containing it
+            for i in range(len(lower)):
+                for j in range(i + min_word, len(lower) + 1):
+                    self.fragments.setdefault(lower[i:j], link)
+        self.contained.build()
+
+    def resolve(self, name):
+        """O(T) Resolve one title of length T"""
+        name = name.strip()
+        if not name:
+            return {"link": ""}
+        name_lower = name.lower()
+
+        link = self.video_map.get(name) or self.by_lower.get(name_lower)
+        if link:
+            return {"link": link}
+
+        if self.trie is not None:
+            suggestions = self.trie.search_prefix(name, 1)
+            if suggestions:
+                link = self.video_map.get(suggestions[0])
+                if link:
+                    return {"link": link, "matched_via": "Trie Prefix", "suggestion": suggestions[0]}
+
+        best = max((value for _, _, value in self.contained.iter_matches(name_lower)), default=None)
+        if best:
+            key = best[2]
+            return {"link": self.video_map[key], "matched_keyword": key}
+
+        for word in name_lower.split():
+            if len(word) < self.min_word:
+                continue
+            link = self.fragments.get(word)
+            if link:
+                return {"link": link, "matched_via": "Word Match"}
+
+        search_link = f"https://www.youtube.com/results?search_query={name.replace(' ', '+')}+tutorial"
+        return {"link": search_link, "fallback": True}
+
+    def resolve_many(self, names):
+        """O(sum of T) Resolve a batch of titles"""
+        return [self.resolve(name) for name in names]
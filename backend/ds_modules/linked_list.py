@@ -1,3 +1,6 @@
+import bisect
+
+
 class Node:
     def __init__(self, data):
         self.data = data
@@ -44,3 +47,190 @@ class DoublyLinkedList:
             self.tail.next = None
         self.size -= 1
         return data
+
+    def remove_node(self, node):
+        """O(1) Unlink any node"""
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.prev = node.next = None
+        self.size -= 1
+        return node.data
+
+    def insert_before(self, node, data):
+        """O(1) Insert data in front of an existing node"""
+        new_node = Node(data)
+        new_node.next = node
+        new_node.prev = node.prev
+        if node.prev:
+            node.prev.next = new_node
+        else:
+            self.head = new_node
+        node.prev = new_node
+        self.size += 1
+        return new_node
+
+
+class TimeIndexedList(DoublyLinkedList):
+    """
+    History list kept in timestamp order, with an id -> node map for O(1)
+    delete and a sorted timestamp array beside it for range lookups.
+    Deleted entries are only tombstoned in the array and swept once they
+    make up half of it, so delete stays O(1) amortized.
+    """
+
+    def __init__(self, key_field="timestamp", id_field="id"):
+        super().__init__()
+        self.key_field = key_field
+        self.id_field = id_field
+        self._by_id = {}
+        self._keys = []   # sorted timestamps, parallel to _nodes
+        self._nodes = []
+        self._dead = 0
+        self._next_id = 1
+
+    @property
+    def next_id(self):
+        """Id the next entry without one gets; snapshots save it so deleted ids are never reused"""
+        return self._next_id
+
+    def reserve_ids(self, next_id):
+        """O(1) Never hand out an id below next_id"""
+        self._next_id = max(self._next_id, next_id)
+
+    def append(self, data):
+        """O(1) for in-order timestamps, O(N) to place an older one"""
+        entry_id = data.get(self.id_field)
+        if entry_id is None:
+            entry_id = data[self.id_field] = self._next_id
+        self._next_id = max(self._next_id, entry_id + 1)
+        key = data.get(self.key_field) or ""
+
+        i = bisect.bisect_right(self._keys, key)
+        successor = self._first_live(i, 1)
+        if successor is None:
+            super().append(data)
+            node = self.tail
+        else:
+            node = self.insert_before(successor, data)
+        self._index(node, key, entry_id)
+        self._keys.insert(i, key)
+        self._nodes.insert(i, node)
+
+    def extend(self, entries):
+        """
+        O(B log B + N) Add a batch: sorted once, then appended if it is all
+        newer than the list, else merged in one pass (which also sweeps
+        tombstones) instead of B separate inserts.
+        """
+        batch = []
+        for data in entries:
+            entry_id = data.get(self.id_field)
+            if entry_id is None:
+                entry_id = data[self.id_field] = self._next_id
+            self._next_id = max(self._next_id, entry_id + 1)
+            batch.append((data.get(self.key_field) or "", entry_id, data))
+        batch.sort(key=lambda item: item[0])  # Stable: equal keys keep batch order
+
+        keys, nodes = self._keys, self._nodes
+        if keys and batch and batch[0][0] < keys[-1]:
+            keys, nodes = [], []
+            old_keys, old_nodes, i = self._keys, self._nodes, 0
+            for key, entry_id, data in batch:
+                # Existing entries with an equal key stay first, as with append()
+                while i < len(old_nodes) and (old_nodes[i].dead or old_keys[i] <= key):
+                    if not old_nodes[i].dead:
+                        keys.append(old_keys[i])
+                        nodes.append(old_nodes[i])
+                    i += 1
+                if i < len(old_nodes):
+                    node = self.insert_before(old_nodes[i], data)
+                else:
+                    super().append(data)
+                    node = self.tail
+                self._index(node, key, entry_id)
+                keys.append(key)
+                nodes.append(node)
+            for k, n in zip(old_keys[i:], old_nodes[i:]):
+                if not n.dead:
+                    keys.append(k)
+                    nodes.append(n)
+            self._keys, self._nodes, self._dead = keys, nodes, 0
+            return
+        for key, entry_id, data in batch:
+            super().append(data)
+            self._index(self.tail, key, entry_id)
+            keys.append(key)
+            nodes.append(self.tail)
+
+    def _index(self, node, key, entry_id):
+        node.id = entry_id
+        node.key = key
+        node.dead = False
+        self._by_id[entry_id] = node
+
+    def _first_live(self, i, step):
+        nodes = self._nodes
+        while 0 <= i < len(nodes):
+            if not nodes[i].dead:
+                return nodes[i]
+            i += step
+        return None
+
+    def get(self, entry_id):
+        """O(1) Entry by id"""
+        node = self._by_id.get(entry_id)
+        return node.data if node else None
+
+    def remove(self, entry_id):
+        """O(1) amortized Delete an entry by id"""
+        node = self._by_id.pop(entry_id, None)
+        if node is None:
+            return None
+        node.dead = True
+        self._dead += 1
+        if self._dead * 2 > len(self._nodes):
+            live = [(k, n) for k, n in zip(self._keys, self._nodes) if not n.dead]
+            self._keys = [k for k, _ in live]
+            self._nodes = [n for _, n in live]
+            self._dead = 0
+        return self.remove_node(node)
+
+    def delete_last(self):
+        """O(1) Delete most recent workout (if needed)"""
+        return self.remove(self.tail.id) if self.tail else None
+
+    def query(self, start=None, end=None, after=None, limit=50, reverse=False):
+        """
+        O(log N + limit) One page of entries with start <= timestamp <= end,
+        where end also matches any timestamp it prefixes (end=2024-05-01
+        covers that whole day). `after` is the cursor returned with the
+        previous page. Returns (entries, next_cursor or None).
+        """
+        end_key = None if end is None else end + "\uffff"
+        if after is not None:
+            node = self._by_id.get(after)
+            if node is None:
+                raise KeyError(after)
+            node = node.prev if reverse else node.next
+        elif reverse:
+            i = len(self._keys) if end_key is None else bisect.bisect_left(self._keys, end_key)
+            node = self._first_live(i - 1, -1)
+        else:
+            i = 0 if start is None else bisect.bisect_left(self._keys, start)
+            node = self._first_live(i, 1)
+
+        def in_range(n):
+            return (end_key is None or n.key < end_key) and (start is None or n.key >= start)
+
+        page = []
+        while node and in_range(node) and len(page) < limit:
+            page.append(node.data)
+            node = node.prev if reverse else node.next
+        more = node is not None and in_range(node)
+        return page, (page[-1][self.id_field] if page and more else None)
@@ -0,0 +1,56 @@
+import threading
+from contextlib import ExitStack, contextmanager
+
+
+class StripedLock:
+    """
+    A fixed set of re-entrant locks; key k is guarded by stripe
+    hash(k) % n. Work on keys in different stripes never contends, and
+    the lock count stays constant however many keys there are.
+    """
+
+    def __init__(self, stripes=64):
+        self.stripes = [threading.RLock() for _ in range(max(1, stripes))]
+
+    def __len__(self):
+        return len(self.stripes)
+
+    def lock(self, key):
+        """O(1) The lock guarding `key`"""
+        return self.stripes[hash(key) % len(self.stripes)]
+
+    @contextmanager
+    def all(self):
+        """Hold every stripe (always taken in index order, so this cannot deadlock)"""
+        with ExitStack() as stack:
+            for lock in self.stripes:
+                stack.enter_context(lock)
+            yield
+
+
+class Partitions:
+    """O(1) Per-key state containers, created by factory(key) on first use"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.partitions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        state = self.partitions.get(key)
+        if state is None:
+            with self._lock:
+                state = self.partitions.get(key)
+                if state is None:
+                    state = self.partitions[key] = self.factory(key)
+        return state
+
+    def __contains__(self, key):
+        return key in self.partitions
+
+    def __len__(self):
+        return len(self.partitions)
+
+    def items(self):
+        """Snapshot of (key, state) pairs, safe while partitions are being added"""
+        return list(self.partitions.items())
@@ -0,0 +1,145 @@
+import bisect
+
+from .trie import Trie
+
+
+class RadixNode:
+    __slots__ = ("label", "children", "is_end_of_word", "data", "key", "score", "top")
+
+    def __init__(self, label=""):
+        self.label = label       # Edge label from the parent (path compression)
+        self.children = {}       # First char of child label -> child
+        self.is_end_of_word = False
+        self.data = None
+        self.key = None
+        self.score = 0
+        self.top = []
+
+
+class RadixTrie(Trie):
+    """
+    Path-compressed Trie: chains of single-child nodes collapse into one
+    node with a multi-character label. Same insert / search_prefix / bump
+    API and the same per-node top-k caches as Trie.
+    """
+
+    def __init__(self, top_k=10):
+        super().__init__(top_k)
+        self.root = RadixNode()
+
+    def insert(self, word, data=None, score=0):
+        """O(L * K) Insert word, splitting at most one edge"""
+        key = word.lower()
+        node = self.root
+        path = [node]
+        rest = key
+        while rest:
+            child = node.children.get(rest[0])
+            if child is None:
+                child = RadixNode(rest)
+                node.children[rest[0]] = child
+                path.append(child)
+                node = child
+                break
+            label = child.label
+            common = 1
+            limit = min(len(label), len(rest))
+            while common < limit and label[common] == rest[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge: mid takes the shared part, child keeps the tail
+                mid = RadixNode(label[:common])
+                mid.top = list(child.top)
+                child.label = label[common:]
+                mid.children[child.label[0]] = child
+                node.children[rest[0]] = mid
+                child = mid
+            path.append(child)
+            node = child
+            rest = rest[common:]
+
+        old = node.score if node.is_end_of_word else None
+        node.is_end_of_word = True
+        node.key = key
+        node.data = data if data else word
+        node.score = score
+        self._refresh(path, old)
+
+    def insert_many(self, entries):
+        """
+        O(N log N + total key length) Bulk insert of (word, data, score)
+        entries: into an empty trie the keys are sorted once, each edge is
+        cut from a run of keys sharing a prefix and every top-k cache is
+        merged bottom-up once, instead of walking N root-to-leaf paths.
+        A word given twice keeps its last entry, as with insert().
+        """
+        if self.root.children or self.root.is_end_of_word:
+            for word, data, score in entries:
+                self.insert(word, data, score)
+            return
+        latest = {}
+        for word, data, score in entries:
+            latest[word.lower()] = (data if data else word, score)
+        keys = sorted(latest)
+
+        top_k = self.top_k
+
+        def fill(node, lo, hi, depth):
+            # keys[lo:hi] all start with the node's depth-character prefix
+            top = node.top
+            if len(keys[lo]) == depth:
+                node.is_end_of_word = True
+                node.key = keys[lo]
+                node.data, node.score = latest[node.key]
+                top.append((-node.score, node.key, node.data))
+                lo += 1
+            while lo < hi:
+                first = keys[lo]
+                # The run of keys continuing with first[depth], then its shared prefix:
+                # sorted, so that is the prefix of its first and last key
+                end = bisect.bisect_left(keys, first[:depth] + chr(ord(first[depth]) + 1), lo + 1, hi)
+                last = keys[end - 1]
+                common = depth + 1
+                limit = min(len(first), len(last))
+                while common < limit and first[common] == last[common]:
+                    common += 1
+                child = RadixNode(first[depth:common])
+                node.children[first[depth]] = child
+                fill(child, lo, end, common)
+                top += child.top
+                lo = end
+            if len(node.children) + node.is_end_of_word > 1:
+                top.sort()  # Small lists: one sort beats a k-way merge here
+                del top[top_k:]
+
+        if keys:
+            fill(self.root, 0, len(keys), 0)
+
+    def _path(self, word):
+        node = self.root
+        path = [node]
+        rest = word.lower()
+        while rest:
+            node = node.children.get(rest[0])
+            if node is None or not rest.startswith(node.label):
+                return None
+            path.append(node)
+            rest = rest[len(node.label):]
+        return path if node.is_end_of_word else None
+
+    def _edges(self, node):
+        return ((child.label, child) for child in node.children.values())
+
+    def _locate(self, prefix):
+        node = self.root
+        rest = prefix
+        while rest:
+            node = node.children.get(rest[0])
+            if node is None:
+                return None
+            if node.label.startswith(rest):
+                return node  # Prefix ends inside this edge
+            if not rest.startswith(node.label):
+                return None
+            rest = rest[len(node.label):]
+        return node
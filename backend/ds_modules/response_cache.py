@@ -0,0 +1,69 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class StoreVersions:
+    """
+    Monotonic change counter per store. Readers derive ETags and cache keys
+    from the versions of the stores they depend on, so a response is reused
+    until one of those stores changes. `boot` keeps tags from one process
+    from matching another whose counters restarted at zero.
+    """
+
+    def __init__(self):
+        self.boot = os.urandom(4).hex()
+        self.versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *stores):
+        """Call after the mutation is applied, never before"""
+        with self._lock:
+            for store in stores:
+                self.versions[store] = self.versions.get(store, 0) + 1
+
+    def get(self, *stores):
+        return tuple(self.versions.get(store, 0) for store in stores)
+
+    def etag(self, stores):
+        return ".".join([self.boot, *map(str, self.get(*stores))])
+
+
+class LRUCache:
+    """O(1) get/put, evicting least recently used entries past `capacity` items or `max_bytes` of values"""
+
+    def __init__(self, capacity=1024, max_bytes=32 * 1024 * 1024):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """Store `value`, accounted as `size` bytes"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._entries[key] = (value, size)
+            self.size += size
+            while len(self._entries) > self.capacity or self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
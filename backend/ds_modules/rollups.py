@@ -0,0 +1,131 @@
+import bisect
+import datetime
+from array import array
+
+from .aggregates import parse_minutes, parse_number
+
+METRICS = ("workouts", "calories", "minutes", "meals", "intake", "protein", "carbs", "fat")
+GRANULARITIES = ("day", "week", "month")
+
+
+def _ordinal(value):
+    """Day ordinal of an ISO date/datetime string, or None"""
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+def _bound(value):
+    """Day ordinal of a query bound; None (unbounded) only when it is absent"""
+    day = _ordinal(value)
+    if day is None and value:
+        raise ValueError(f"not an ISO date: {value!r}")
+    return day
+
+
+def _period_start(ordinal, granularity):
+    if granularity == "week":
+        return ordinal - (ordinal - 1) % 7  # Monday
+    if granularity == "month":
+        d = datetime.date.fromordinal(ordinal)
+        return d.replace(day=1).toordinal()
+    return ordinal
+
+
+class Rollups:
+    """
+    Pre-aggregated trend buckets. Each event is added into its day, week
+    and month bucket - sorted period keys with one parallel array per
+    metric - and a delete adds the negated values, so memory grows with
+    the number of periods, not events, and a trend query is two binary
+    searches and a slice however many events were logged.
+    """
+
+    def __init__(self):
+        # granularity -> (sorted period-start ordinals, {metric: sums})
+        self.buckets = {g: (array("l"), {m: array("d") for m in METRICS}) for g in GRANULARITIES}
+
+    def record(self, when, **values):
+        """O(1) amortized (O(P) when a period lands before the newest one)"""
+        day = _ordinal(when)
+        if day is None:
+            return False
+        for granularity, (keys, sums) in self.buckets.items():
+            key = _period_start(day, granularity)
+            if keys and keys[-1] == key:
+                i = len(keys) - 1
+            else:
+                i = bisect.bisect_left(keys, key)
+                if i == len(keys) or keys[i] != key:
+                    keys.insert(i, key)
+                    for column in sums.values():
+                        column.insert(i, 0.0)
+            for m, v in values.items():
+                sums[m][i] += v
+        return True
+
+    def add_workout(self, entry, sign=1):
+        when, values = self._workout_values(entry, sign)
+        return self.record(when, **values)
+
+    def add_meal(self, item, sign=1):
+        when, values = self._meal_values(item, sign)
+        return self.record(when, **values)
+
+    @staticmethod
+    def _workout_values(entry, sign):
+        minutes = entry.get("minutes")
+        if minutes is None:
+            minutes = parse_minutes(entry.get("duration"))
+        return entry.get("timestamp"), {"workouts": sign, "calories": sign * parse_number(entry.get("calories")),
+                                        "minutes": sign * minutes}
+
+    @staticmethod
+    def _meal_values(item, sign):
+        return item.get("timestamp"), {"meals": sign, "intake": sign * parse_number(item.get("cals")),
+                                       "protein": sign * parse_number(item.get("p")),
+                                       "carbs": sign * parse_number(item.get("c")),
+                                       "fat": sign * parse_number(item.get("f"))}
+
+    def add_workouts(self, entries, sign=1):
+        """O(B + D) A batch summed per day first, then recorded once for each of its D days"""
+        return self._record_days(self._workout_values(e, sign) for e in entries)
+
+    def add_meals(self, items, sign=1):
+        return self._record_days(self._meal_values(i, sign) for i in items)
+
+    def _record_days(self, rows):
+        days = {}
+        for when, values in rows:
+            day = str(when)[:10] if when else None
+            totals = days.get(day)
+            if totals is None:
+                days[day] = totals = dict.fromkeys(values, 0)
+            for m, v in values.items():
+                totals[m] += v
+        return sum(self.record(day, **totals) for day, totals in days.items())
+
+    def series(self, metric, granularity="day", start=None, end=None):
+        """
+        O(log P + R) [(period_start_iso, value)] for the R periods that
+        overlap [start, end] (ISO dates; ValueError for anything else).
+        Periods are labelled by their first day, Monday for weeks.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+        keys, sums = self.buckets[granularity]
+        start_day, end_day = _bound(start), _bound(end)
+        lo = 0 if start_day is None else bisect.bisect_left(keys, _period_start(start_day, granularity))
+        hi = len(keys) if end_day is None else bisect.bisect_right(keys, end_day)
+        fromordinal = datetime.date.fromordinal
+        return [(fromordinal(k).isoformat(), _clean(v)) for k, v in zip(keys[lo:hi], sums[metric][lo:hi])]
+
+
+def _clean(value):
+    value = round(value, 2)
+    return int(value) if value.is_integer() else value
@@ -0,0 +1,243 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Up to `size` SQLite connections reused across threads. Each one keeps
+    its own prepared-statement cache, so the fixed SQL the store runs is
+    compiled once per connection rather than once per call.
+    """
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self.created = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                               check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")   # Readers never block the writer
+        conn.execute("PRAGMA synchronous=FULL")   # A commit is on disk before we answer
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, opening one if fewer than `size` exist"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self.created < self.size
+                if grow:
+                    self.created += 1
+            if grow:
+                conn = self._connect()
+                with self._lock:
+                    self._all.append(conn)
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+
+
+class SqliteStore:
+    """
+    Shared-state backend for running several worker processes on one
+    machine. Same interface as DurableStore, but the op log and snapshots
+    live in one SQLite database in WAL mode that every worker opens.
+
+    Each worker still keeps the in-memory structures and applies ops with
+    the same apply(op, payload, partition). A write takes SQLite's write lock (BEGIN
+    IMMEDIATE), first applies any ops other workers committed since its
+    last look, then applies and appends its own - so all workers apply
+    one global sequence in the same order. sync() pulls new ops before a
+    request is served, and a follower thread does the same every
+    `poll_interval` seconds for idle workers. on_remote(count) is called
+    whenever ops from other workers were applied. Writes are serialized
+    by SQLite across all workers anyway, so one in-process lock covers
+    every partition here.
+    """
+
+    DB_FILE = "state.db"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS oplog (seq INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, payload TEXT NOT NULL, "
+        "partition TEXT)",
+        "CREATE TABLE IF NOT EXISTS snapshot (id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL, state TEXT NOT NULL)",
+    )
+
+    def __init__(self, directory, apply, dump, restore, snapshot_every=10000, pool_size=4,
+                 poll_interval=0.5, on_remote=None):
+        self.directory = directory
+        self.apply = apply
+        self.dump = dump
+        self.restore = restore
+        self.snapshot_every = snapshot_every
+        self.poll_interval = poll_interval
+        self.on_remote = on_remote
+        self.seq = 0                  # Last op applied to this worker's memory
+        os.makedirs(directory, exist_ok=True)
+        self.pool = ConnectionPool(os.path.join(directory, self.DB_FILE), pool_size)
+        self._lock = threading.RLock()
+        self._snapshotting = False
+        self._snapshot_thread = None
+        self._failed = None           # Set once memory and the log disagree
+        self._stop = threading.Event()
+        self._follower = None
+
+    def recover(self):
+        """O(S + T) Load the shared snapshot, replay the log after it and start following"""
+        with self.pool.connection() as conn, self._lock:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            row = conn.execute("SELECT seq, state FROM snapshot WHERE id = 1").fetchone()
+            if row:
+                self.seq = row[0]
+                self.restore(json.loads(row[1]))
+            replayed = self._catch_up(conn)
+        if self.poll_interval and self._follower is None:
+            self._follower = threading.Thread(target=self._follow, name="store-follower", daemon=True)
+            self._follower.start()
+        return replayed
+
+    def _catch_up(self, conn):
+        """O(new ops) Apply ops committed after self.seq, in order. Caller holds _lock."""
+        rows = conn.execute("SELECT seq, op, payload, partition FROM oplog WHERE seq > ? ORDER BY seq",
+                            (self.seq,)).fetchall()
+        if rows and rows[0][0] != self.seq + 1:
+            # The log has no gaps (AUTOINCREMENT, rollbacks included), so the
+            # missing ops were compacted away before this worker applied them
+            raise RuntimeError(f"worker is at op {self.seq} but the shared log starts at {rows[0][0]}; restart it")
+        for seq, op, payload, partition in rows:
+            self.apply(op, json.loads(payload), partition)
+            self.seq = seq
+        return len(rows)
+
+    def sync(self):
+        """O(1) when current: apply ops other workers committed. Returns how many."""
+        self._check_alive()
+        with self.pool.connection() as conn:
+            head = conn.execute("SELECT max(seq) FROM oplog").fetchone()[0] or 0
+            if head <= self.seq:
+                return 0
+            with self._lock:
+                applied = self._catch_up(conn)
+                if applied and self.on_remote is not None:
+                    self.on_remote(applied)
+                return applied
+
+    def execute(self, op, payload, on_applied=None, partition=None):
+        """
+        Apply a mutation and commit it to the shared log before returning
+        its result. on_applied(result) runs once the commit succeeded,
+        still under the lock, so nothing is published for an op that never
+        reached the log. If the op is in memory but its commit fails, the
+        worker no longer matches the log: it refuses all further work.
+        """
+        # Connection before lock, as in sync(), so a full pool cannot deadlock
+        with self.pool.connection() as conn, self._lock:
+            self._check_alive()
+            conn.execute("BEGIN IMMEDIATE")  # Serializes writers across processes
+            try:
+                remote = self._catch_up(conn)
+                if remote and self.on_remote is not None:
+                    self.on_remote(remote)
+                result = self.apply(op, payload, partition)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            try:
+                seq = conn.execute("INSERT INTO oplog (op, payload, partition) VALUES (?, ?, ?)",
+                                   (op, json.dumps(payload, separators=(",", ":")), partition)).lastrowid
+                conn.execute("COMMIT")
+            except BaseException as e:
+                self._failed = e
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise RuntimeError(f"op {op!r} was applied but not committed; this worker has diverged, restart it") from e
+            self.seq = seq
+            if on_applied is not None:
+                on_applied(result)
+            # Exactly one worker - the one that wrote the op - takes each snapshot
+            due = seq % self.snapshot_every == 0 and not self._snapshotting
+            if due:
+                # Off the request path: only dump() runs under the lock
+                self._snapshotting = True
+                self._snapshot_thread = threading.Thread(target=self._snapshot, name="snapshot", daemon=True)
+                self._snapshot_thread.start()
+        return result
+
+    def _check_alive(self):
+        if self._failed is not None:
+            raise RuntimeError("a commit failed after its op was applied; this worker has diverged, restart it")
+
+    def read(self, fn, partition=None):
+        """Run fn() on current state with writers held off"""
+        self.sync()
+        with self._lock:
+            return fn()
+
+    def snapshot(self):
+        """
+        Compact: store the full state and drop ops older than one more
+        interval, which workers that are slightly behind may still need.
+        """
+        with self._lock:
+            if self._snapshotting:
+                return
+            self._snapshotting = True
+        self._snapshot()
+
+    def _snapshot(self):
+        """Caller has set _snapshotting; this clears it"""
+        try:
+            with self._lock:
+                state = self.dump()
+                seq = self.seq
+            text = json.dumps(state, separators=(",", ":"))
+            with self.pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute("INSERT INTO snapshot (id, seq, state) VALUES (1, ?, ?) "
+                                 "ON CONFLICT (id) DO UPDATE SET seq = excluded.seq, state = excluded.state "
+                                 "WHERE excluded.seq > snapshot.seq", (seq, text))
+                    conn.execute("DELETE FROM oplog WHERE seq <= ?", (seq - self.snapshot_every,))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        finally:
+            with self._lock:
+                self._snapshotting = False
+
+    def _follow(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.sync()
+            except sqlite3.OperationalError:
+                pass  # Busy; try again next tick
+
+    def close(self):
+        self._stop.set()
+        if self._follower is not None:
+            self._follower.join()
+            self._follower = None
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+        self.pool.close()
@@ -0,0 +1,236 @@
+import json
+import os
+import threading
+
+from .partitions import StripedLock
+
+
+class WriteAheadLog:
+    """Append-only log of JSON records split into segments named by first seq."""
+
+    def __init__(self, directory, group_commit=True):
+        self.directory = directory
+        self.group_commit = group_commit
+        self.seq = 0
+        self._durable = 0
+        self._syncing = False
+        self._cond = threading.Condition()
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_path(self, first_seq):
+        return os.path.join(self.directory, f"wal-{first_seq:020d}.log")
+
+    def segments(self):
+        """O(S log S) Segment paths in replay order"""
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("wal-") and n.endswith(".log"))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def replay(self, after_seq=0):
+        """O(R) Yield records with seq > after_seq. A torn final line is ignored."""
+        for path in self.segments():
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Partial write from a crash, never acknowledged
+                    record = json.loads(line)
+                    self.seq = max(self.seq, record["seq"])
+                    if record["seq"] > after_seq:
+                        yield record
+        self._durable = self.seq
+
+    def open(self, start_seq=0):
+        """Start appending to a fresh segment after everything on disk"""
+        self.seq = max(self.seq, start_seq)
+        self._durable = self.seq
+        self._file = open(self._segment_path(self.seq + 1), "ab")
+
+    def write(self, record):
+        """O(1) Buffer a record and return its seq. Caller must hold no lock needed by sync."""
+        with self._cond:
+            self.seq += 1
+            record["seq"] = self.seq
+            self._file.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+            return self.seq
+
+    def sync(self, seq):
+        """Block until seq is on disk. Concurrent callers share one fsync (group commit)."""
+        with self._cond:
+            if not self.group_commit:
+                if self._durable < seq:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self._durable = self.seq
+                return
+            while self._durable < seq:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                # Become the leader: flush everything buffered so far and
+                # fsync outside the lock so followers keep appending.
+                self._syncing = True
+                target = self.seq
+                self._file.flush()
+                fd = self._file.fileno()
+                self._cond.release()
+                try:
+                    os.fsync(fd)
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                self._durable = max(self._durable, target)
+                self._cond.notify_all()
+
+    def append(self, record):
+        """Write and wait for durability"""
+        seq = self.write(record)
+        self.sync(seq)
+        return seq
+
+    def rotate(self):
+        """Close the current segment and start a new one. Returns the last seq of the old one."""
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._durable = self.seq
+            self._file = open(self._segment_path(self.seq + 1), "ab")
+            return self.seq
+
+    def truncate_before(self, seq):
+        """Delete closed segments whose records are all <= seq"""
+        paths = self.segments()
+        for path, nxt in zip(paths, paths[1:]):
+            next_first = int(os.path.basename(nxt)[4:-4])
+            if next_first - 1 <= seq:
+                os.remove(path)
+
+    def close(self):
+        with self._cond:
+            if self._file:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+
+class DurableStore:
+    """
+    Write-ahead logging + compacted snapshots for in-memory state.
+
+    apply(op, payload, partition) mutates the live structures and is used
+    both for new writes and for replay, so recovery runs exactly the same
+    code path. dump() returns a JSON-able copy of the full state and
+    restore(state) installs one.
+
+    Ops on different partitions (e.g. users) take different lock stripes,
+    so they apply concurrently and only share the log append and fsync;
+    ops on one partition wait for each other's fsync. A snapshot holds
+    every stripe.
+    """
+
+    SNAPSHOT_FILE = "snapshot.json"
+
+    def __init__(self, directory, apply, dump, restore, snapshot_every=10000, group_commit=True, stripes=64):
+        self.directory = directory
+        self.apply = apply
+        self.dump = dump
+        self.restore = restore
+        self.snapshot_every = snapshot_every
+        self.wal = WriteAheadLog(directory, group_commit=group_commit)
+        self._locks = StripedLock(stripes)
+        self._meta = threading.Lock()  # Snapshot bookkeeping
+        self._since_snapshot = 0
+        self._snapshotting = False
+        self._snapshot_thread = None
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, self.SNAPSHOT_FILE)
+
+    def recover(self):
+        """O(S + T) Load the latest snapshot, then replay only the log tail"""
+        with self._locks.all():
+            base_seq = 0
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "rb") as f:
+                    snap = json.load(f)
+                base_seq = snap["seq"]
+                self.restore(snap["state"])
+            replayed = 0
+            for record in self.wal.replay(after_seq=base_seq):
+                self.apply(record["op"], record["payload"], record.get("partition"))
+                replayed += 1
+            self.wal.open(start_seq=base_seq)
+            self._since_snapshot = replayed
+            return replayed
+
+    def execute(self, op, payload, on_applied=None, partition=None):
+        """
+        Apply a mutation and make it durable before returning its result.
+        on_applied(result) runs once the record is on disk, still under the
+        partition's lock, so anything it records (e.g. a change event) is
+        never seen for a write a crash could lose, and is ordered exactly
+        like the mutation itself relative to the partition's other changes.
+        """
+        record = {"op": op, "payload": payload}
+        if partition is not None:
+            record["partition"] = partition
+        with self._locks.lock(partition):
+            result = self.apply(op, payload, partition)
+            seq = self.wal.write(record)
+            # Waits with only this stripe held: other partitions keep
+            # appending and share the fsync (group commit)
+            self.wal.sync(seq)
+            if on_applied is not None:
+                on_applied(result)
+        with self._meta:
+            self._since_snapshot += 1
+            due = self._since_snapshot >= self.snapshot_every and not self._snapshotting
+        if due:
+            # Off the request path: only dump() runs with the stripes held
+            self._snapshot_thread = threading.Thread(target=self.snapshot, name="snapshot", daemon=True)
+            self._snapshot_thread.start()
+        return result
+
+    def sync(self):
+        """Nothing to catch up on: this process is the only writer"""
+        return 0
+
+    def read(self, fn, partition=None):
+        """Run fn() with the partition's writers held off: it sees no mutation half-applied"""
+        with self._locks.lock(partition):
+            return fn()
+
+    def snapshot(self):
+        """Compact: persist full state and drop log segments it covers"""
+        with self._meta:
+            if self._snapshotting:
+                return
+            self._snapshotting = True
+        try:
+            with self._locks.all():
+                state = self.dump()
+                seq = self.wal.rotate()
+            with self._meta:
+                self._since_snapshot = 0
+            # Serialization happens outside the lock; writers only append to
+            # the new segment, which replay picks up after this snapshot.
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"seq": seq, "state": state}, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+            self.wal.truncate_before(seq)
+        finally:
+            with self._meta:
+                self._snapshotting = False
+
+    def close(self):
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+        self.wal.close()
@@ -0,0 +1,152 @@
+import logging
+import math
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel. Level L has `2**slot_bits` slots, each
+    covering 2**(slot_bits * L) ticks. A timer goes into the coarsest
+    level it fits and is cascaded one level down each time the level
+    below wraps, so insert, cancel and expiry are O(1) amortized and a
+    tick only touches the one slot that is due - pending timers are
+    never scanned.
+    """
+
+    def __init__(self, tick=1.0, slot_bits=6, levels=4, start=None):
+        self.tick = tick
+        self.bits = slot_bits
+        self.mask = (1 << slot_bits) - 1
+        self.wheels = [[{} for _ in range(1 << slot_bits)] for _ in range(levels)]
+        self.current = int((time.time() if start is None else start) // tick)
+        self._where = {}  # timer id -> slot dict holding it
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, timer_id):
+        return timer_id in self._where
+
+    def schedule(self, timer_id, when, payload=None):
+        """O(1) Arm (or re-arm) a timer to expire at epoch time `when`"""
+        self.cancel(timer_id)
+        due = max(int(math.ceil(when / self.tick)), self.current + 1)
+        self._place(timer_id, due, when, payload)
+
+    def _place(self, timer_id, due, when, payload):
+        delta = due - self.current
+        level = 0
+        while level < len(self.wheels) - 1 and delta >= 1 << (self.bits * (level + 1)):
+            level += 1
+        slot = self.wheels[level][(due >> (self.bits * level)) & self.mask]
+        slot[timer_id] = (due, when, payload)
+        self._where[timer_id] = slot
+
+    def cancel(self, timer_id):
+        """O(1) Disarm a timer; False if it was not pending"""
+        slot = self._where.pop(timer_id, None)
+        if slot is None:
+            return False
+        del slot[timer_id]
+        return True
+
+    def advance(self, now):
+        """Move time forward to `now` and return [(timer_id, when, payload)] that expired"""
+        target = int(now // self.tick)
+        fired = []
+        while self.current < target:
+            if not self._where:
+                self.current = target  # Nothing pending: skip idle ticks
+                break
+            self.current += 1
+            t = self.current
+            # Cascade coarser levels whose lower level just wrapped
+            level = 1
+            while level < len(self.wheels) and (t & ((1 << (self.bits * level)) - 1)) == 0:
+                index = (t >> (self.bits * level)) & self.mask
+                slot = self.wheels[level][index]
+                self.wheels[level][index] = {}
+                for timer_id, (due, when, payload) in slot.items():
+                    self._place(timer_id, max(due, t), when, payload)
+                level += 1
+            slot = self.wheels[0][t & self.mask]
+            if slot:
+                self.wheels[0][t & self.mask] = {}
+                for timer_id, (due, when, payload) in slot.items():
+                    if due > t:  # Parked beyond the wheel's range, not yet due
+                        self._place(timer_id, due, when, payload)
+                        continue
+                    del self._where[timer_id]
+                    fired.append((timer_id, when, payload))
+        return fired
+
+
+class Scheduler:
+    """
+    Runs a TimerWheel on a background thread and calls on_fire(timer_id,
+    when, payload) for each expired timer. Timers with `every` (seconds)
+    re-arm themselves at their next occurrence.
+    """
+
+    def __init__(self, on_fire, tick=1.0, clock=time.time):
+        self.on_fire = on_fire
+        self.clock = clock
+        self.wheel = TimerWheel(tick, start=clock())
+        self._every = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def schedule(self, timer_id, when, payload=None, every=None):
+        """O(1) Arm a timer. A recurring timer whose first time has passed starts at its next occurrence."""
+        with self._lock:
+            if every:
+                now = self.clock()
+                if when <= now:
+                    when += math.ceil((now - when) / every) * every
+                self._every[timer_id] = every
+            else:
+                self._every.pop(timer_id, None)
+            self.wheel.schedule(timer_id, when, payload)
+
+    def cancel(self, timer_id):
+        with self._lock:
+            self._every.pop(timer_id, None)
+            return self.wheel.cancel(timer_id)
+
+    def __len__(self):
+        return len(self.wheel)
+
+    def run_pending(self, now=None):
+        """Fire everything due by `now`; returns how many fired"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            fired = self.wheel.advance(now)
+            for timer_id, when, payload in fired:
+                every = self._every.get(timer_id)
+                if every:
+                    nxt = when + every
+                    if nxt <= now:
+                        nxt += math.ceil((now - nxt) / every) * every
+                    self.wheel.schedule(timer_id, nxt, payload)
+        for timer_id, when, payload in fired:
+            self.on_fire(timer_id, when, payload)
+        return len(fired)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.wheel.tick):
+            try:
+                self.run_pending()
+            except Exception:  # Keep ticking; one bad callback must not stop delivery
+                log.error("Scheduler tick failed", exc_info=True)
+
+    def stop(self):
+        self._stop.set()
@@ -1,39 +1,213 @@
+import bisect
+import heapq
+import itertools
+
+
+def auto_distance(query):
+    """Edit budget that keeps short queries from matching everything"""
+    if len(query) <= 3:
+        return 0
+    if len(query) <= 6:
+        return 1
+    return 2
+
+
 class TrieNode:
     def __init__(self):
         self.children = {}
         self.is_end_of_word = False
         self.data = None  # Store full object data at leaf/end
+        self.key = None   # Lowercased word ending here
+        self.score = 0    # Popularity of the word ending here
+        self.top = []     # Cached best (-score, word, data) in this subtree, ascending
+
 
 class Trie:
-    def __init__(self):
+    def __init__(self, top_k=10):
         self.root = TrieNode()
+        self.top_k = top_k
 
-    def insert(self, word, data=None):
-        """O(L) Insert word where L is length of word"""
+    def insert(self, word, data=None, score=0):
+        """O(L * K) Insert word where L is length of word and K the cache size"""
+        path = [self.root]
         node = self.root
         for char in word.lower():
             if char not in node.children:
                 node.children[char] = TrieNode()
             node = node.children[char]
+            path.append(node)
+        old = node.score if node.is_end_of_word else None
         node.is_end_of_word = True
+        node.key = word.lower()
         node.data = data if data else word
+        node.score = score
+        self._refresh(path, old)
 
-    def search_prefix(self, prefix):
-        """O(L + M) Search words with prefix. M is total nodes in subtree."""
+    def _path(self, word):
         node = self.root
-        for char in prefix.lower():
-            if char not in node.children:
-                return []
-            node = node.children[char]
-        
+        path = [node]
+        for char in word.lower():
+            node = node.children.get(char)
+            if node is None:
+                return None
+            path.append(node)
+        return path if node.is_end_of_word else None
+
+    def bump(self, word, delta=1):
+        """O(L * K) Change a word's popularity. Returns False if word is unknown."""
+        path = self._path(word)
+        if path is None:
+            return False
+        old = path[-1].score
+        path[-1].score += delta
+        self._refresh(path, old)
+        return True
+
+    def score(self, word):
+        """O(L) Current popularity of word"""
+        path = self._path(word)
+        return path[-1].score if path else 0
+
+    def _refresh(self, path, old_score):
+        """O(L * K) Update the cached top-k of each node on the path, bottom-up"""
+        end = path[-1]
+        entry = (-end.score, end.key, end.data)
+        grew = old_score is None or end.score >= old_score
+        for node in reversed(path):
+            top = node.top
+            i = next((j for j, e in enumerate(top) if e[1] == end.key), -1)
+            if grew:
+                if i < 0 and len(top) >= self.top_k and entry >= top[-1]:
+                    break  # Not top-k here, so not top-k in any ancestor either
+                if i >= 0:
+                    del top[i]
+                bisect.insort(top, entry)
+                del top[self.top_k:]
+            else:
+                if i < 0:
+                    break  # Was not cached here, so not in any ancestor either
+                del top[i]
+                if len(top) == self.top_k - 1:
+                    # The cache was full: a word below may now outrank this
+                    # one, so rebuild from the children's (already updated) caches.
+                    node.top = self._merge(node)
+                else:
+                    bisect.insort(top, entry)
+
+    def _merge(self, node):
+        """O(C * K) Rebuild a node's cache from its own word and its children"""
+        sources = [child.top for child in node.children.values()]
+        if node.is_end_of_word:
+            sources.append([(-node.score, node.key, node.data)])
+        return heapq.nsmallest(self.top_k, heapq.merge(*sources))
+
+    def search_prefix(self, prefix, k=None):
+        """
+        O(L + k) Top-k words with prefix ranked by popularity.
+        Without k: O(L + M) all words in the subtree, M is total nodes in subtree.
+        """
+        node = self._locate(prefix.lower())
+        if node is None:
+            return []
+
+        if k is not None and k <= self.top_k:
+            return [data for _, _, data in node.top[:k]]
+
         # DFS to find all words from this node
         results = []
         self._dfs(node, results)
+        if k is not None:
+            results = [data for _, _, data in heapq.nsmallest(k, results)]
+        else:
+            results = [data for _, _, data in results]
+        return results
+
+    def search_fuzzy(self, query, max_dist=None, k=None):
+        """
+        Words with a prefix within max_dist edits of query (insert, delete,
+        substitute, swap adjacent), ranked by distance then popularity.
+        Walks the trie carrying one DP row per character and prunes a
+        branch as soon as every cell of its row exceeds max_dist; ranking
+        then opens O(k) subtrees rather than every matched one.
+        """
+        q = query.lower()
+        if max_dist is None:
+            max_dist = auto_distance(q)
+        n = len(q)
+        first = list(range(n + 1))
+        matched = [(first[-1], self.root)] if first[-1] <= max_dist else []
+        stack = [(self.root, first, None, None)]
+        while stack:
+            node, row, prev_row, prev_char = stack.pop()
+            for label, child in self._edges(node):
+                r, pr, pc = row, prev_row, prev_char
+                best = None
+                alive = True
+                for ch in label:
+                    new = [r[0] + 1]
+                    for j in range(1, n + 1):
+                        v = r[j - 1] if q[j - 1] == ch else r[j - 1] + 1
+                        if r[j] + 1 < v:
+                            v = r[j] + 1
+                        if new[j - 1] + 1 < v:
+                            v = new[j - 1] + 1
+                        if pr is not None and j > 1 and ch == q[j - 2] and pc == q[j - 1] and pr[j - 2] + 1 < v:
+                            v = pr[j - 2] + 1
+                        new.append(v)
+                    pr, r, pc = r, new, ch
+                    if r[n] <= max_dist and (best is None or r[n] < best):
+                        best = r[n]
+                    if min(r) > max_dist:
+                        alive = False
+                        break
+                if best is not None:
+                    matched.append((best, child))
+                if alive:
+                    stack.append((child, r, pr, pc))
+
+        # Every word below a matched node is a hit at that node's distance.
+        # Rank best-first from one heap of words and subtrees, a subtree keyed
+        # by the best entry it could hold (its distance and its cached top
+        # word): only subtrees that can still place are opened, each once, at
+        # the smallest distance any match gives it.
+        heap = []
+        tie = itertools.count()
+        for dist, node in matched:
+            if node.top:
+                heap.append((dist, node.top[0][0], node.top[0][1], 0, next(tie), node))
+        heapq.heapify(heap)
+        opened = set()
+        results = []
+        while heap and (k is None or len(results) < k):
+            dist, _, _, is_word, _, item = heapq.heappop(heap)
+            if is_word:
+                results.append(item)
+                continue
+            if id(item) in opened:
+                continue  # Already opened at a distance no larger than this
+            opened.add(id(item))
+            if item.is_end_of_word:
+                heapq.heappush(heap, (dist, -item.score, item.key, 1, next(tie), item.data))
+            for child in item.children.values():
+                if child.top:
+                    heapq.heappush(heap, (dist, child.top[0][0], child.top[0][1], 0, next(tie), child))
         return results
 
+    def _edges(self, node):
+        return node.children.items()
+
+    def _locate(self, prefix):
+        """O(L) Node whose subtree holds every word starting with prefix"""
+        node = self.root
+        for char in prefix:
+            if char not in node.children:
+                return None
+            node = node.children[char]
+        return node
+
     def _dfs(self, node, results):
         if node.is_end_of_word:
-            results.append(node.data)
-        
+            results.append((-node.score, node.key, node.data))
+
         for child in node.children.values():
             self._dfs(child, results)
@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+import app as server
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def register(client):
+    name = f"user-{uuid.uuid4().hex[:8]}"
+    response = client.post("/api/auth/register", json={"username": name, "password": "pw"})
+    assert response.status_code == 200
+    return name, response.get_json()["token"]
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_anonymous_requests_can_read_but_not_write(client):
+    assert client.get("/api/history").status_code == 200
+    assert client.post("/api/history", json={"title": "x"}).status_code == 401
+    assert client.delete("/api/history/1").status_code == 401
+    assert client.post("/api/nutrition/batch", json=[]).status_code == 401
+
+
+def test_a_bare_or_forged_name_is_rejected(client):
+    name, token = register(client)
+    assert client.get("/api/history", headers={"X-User": name}).status_code == 401
+    assert client.get(f"/api/history?user={name}").status_code == 401
+    assert client.get("/api/history", headers=bearer(f"{name}.{'0' * 64}")).status_code == 401
+    other, _ = register(client)
+    forged = f"{other}.{token.rpartition('.')[2]}"  # Someone else's signature
+    assert client.get("/api/history", headers=bearer(forged)).status_code == 401
+
+
+def test_tokens_scope_state_to_their_user(client):
+    name, token = register(client)
+    added = client.post("/api/history", json={"title": "squat", "duration": "10 min"}, headers=bearer(token))
+    assert added.status_code == 200
+    mine = client.get("/api/history", headers=bearer(token)).get_json()["history"]
+    assert [e["title"] for e in mine] == ["squat"]
+    # The same token also works as a query parameter (EventSource cannot set headers)
+    assert client.get(f"/api/history?token={token}").get_json()["history"] == mine
+    _, other = register(client)
+    assert client.get("/api/history", headers=bearer(other)).get_json()["history"] == []
+
+
+def test_login_issues_the_same_token(client):
+    name, token = register(client)
+    response = client.post("/api/auth/login", json={"username": name, "password": "pw"})
+    assert response.status_code == 200
+    assert response.get_json()["token"] == token
+    assert "password" not in response.get_json()["user"]
+    assert client.post("/api/auth/login", json={"username": name, "password": "no"}).status_code == 401
+    assert client.post("/api/auth/register", json={"username": name, "password": "pw"}).status_code == 400
+
+
+def test_history_cursor_must_be_an_id(client):
+    _, token = register(client)
+    assert client.get("/api/history?after=abc", headers=bearer(token)).status_code == 400
+    assert client.get("/api/history?after=999", headers=bearer(token)).status_code == 400
+
+
+BEFORE_RESTART = """
+import json, app
+c = app.app.test_client()
+token = c.post("/api/auth/register", json={"username": "ann", "password": "pw"}).get_json()["token"]
+h = {"Authorization": "Bearer " + token}
+ids = [c.post("/api/history", json={"title": t, "duration": "5 min"}, headers=h).get_json()["id"]
+       for t in ("a", "b", "c")]
+c.delete(f"/api/history/{ids[-1]}", headers=h)
+app.storage.snapshot()
+c.post("/api/history", json={"title": "d", "duration": "5 min"}, headers=h)  # Only in the log
+app.storage.close()
+print(json.dumps({"token": token, "ids": ids}))
+"""
+
+AFTER_RESTART = """
+import json, sys, app
+c = app.app.test_client()
+h = {"Authorization": "Bearer " + sys.argv[1]}
+history = c.get("/api/history", headers=h).get_json()["history"]
+new_id = c.post("/api/history", json={"title": "e", "duration": "5 min"}, headers=h).get_json()["id"]
+page = c.get("/api/history?limit=1", headers=h).get_json()
+print(json.dumps({"history": [(e["id"], e["title"]) for e in history], "new_id": new_id, "page": page}))
+"""
+
+
+def run_app(tmp_path, script, *args):
+    env = dict(os.environ, CULTFIT_DATA_DIR=str(tmp_path))
+    out = subprocess.run([sys.executable, "-c", script, *args], cwd=os.path.dirname(server.__file__),
+                         env=env, capture_output=True, text=True, check=True, timeout=60)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_state_and_ids_survive_a_restart(tmp_path):
+    before = run_app(tmp_path, BEFORE_RESTART)
+    after = run_app(tmp_path, AFTER_RESTART, before["token"])
+    a, b, c = before["ids"]
+    assert after["history"] == [[a, "a"], [b, "b"], [c + 1, "d"]]
+    # The deleted id is never handed out again, snapshot or not
+    assert after["new_id"] == c + 2
+    assert after["page"]["history"][0]["id"] == a and after["page"]["next_cursor"] == a
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from ds_modules.hash_map import HashMap, OpenAddressingHashMap
+
+
+@pytest.mark.parametrize("cls", [HashMap, OpenAddressingHashMap])
+def test_matches_dict_under_random_churn(cls):
+    rng = random.Random(0)
+    table, expected = cls(), {}
+    for i in range(20000):
+        key = rng.randrange(3000)
+        if rng.random() < 0.3:
+            assert table.remove(key) == (expected.pop(key, None) is not None)
+        else:
+            table.put(key, i)
+            expected[key] = i
+    assert len(table) == len(expected)
+    assert sorted(table.items()) == sorted(expected.items())
+    for key in range(3000):
+        assert table.get(key) == expected.get(key)
+
+
+def test_rehash_is_spread_over_later_writes():
+    table = HashMap(capacity=16, rehash_step=2)
+    for i in range(13):  # 13 > 16 * 0.75 starts the rehash
+        table.put(i, i)
+    assert table.capacity == 32
+    assert table._old_buckets is not None  # Old table is drained a few buckets per write
+    # Mid-rehash every key is still readable, updatable and removable
+    assert [table.get(i) for i in range(13)] == list(range(13))
+    table.put(0, "updated")
+    assert table.remove(1)
+    assert table.get(0) == "updated" and table.get(1) is None
+    assert sorted(k for k, _ in table.items()) == [0] + list(range(2, 13))
+    for i in range(100, 110):
+        table.put(i, i)
+    assert table._old_buckets is None
+    assert len(table) == 22 and len(list(table.items())) == 22
+
+
+def test_open_addressing_accepts_none_key():
+    table = OpenAddressingHashMap()
+    table.put(None, "none")
+    for i in range(50):
+        table.put(i, i)
+    assert table.get(None) == "none"
+    assert (None, "none") in list(table.items())
+    assert table.remove(None)
+    assert table.get(None) is None and len(table) == 50
+
+
+def test_open_addressing_reuses_tombstones():
+    table = OpenAddressingHashMap()
+    for i in range(100000):
+        table.put(i, i)
+        table.remove(i)
+    assert len(table) == 0
+    assert table.capacity <= 16  # Churn recycles slots instead of growing the table
@@ -0,0 +1,68 @@
+import io
+import json
+import random
+
+import pytest
+
+from ds_modules.ingest import MalformedBody, iter_json_array, iter_ndjson, iter_records
+
+
+def records(n):
+    rng = random.Random(5)
+    # Strings holding brackets and quotes, nested values and bare scalars
+    return [{"title": "x" * rng.randrange(200), "tricky": 'a"]}[{', "n": rng.random(), "l": [1, {"a": "]"}]}
+            for _ in range(n)] + [5, "str", 1.5e3, -12, None, True, [1, 2]]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 65536])
+def test_json_array_across_chunk_boundaries(chunk_size):
+    expected = records(300)
+    body = json.dumps(expected).encode()
+    assert [r for _, r in iter_json_array(io.BytesIO(body), chunk_size)] == expected
+
+
+def test_json_array_edge_cases():
+    assert list(iter_json_array(io.BytesIO(b" [ ] "))) == []
+    assert list(iter_json_array(io.BytesIO(b'[12, 3.5e2 ,"\xc3\xa9"]'), 1)) == [(0, 12), (1, 350.0), (2, "é")]
+    with pytest.raises(MalformedBody, match="expected a JSON array"):
+        list(iter_json_array(io.BytesIO(b'{"a": 1}')))
+
+
+def test_json_array_keeps_records_before_a_syntax_error():
+    got = []
+    with pytest.raises(MalformedBody):
+        for _, record in iter_json_array(io.BytesIO(b'[{"a": 1}, {"b": 2}, {"c": ]'), 4):
+            got.append(record)
+    assert got == [{"a": 1}, {"b": 2}]
+    with pytest.raises(MalformedBody, match="end of body"):
+        list(iter_json_array(io.BytesIO(b'[{"a": 1},')))
+
+
+def test_json_array_caps_element_size():
+    body = b'[{"a": "' + b"x" * 5000
+    with pytest.raises(MalformedBody, match="longer than 1000"):
+        list(iter_json_array(io.BytesIO(body), chunk_size=64, max_element=1000))
+    fits = b'[{"a": "' + b"x" * 900 + b'"}]'
+    assert len(list(iter_json_array(io.BytesIO(fits), chunk_size=64, max_element=1000))) == 1
+
+
+def test_ndjson_reports_bad_lines_and_goes_on():
+    body = b'{"a": 1}\n\nnot json\r\n{"b": 2}'
+    got = list(iter_ndjson(io.BytesIO(body), chunk_size=3))
+    assert got[0] == (0, {"a": 1})
+    assert got[1][0] == 1 and isinstance(got[1][1], ValueError)
+    assert got[2] == (2, {"b": 2})
+
+
+def test_ndjson_caps_line_length():
+    body = b'{"a": 1}\n' + b"x" * 5000
+    got = []
+    with pytest.raises(MalformedBody, match="longer than 1000"):
+        for _, record in iter_ndjson(io.BytesIO(body), chunk_size=64, max_line=1000):
+            got.append(record)
+    assert got == [{"a": 1}]
+
+
+def test_content_type_picks_the_format():
+    assert list(iter_records(io.BytesIO(b'{"a": 1}\n'), "application/x-ndjson")) == [(0, {"a": 1})]
+    assert list(iter_records(io.BytesIO(b'[{"a": 1}]'), "application/json")) == [(0, {"a": 1})]
@@ -0,0 +1,53 @@
+import random
+
+from ds_modules.timer_wheel import Scheduler, TimerWheel
+
+
+def test_each_timer_fires_on_its_own_tick():
+    # 4 slots x 2 levels covers 16 ticks: later timers overflow the top level and cascade
+    wheel = TimerWheel(tick=1.0, slot_bits=2, levels=2, start=0)
+    rng = random.Random(4)
+    due = {f"t{i}": rng.randrange(1, 200) for i in range(300)}
+    for timer_id, when in due.items():
+        wheel.schedule(timer_id, when, payload=when)
+    fired = {}
+    for now in range(1, 201):
+        for timer_id, when, payload in wheel.advance(now):
+            assert timer_id not in fired
+            fired[timer_id] = now
+            assert when == payload
+    assert fired == due
+    assert len(wheel) == 0
+
+
+def test_cancel_and_reschedule():
+    wheel = TimerWheel(tick=1.0, slot_bits=2, levels=2, start=0)
+    wheel.schedule("a", 5)
+    wheel.schedule("b", 40)
+    assert wheel.cancel("a") and not wheel.cancel("a")
+    wheel.schedule("b", 3)  # Re-arming replaces the pending timer
+    assert wheel.advance(10) == [("b", 3, None)]
+    assert wheel.advance(100) == []
+
+
+def test_past_times_fire_on_the_next_tick():
+    wheel = TimerWheel(tick=1.0, start=100)
+    wheel.schedule("late", 50)
+    assert wheel.advance(100) == []
+    assert wheel.advance(101) == [("late", 50, None)]
+
+
+def test_scheduler_rearms_recurring_timers():
+    clock = [0.0]
+    fired = []
+    scheduler = Scheduler(lambda timer_id, when, payload: fired.append((timer_id, when)),
+                          tick=1.0, clock=lambda: clock[0])
+    scheduler.schedule("daily", 10, every=10)
+    scheduler.schedule("once", 15)
+    for clock[0] in range(1, 36):
+        scheduler.run_pending()
+    assert fired == [("daily", 10), ("once", 15), ("daily", 20), ("daily", 30)]
+    # A long stall skips missed occurrences instead of firing each one
+    assert scheduler.run_pending(95) == 1
+    assert scheduler.run_pending(100) == 1
+    assert fired[-2:] == [("daily", 40), ("daily", 100)]
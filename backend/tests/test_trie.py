@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from ds_modules.radix_trie import RadixTrie
+from ds_modules.trie import Trie
+
+STEMS = ("squat", "squeeze", "press", "pull", "push", "curl", "chicken", "chickpea", "rice", "row")
+
+
+def random_words(rng, n):
+    return sorted({f"{rng.choice(STEMS)}{rng.choice(STEMS)[:rng.randrange(6)]}{rng.randrange(40)}"
+                   for _ in range(n)})
+
+
+def ranked(scores, prefix, k):
+    hits = sorted((-score, word) for word, score in scores.items() if word.startswith(prefix))
+    return [word for _, word in hits[:k]]
+
+
+@pytest.mark.parametrize("cls", [Trie, RadixTrie])
+def test_top_k_caches_follow_inserts_and_bumps(cls):
+    rng = random.Random(1)
+    trie, scores = cls(top_k=5), {}
+    words = random_words(rng, 400)
+    for word in words:
+        scores[word] = rng.randrange(100)
+        trie.insert(word, word, scores[word])
+    for _ in range(3000):
+        word = rng.choice(words)
+        delta = rng.randrange(-30, 31)  # Drops out of a full cache make it rebuild
+        assert trie.bump(word, delta)
+        scores[word] += delta
+    for prefix in ["", "s", "sq", "squat", "ch", "chickpea", "p", "pu", "r", "x"]:
+        for k in (1, 3, 5):
+            assert trie.search_prefix(prefix, k) == ranked(scores, prefix, k), (prefix, k)
+        # Past the cache size it falls back to a full walk
+        assert trie.search_prefix(prefix, 20) == ranked(scores, prefix, 20)
+
+
+def test_reinsert_replaces_score():
+    trie = Trie(top_k=2)
+    for word, score in (("curl", 5), ("curls", 4), ("cur", 3)):
+        trie.insert(word, score=score)
+    trie.insert("curl", score=1)
+    assert trie.search_prefix("cur", 2) == ["curls", "cur"]
+    assert trie.score("curl") == 1
+    assert not trie.bump("nope")
+
+
+def test_radix_bulk_insert_matches_incremental():
+    rng = random.Random(2)
+    entries = [(word, word, rng.randrange(50)) for word in random_words(rng, 500)]
+    one_by_one, bulk = RadixTrie(top_k=5), RadixTrie(top_k=5)
+    for entry in entries:
+        one_by_one.insert(*entry)
+    bulk.insert_many(entries)
+    for prefix in ["", "c", "ch", "chick", "pu", "rice", "zz"]:
+        assert bulk.search_prefix(prefix, 5) == one_by_one.search_prefix(prefix, 5)
+        assert sorted(bulk.search_prefix(prefix)) == sorted(one_by_one.search_prefix(prefix))
+
+
+def osa(a, b):
+    """Reference optimal string alignment distance (adjacent swaps cost 1)"""
+    d = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def fuzzy_hits(scores, query):
+    # A word matches at the best distance of any of its prefixes
+    return sorted((min(osa(query, word[:i]) for i in range(len(word) + 1)), -score, word)
+                  for word, score in scores.items())
+
+
+def test_fuzzy_counts_a_swap_as_one_edit():
+    trie = Trie()
+    trie.insert("squat")
+    assert osa("sqaut", "squat") == 1
+    assert trie.search_fuzzy("sqaut", 1) == ["squat"]
+    assert trie.search_fuzzy("sqaut", 0) == []
+    assert trie.search_fuzzy("qsuat", 1) == ["squat"]
+
+
+@pytest.mark.parametrize("cls", [Trie, RadixTrie])
+def test_fuzzy_ranking_matches_brute_force(cls):
+    rng = random.Random(3)
+    trie, scores = cls(top_k=5), {}
+    for word in random_words(rng, 300):
+        scores[word] = rng.randrange(100)
+        trie.insert(word, word, scores[word])
+    for query in ("sqaut", "chiken", "pusj", "rcie", "crul1", "presss", "x"):
+        hits = fuzzy_hits(scores, query)
+        for max_dist in (0, 1, 2):
+            for k in (1, 5, 50, None):
+                expected = [word for dist, _, word in hits if dist <= max_dist][:k]
+                assert trie.search_fuzzy(query, max_dist, k) == expected, (query, max_dist, k)
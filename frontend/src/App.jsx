@@ -1,5 +1,4 @@
 import React, { useState } from 'react';
-import axios from 'axios';
 import { HashRouter as Router, Routes, Route, Navigate } from 'react-router-dom';
 import Login from './pages/Login';
 import Dashboard from './pages/Dashboard';
@@ -12,32 +11,22 @@ import Sidebar from './components/Sidebar';
 import Navbar from './components/Navbar';
 import ProfileSetup from './components/ProfileSetup';
 import { ThemeProvider, useTheme } from './context/ThemeContext';
+import { LiveDataProvider, useLiveData } from './context/LiveDataContext';
 
 function AppContent() {
   const { isDarkMode } = useTheme();
+  const { profile, signIn, signOut } = useLiveData();
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [showProfileSetup, setShowProfileSetup] = useState(false);
 
-  const handleLogin = async () => {
+  const handleLogin = (username, token) => {
+    signIn(username, token);
     setIsAuthenticated(true);
     localStorage.setItem('fit_auth', 'true');
-    try {
-      // Check if user has already set up their profile
-      const res = await axios.get('/api/user/profile');
-      const hasSetup = localStorage.getItem('fit_setup_done');
-
-      // Only show if not done in this browser and name is default or missing
-      if (!hasSetup && (!res.data.name || res.data.name === 'Monika')) {
-        setShowProfileSetup(true);
-      } else {
-        setShowProfileSetup(false);
-      }
-    } catch (e) {
-      setShowProfileSetup(true);
-    }
   };
 
   const handleLogout = () => {
+    signOut();
     setIsAuthenticated(false);
     setShowProfileSetup(false);
     localStorage.removeItem('fit_auth');
@@ -51,23 +40,21 @@ function AppContent() {
 
   // Re-hydrate auth on refresh
   React.useEffect(() => {
-    const hydrateAuth = async () => {
-      if (localStorage.getItem('fit_auth') === 'true') {
-        setIsAuthenticated(true);
-        try {
-          const res = await axios.get('/api/user/profile');
-          const hasSetup = localStorage.getItem('fit_setup_done');
-          if (!hasSetup && (!res.data.name || res.data.name === 'Monika')) {
-            setShowProfileSetup(true);
-          }
-        } catch (e) {
-          console.warn("Profile check failed on hydrate", e);
-        }
-      }
-    };
-    hydrateAuth();
+    if (localStorage.getItem('fit_auth') === 'true' && localStorage.getItem('fit_token')) {
+      setIsAuthenticated(true);
+    }
   }, []);
 
+  // Check if user has already set up their profile (loaded once per user)
+  React.useEffect(() => {
+    if (!isAuthenticated || !profile) return;
+    const hasSetup = localStorage.getItem('fit_setup_done');
+    // Only show if not done in this browser and name is default or missing
+    if (!hasSetup && (!profile.name || profile.name === 'Monika')) {
+      setShowProfileSetup(true);
+    }
+  }, [isAuthenticated, profile]);
+
   return (
     <Router>
       <div className={`flex h-screen overflow-hidden transition-colors duration-300 ${isDarkMode ? 'bg-cult-dark text-white' : 'bg-gray-50 text-gray-900'}`}>
@@ -99,7 +86,9 @@ function AppContent() {
 function App() {
   return (
     <ThemeProvider>
-      <AppContent />
+      <LiveDataProvider>
+        <AppContent />
+      </LiveDataProvider>
     </ThemeProvider>
   );
 }
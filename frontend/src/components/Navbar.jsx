@@ -5,9 +5,11 @@ import { motion, AnimatePresence } from 'framer-motion';
 
 import { useNavigate } from 'react-router-dom';
 import { useTheme } from '../context/ThemeContext';
+import { useLiveData } from '../context/LiveDataContext';
 
 const Navbar = ({ onLogout }) => {
     const { isDarkMode } = useTheme();
+    const { profile, summary, urgent, onEvent } = useLiveData();
     const navigate = useNavigate();
     const [query, setQuery] = useState('');
     const [results, setResults] = useState({ exercises: [], food: [], userName: '' });
@@ -17,59 +19,64 @@ const Navbar = ({ onLogout }) => {
     const searchRef = useRef(null);
     const notificationRef = useRef(null);
 
-    // Handle Search input & Fetch Data
+    // Profile, totals and the urgent reminder come from the shared change feed
     useEffect(() => {
-        const fetchData = async () => {
-            try {
-                // 1. Fetch User, Nutrition & Reminders
-                const [userRes, nutritionRes, reminderRes] = await Promise.all([
-                    axios.get('/api/user/profile'),
-                    axios.get('/api/nutrition'),
-                    axios.get('/api/reminders')
-                ]);
-
-                const user = userRes.data;
-                setResults(prev => ({ ...prev, userName: user.name }));
-
-                const newNotifs = [];
-
-                // 2. Reminder Logic (Priority Heap)
-                if (reminderRes.data.urgent) {
-                    newNotifs.push({
-                        id: 'rem-' + Date.now(),
-                        title: 'Priority Task ⚡',
-                        message: reminderRes.data.urgent[1],
-                        type: 'urgent'
-                    });
-                }
-
-                // 3. Goal Comparison Logic
-                const log = nutritionRes.data.log || [];
-                const intake = log.reduce((acc, curr) => acc + (curr.cals || 0), 0);
-
-                // Calculate Target
-                let target = 2500;
-                if (user.weight > 0) {
-                    let bmr = (10 * user.weight) + (6.25 * user.height) - (5 * user.age);
-                    bmr = user.gender === 'Male' ? bmr + 5 : bmr - 161;
-                    target = Math.round(bmr * (user.activity_level || 1.2));
-                    if (user.goal === 'Lose') target -= 500;
-                    if (user.goal === 'Gain') target += 500;
-                }
-
-                if (intake < target * 0.5) {
-                    newNotifs.push({ id: 1, title: 'Keep Going! 🥗', message: `You've only consumed ${intake} kcal. Your goal is ${target} kcal.` });
-                } else if (intake >= target) {
-                    newNotifs.push({ id: 2, title: 'Goal Reached! 🎉', message: 'You have officially met your calorie target for today!' });
-                }
-
-                setNotifications(newNotifs);
-
-            } catch (e) { }
-
+        const user = profile || {};
+        setResults(prev => ({ ...prev, userName: user.name }));
+
+        const newNotifs = [];
+
+        // 1. Reminder Logic (Priority Heap)
+        if (urgent) {
+            newNotifs.push({
+                id: 'rem-' + urgent[2],
+                title: 'Priority Task ⚡',
+                message: urgent[1],
+                type: 'urgent'
+            });
+        }
+
+        // 2. Goal Comparison Logic
+        const intake = summary.intake_calories || 0;
+
+        // Calculate Target
+        let target = 2500;
+        if (user.weight > 0) {
+            let bmr = (10 * user.weight) + (6.25 * user.height) - (5 * user.age);
+            bmr = user.gender === 'Male' ? bmr + 5 : bmr - 161;
+            target = Math.round(bmr * (user.activity_level || 1.2));
+            if (user.goal === 'Lose') target -= 500;
+            if (user.goal === 'Gain') target += 500;
+        }
+
+        if (intake < target * 0.5) {
+            newNotifs.push({ id: 1, title: 'Keep Going! 🥗', message: `You've only consumed ${intake} kcal. Your goal is ${target} kcal.` });
+        } else if (intake >= target) {
+            newNotifs.push({ id: 2, title: 'Goal Reached! 🎉', message: 'You have officially met your calorie target for today!' });
+        }
+
+        // Keep pushed due-reminder toasts, rebuild the derived ones
+        setNotifications(prev => [...prev.filter(n => n.pushed), ...newNotifs]);
+    }, [profile, summary, urgent]);
+
+    // Due reminders are pushed by the server's scheduler
+    useEffect(() => onEvent(({ type, data }) => {
+        if (type !== 'reminder_due') return;
+        setNotifications(prev => [{
+            id: `due-${data.reminder[2]}-${Date.now()}`,
+            title: 'Reminder ⏰',
+            message: data.reminder[1],
+            type: 'urgent',
+            pushed: true
+        }, ...prev]);
+    }), [onEvent]);
+
+    // Handle Search input
+    useEffect(() => {
+        const search = async () => {
             if (query.length > 0) {
                 try {
-                    const res = await axios.get(`/api/search/all?q=${query}`);
+                    const res = await axios.get(`/api/search/all?q=${query}&limit=3`);
                     setResults(prev => ({ ...prev, exercises: res.data.exercises, food: res.data.food }));
                     setShowResults(true);
                 } catch (err) {
@@ -81,7 +88,7 @@ const Navbar = ({ onLogout }) => {
             }
         };
 
-        const timer = setTimeout(fetchData, 300);
+        const timer = setTimeout(search, 300);
         return () => clearTimeout(timer);
     }, [query]);
 
@@ -1,7 +1,8 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { User, Ruler, Weight, Target, ArrowRight, Zap, Utensils, Activity, ChevronRight, Check } from 'lucide-react';
 import axios from 'axios';
+import { useLiveData } from '../context/LiveDataContext';
 
 const ACTIVITY_LEVELS = [
     { value: 1.2, label: 'Sedentary', desc: 'Little or no exercise' },
@@ -31,17 +32,15 @@ const ProfileSetup = ({ onComplete, onClose }) => {
         diet: 'Non-Veg'
     });
 
+    // Prefill once from the shared profile; later pushes must not clobber edits
+    const { profile } = useLiveData();
+    const prefilled = useRef(false);
     useEffect(() => {
-        const fetchExisting = async () => {
-            try {
-                const res = await axios.get('/api/user/profile');
-                if (res.data.name) {
-                    setForm(prev => ({ ...prev, ...res.data }));
-                }
-            } catch (err) { }
-        };
-        fetchExisting();
-    }, []);
+        if (!prefilled.current && profile && profile.name) {
+            prefilled.current = true;
+            setForm(prev => ({ ...prev, ...profile }));
+        }
+    }, [profile]);
 
     const calculateBMI = () => {
         if (!form.height || !form.weight) return null;
@@ -1,24 +1,15 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { NavLink } from 'react-router-dom';
 import { LayoutDashboard, Dumbbell, Utensils, Bell, Settings } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
-import axios from 'axios';
 import { useTheme } from '../context/ThemeContext';
+import { useLiveData } from '../context/LiveDataContext';
 
 const Sidebar = () => {
     const { isDarkMode } = useTheme();
     const [showProModal, setShowProModal] = useState(false);
-    const [user, setUser] = useState({ name: 'Monika KN' });
-
-    useEffect(() => {
-        const fetchUser = async () => {
-            try {
-                const res = await axios.get('/api/user/profile');
-                if (res.data.name) setUser(res.data);
-            } catch (err) { }
-        };
-        fetchUser();
-    }, []);
+    const { profile } = useLiveData();
+    const user = profile && profile.name ? profile : { name: 'Monika KN' };
 
     const navItems = [
         { icon: LayoutDashboard, label: 'Dashboard', path: '/' },
@@ -0,0 +1,105 @@
+import React, { createContext, useCallback, useContext, useEffect, useRef, useState } from 'react';
+import axios from 'axios';
+
+const LiveDataContext = createContext();
+
+// Every request carries the signed-in user's session token; the server keeps each
+// user's data apart. Set before the first render so components fetching on mount
+// already send it.
+const setSessionHeader = (token) => {
+    if (token) axios.defaults.headers.common['Authorization'] = `Bearer ${token}`;
+    else delete axios.defaults.headers.common['Authorization'];
+};
+setSessionHeader(localStorage.getItem('fit_token'));
+
+// Loads profile, dashboard totals and the urgent reminder once (/api/bootstrap),
+// then keeps them current from the server's /api/events change feed.
+export const LiveDataProvider = ({ children }) => {
+    const [user, setUser] = useState(() => localStorage.getItem('fit_user'));
+    const [token, setToken] = useState(() => localStorage.getItem('fit_token'));
+    const [profile, setProfile] = useState(null);
+    const [summary, setSummary] = useState({});
+    const [urgent, setUrgent] = useState(null);
+    const [lastEvent, setLastEvent] = useState(null);
+    const listeners = useRef(new Set());
+
+    const load = useCallback(async () => {
+        try {
+            // One consistent snapshot; event_id marks the last change it includes
+            const res = await axios.get('/api/bootstrap?include=profile,summary,reminders');
+            setProfile(res.data.profile);
+            setSummary(res.data.summary);
+            setUrgent(res.data.reminders.urgent);
+            return res.data.event_id;
+        } catch (e) {
+            return null;
+        }
+    }, []);
+
+    useEffect(() => {
+        let source = null;
+        let closed = false;
+        const apply = (type, data) => {
+            if (data.profile) setProfile(data.profile);
+            if (data.summary) setSummary(data.summary);
+            if ('urgent' in data) setUrgent(data.urgent);
+            const event = { type, data };
+            setLastEvent(event);
+            listeners.current.forEach(fn => fn(event));
+        };
+        load().then((eventId) => {
+            if (closed) return;
+            // Resume right after the snapshot so no change falls in between
+            // EventSource can't send headers, so the token rides in the query string
+            const params = new URLSearchParams();
+            if (token) params.set('token', token);
+            if (eventId != null) params.set('last_id', eventId);
+            source = new EventSource(`/api/events?${params}`);
+            ['profile', 'nutrition_add', 'nutrition_delete', 'nutrition_batch', 'history_add', 'history_delete',
+                'history_batch', 'reminder_add', 'reminder_update', 'reminder_remove', 'reminder_due'].forEach(type =>
+                source.addEventListener(type, (e) => apply(type, JSON.parse(e.data))));
+            // Fell too far behind (or reconnected after events expired): reload once
+            source.addEventListener('resync', load);
+        });
+        return () => {
+            closed = true;
+            if (source) source.close();
+        };
+    }, [load, token]);
+
+    const signIn = useCallback((name, sessionToken) => {
+        localStorage.setItem('fit_user', name);
+        localStorage.setItem('fit_token', sessionToken);
+        setSessionHeader(sessionToken);
+        setUser(name);
+        setToken(sessionToken);
+    }, []);
+
+    const signOut = useCallback(() => {
+        localStorage.removeItem('fit_user');
+        localStorage.removeItem('fit_token');
+        setSessionHeader(null);
+        setUser(null);
+        setToken(null);
+    }, []);
+
+    // Subscribe to raw events, e.g. to show a toast when a reminder is due
+    const onEvent = useCallback((fn) => {
+        listeners.current.add(fn);
+        return () => listeners.current.delete(fn);
+    }, []);
+
+    return (
+        <LiveDataContext.Provider value={{ user, signIn, signOut, profile, summary, urgent, lastEvent, onEvent, reload: load }}>
+            {children}
+        </LiveDataContext.Provider>
+    );
+};
+
+export const useLiveData = () => {
+    const context = useContext(LiveDataContext);
+    if (context === undefined) {
+        throw new Error('useLiveData must be used within a LiveDataProvider');
+    }
+    return context;
+};
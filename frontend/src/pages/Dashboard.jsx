@@ -2,9 +2,9 @@ import React, { useState, useEffect } from 'react';
 import { Flame, Footprints, Timer, TrendingUp, ChevronRight, PieChart, Bell, Check } from 'lucide-react';
 import { AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 import { motion } from 'framer-motion';
-import axios from 'axios';
 import PageTransition from '../components/PageTransition';
 import { useTheme } from '../context/ThemeContext';
+import { useLiveData } from '../context/LiveDataContext';
 import AIAssistant from '../components/AIAssistant';
 
 const data = [
@@ -59,6 +59,7 @@ const StatCard = ({ icon: Icon, label, value, unit, color, isDarkMode }) => (
 
 const Dashboard = () => {
     const { isDarkMode } = useTheme();
+    const { profile: user, summary } = useLiveData();
     // Dynamic State
     const [stats, setStats] = useState({
         calories: 0,
@@ -67,7 +68,6 @@ const Dashboard = () => {
         heartRate: 0,
         intake: 0 // Food consumed
     });
-    const [user, setUser] = useState(null);
     const [plan, setPlan] = useState([
         { id: 1, text: 'Morning Yoga', completed: true },
         { id: 2, text: 'HIIT Cardio', completed: true },
@@ -83,52 +83,24 @@ const Dashboard = () => {
 
     const planProgress = Math.round((plan.filter(i => i.completed).length / plan.length) * 100);
 
+    // Totals are maintained server-side and pushed as workouts/meals are logged
     useEffect(() => {
-        const fetchData = async () => {
-            try {
-                const [historyRes, nutritionRes, userRes] = await Promise.all([
-                    axios.get('/api/history'),
-                    axios.get('/api/nutrition'),
-                    axios.get('/api/user/profile')
-                ]);
+        const totalCalories = summary.burned_calories || 0;
+        const totalDurationMinutes = summary.minutes || 0;
+        const intakeCals = summary.intake_calories || 0;
 
-                const history = historyRes.data.history || [];
-                const log = nutritionRes.data.log || [];
-                setUser(userRes.data);
+        const hours = Math.floor(totalDurationMinutes / 60);
+        const minutes = totalDurationMinutes % 60;
+        const formattedDuration = hours > 0 ? `${hours}h ${minutes}m` : `${minutes}m`;
 
-                let totalCalories = 0;
-                let totalDurationMinutes = 0;
-
-                history.forEach(item => {
-                    const cal = parseInt(item.calories) || 0;
-                    totalCalories += cal;
-                    const durStr = item.duration || "0";
-                    const dur = parseInt(durStr.replace(/\D/g, '')) || 0;
-                    totalDurationMinutes += dur;
-                });
-
-                // Calculate Intake Calories
-                const intakeCals = log.reduce((acc, curr) => acc + (curr.cals || 0), 0);
-
-                const hours = Math.floor(totalDurationMinutes / 60);
-                const minutes = totalDurationMinutes % 60;
-                const formattedDuration = hours > 0 ? `${hours}h ${minutes}m` : `${minutes}m`;
-
-                setStats({
-                    calories: totalCalories,
-                    steps: totalDurationMinutes * 120,
-                    duration: formattedDuration,
-                    heartRate: totalDurationMinutes > 0 ? 124 : 72,
-                    intake: intakeCals
-                });
-
-            } catch (err) {
-                console.error("Dashboard fetch failed", err);
-            }
-        };
-
-        fetchData();
-    }, []);
+        setStats({
+            calories: totalCalories,
+            steps: totalDurationMinutes * 120,
+            duration: formattedDuration,
+            heartRate: totalDurationMinutes > 0 ? 124 : 72,
+            intake: intakeCals
+        });
+    }, [summary]);
 
     const calculateDailyTarget = () => {
         if (!user || !user.weight) return 2500;
@@ -16,17 +16,11 @@ const Login = ({ onLogin }) => {
         const url = endpoint;
 
         try {
-            // Mocking success for demo if backend unreachable, but trying real call first
-            try {
-                const res = await axios.post(url, { username, password });
-                if (res.data) onLogin();
-            } catch (innerErr) {
-                // Fallback for visual demo purposes
-                console.warn("Backend unavailable, proceeding for demo UI check");
-                onLogin();
-            }
+            // Signed in only with the session token the server issues
+            const res = await axios.post(url, { username, password });
+            onLogin(username, res.data.token);
         } catch (err) {
-            setError("Connection Failed");
+            setError(err.response?.data?.error || "Connection Failed");
         }
     };
 
@@ -3,6 +3,7 @@ import { Search, Plus, Trash2, PieChart, X, Calculator, Leaf, Beef, Heart, Shiel
 import axios from 'axios';
 import { motion, AnimatePresence } from 'framer-motion';
 import PageTransition from '../components/PageTransition';
+import { useLiveData } from '../context/LiveDataContext';
 
 const getFoodType = (name) => {
     const nonVegKeywords = ['chicken', 'beef', 'pork', 'fish', 'egg', 'meat', 'lamb', 'tuna', 'salmon', 'bacon', 'mutton'];
@@ -121,7 +122,7 @@ const NutritionTracking = () => {
     const [query, setQuery] = useState('');
     const [results, setResults] = useState([]);
     const [log, setLog] = useState([]);
-    const [user, setUser] = useState(null);
+    const { profile: user } = useLiveData();
     const [dietFilter, setDietFilter] = useState('All'); // All, Veg, Non-Veg
 
     // Modal State
@@ -132,12 +133,8 @@ const NutritionTracking = () => {
     React.useEffect(() => {
         const fetchData = async () => {
             try {
-                const [logRes, userRes] = await Promise.all([
-                    axios.get('/api/nutrition'),
-                    axios.get('/api/user/profile')
-                ]);
+                const logRes = await axios.get('/api/nutrition');
                 setLog(logRes.data.log || []);
-                setUser(userRes.data);
             } catch (err) {
                 console.error("Failed to fetch data", err);
             }
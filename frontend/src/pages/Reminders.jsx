@@ -30,7 +30,7 @@ const Reminders = () => {
                 const resHeap = await axios.get('/api/reminders');
                 if (resHeap.data.all_reminders) {
                     const mapped = resHeap.data.all_reminders.map((item, i) => ({
-                        id: i, // Simple index ID for display
+                        id: item[2] ?? i, // Stable heap id
                         priority: item[0],
                         text: item[1],
                         link: generateLink(item[1]),
@@ -4,6 +4,7 @@ import axios from 'axios';
 import ProfileSetup from '../components/ProfileSetup';
 import { motion, AnimatePresence } from 'framer-motion';
 import { useTheme } from '../context/ThemeContext';
+import { useLiveData } from '../context/LiveDataContext';
 
 const Section = ({ title, children, isDarkMode }) => (
     <div className="mb-8">
@@ -108,6 +109,7 @@ const LanguageModal = ({ isOpen, onClose, selected, onSelect }) => {
 
 const Settings = () => {
     const { isDarkMode, toggleTheme } = useTheme();
+    const { profile } = useLiveData();
     const [user, setUser] = useState({ name: 'User' });
     const [showEdit, setShowEdit] = useState(false);
     const [showLanguageModal, setShowLanguageModal] = useState(false);
@@ -122,14 +124,8 @@ const Settings = () => {
     });
 
     useEffect(() => {
-        const fetchUser = async () => {
-            try {
-                const res = await axios.get('/api/user/profile');
-                if (res.data.name) setUser(res.data);
-            } catch (err) { }
-        };
-        fetchUser();
-    }, []);
+        if (profile && profile.name) setUser(profile);
+    }, [profile]);
 
     const togglePref = (key) => {
         if (key === 'darkMode') {